@@ -0,0 +1,3 @@
+# Mesures de performance reproductibles sur des données synthétiques (python -m benchmarks)
+from .generateur import generer_patients, generer_consultations, generer_cabinet, ssn_valide
+from .mesures import Operation, executer, comparer, enregistrer, lire
@@ -0,0 +1,48 @@
+"""
+Lance les mesures de performance
+
+Usage (depuis medical_cabinet/) :
+    python -m benchmarks --tailles 1000 10000 100000 --sortie resultats.json
+    python -m benchmarks --tailles 10000 --comparer resultats.json
+"""
+import argparse
+import sys
+
+from .mesures import executer, comparer, enregistrer, lire
+
+
+def main():
+    """Mesure, enregistre et compare éventuellement à une exécution précédente"""
+    analyseur = argparse.ArgumentParser(description="Mesures de performance du cabinet médical")
+    analyseur.add_argument("--tailles", type=int, nargs="+", default=[1000, 10000],
+                           help="Nombres de patients (10^3 à 10^6)")
+    analyseur.add_argument("--consultations-par-patient", type=float, default=4)
+    analyseur.add_argument("--repetitions", type=int, default=3)
+    analyseur.add_argument("--graine", type=int, default=0)
+    analyseur.add_argument("--operations", nargs="+", help="Restreint aux opérations nommées")
+    analyseur.add_argument("--sans-memoire", action="store_true", help="Ne mesure pas le pic mémoire")
+    analyseur.add_argument("--sortie", help="Fichier JSON des résultats")
+    analyseur.add_argument("--comparer", help="Résultats de référence (JSON)")
+    analyseur.add_argument("--seuil", type=float, default=0.2,
+                           help="Ralentissement relatif signalé comme régression (0.2 = 20 %%)")
+    arguments = analyseur.parse_args()
+
+    resultats = executer(arguments.tailles, arguments.repetitions, arguments.graine,
+                         arguments.consultations_par_patient, not arguments.sans_memoire,
+                         arguments.operations)
+    if arguments.sortie:
+        enregistrer(resultats, arguments.sortie)
+        print(f"✓ Résultats écrits dans {arguments.sortie}")
+
+    if arguments.comparer:
+        lignes = comparer(lire(arguments.comparer), resultats, arguments.seuil)
+        print("\n--- Comparaison (médianes) ---")
+        for taille, operation, avant, apres, rapport, regression in lignes:
+            print(f"{taille:>8} {operation:<24} {avant * 1000:10.2f} ms -> {apres * 1000:10.2f} ms"
+                  f"  x{rapport:.2f}{'  ✗ RÉGRESSION' if regression else ''}")
+        if any(ligne[-1] for ligne in lignes):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
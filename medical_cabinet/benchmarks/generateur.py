@@ -0,0 +1,169 @@
+"""
+Génération reproductible de données synthétiques réalistes pour les mesures de performance
+"""
+import random
+from datetime import date, datetime, timedelta
+
+from models import (
+    Patient, Consultation, RegistrePatients, RegistreConsultations,
+    PrescriptionMedicamenteuse, PrescriptionExamen, PrescriptionKinesitherapie
+)
+from storage.loader import lier_consultations
+
+NOMS = ["Martin", "Bernard", "Thomas", "Petit", "Robert", "Richard", "Durand", "Dubois", "Moreau",
+        "Laurent", "Simon", "Michel", "Lefèbvre", "Leroy", "Roux", "David", "Bertrand", "Morel",
+        "Fournier", "Girard", "Bonnet", "Dupont", "Lambert", "Fontaine", "Rousseau", "Vincent",
+        "Muller", "Lefèvre", "Faure", "André", "Mercier", "Blanc", "Guérin", "Boyer", "Garnier",
+        "Chevalier", "François", "Legrand", "Gauthier", "Garcia", "Perrin", "Robin", "Clément"]
+PRENOMS = ["Jean", "Marie", "Pierre", "Nathalie", "Michel", "Isabelle", "Philippe", "Sylvie",
+           "Alain", "Catherine", "Nicolas", "Françoise", "Éric", "Sophie", "Julien", "Élodie",
+           "Camille", "Léa", "Hugo", "Chloé", "Lucas", "Inès", "Jérôme", "Hélène", "Zoé", "Noé"]
+RUES = ["rue de la République", "avenue Victor Hugo", "rue Pasteur", "boulevard Gambetta",
+        "place de la Mairie", "rue des Écoles", "chemin des Vignes", "allée des Tilleuls"]
+MEDECINS = ["Martin", "Durand", "Lefebvre", "Nguyen", "Benali", "Rossi", "Schmitt", "Kowalski",
+            "Lopez", "Fabre", "Marchand", "Colin"]
+MOTIFS = ["Contrôle annuel", "Fièvre", "Toux persistante", "Douleur lombaire", "Renouvellement d'ordonnance",
+          "Certificat sportif", "Vaccination", "Maux de tête", "Suivi tension", "Douleur abdominale"]
+DIAGNOSTICS = ["Rhinopharyngite", "Angine", "Lombalgie", "Hypertension", "Gastro-entérite",
+               "Migraine", "Bronchite", "RAS"]
+MEDICAMENTS = ["Paracétamol", "Ibuprofène", "Amoxicilline", "Oméprazole", "Ramipril"]
+EXAMENS = ["Prise de sang", "Radiographie", "Échographie", "IRM"]
+
+# Horaires d'ouverture : créneaux de 30 minutes de 8h à 19h
+_CRENEAUX_PAR_JOUR = 22
+
+
+def ssn_valide(rng, naissance, sexe):
+    """
+    Numéro de sécurité sociale à 15 chiffres de structure réaliste
+
+    Sexe, année et mois de naissance, département, commune et rang de
+    naissance, suivis de la clé de contrôle (97 - NIR mod 97).
+
+    Args:
+        rng (random.Random): Générateur
+        naissance (date): Date de naissance
+        sexe (int): 1 ou 2
+
+    Returns:
+        str: 15 chiffres
+    """
+    nir = (f"{sexe}{naissance.year % 100:02d}{naissance.month:02d}"
+           f"{rng.randint(1, 95):02d}{rng.randint(1, 999):03d}{rng.randint(1, 999):03d}")
+    return f"{nir}{97 - int(nir) % 97:02d}"
+
+
+def _prescription(rng):
+    """Prescription d'un type tiré au hasard"""
+    tirage = rng.random()
+    if tirage < 0.6:
+        return PrescriptionMedicamenteuse(rng.choice(MEDICAMENTS), "1 comprimé",
+                                          f"{rng.randint(1, 3)} fois par jour", f"{rng.randint(3, 14)} jours")
+    if tirage < 0.85:
+        return PrescriptionExamen(rng.choice(EXAMENS), "Laboratoire central")
+    return PrescriptionKinesitherapie(rng.randint(5, 20), rng.choice(["dos", "genou", "épaule"]))
+
+
+def generer_patients(nombre, graine=0):
+    """
+    Registre de patients synthétiques, identique pour une même graine
+
+    Args:
+        nombre (int): Nombre de patients
+        graine (int, optional): Graine du générateur. Par défaut 0
+
+    Returns:
+        RegistrePatients: Patients aux SSN valides et uniques
+    """
+    rng = random.Random(graine)
+    patients = RegistrePatients()
+    origine = date(1930, 1, 1).toordinal()
+    etendue = date(2023, 12, 31).toordinal() - origine
+    while len(patients) < nombre:
+        naissance = date.fromordinal(origine + rng.randrange(etendue))
+        ssn = ssn_valide(rng, naissance, rng.choice((1, 2)))
+        if ssn in patients:
+            continue
+        patients.ajouter(Patient(
+            ssn, rng.choice(NOMS), rng.choice(PRENOMS), naissance,
+            f"{rng.randint(1, 150)} {rng.choice(RUES)}", f"06{rng.randrange(10 ** 8):08d}"
+        ))
+    return patients
+
+
+# Période par défaut, fixe pour que les jeux de données ne dépendent pas du jour
+DEBUT_PERIODE = datetime(2016, 1, 1)
+DATE_REFERENCE = datetime(2025, 1, 1)
+
+
+def generer_consultations(patients, par_patient=4, graine=0, debut=DEBUT_PERIODE, annees=10,
+                          reference=DATE_REFERENCE):
+    """
+    Consultations synthétiques sans conflit de créneau, reliées aux patients
+
+    Les consultations passées sont surtout réalisées (avec diagnostic et
+    prescriptions), parfois annulées ou jamais clôturées ; celles à venir
+    sont planifiées.
+
+    Args:
+        patients (RegistrePatients): Patients concernés
+        par_patient (float, optional): Consultations par patient en moyenne. Par défaut 4
+        graine (int, optional): Graine du générateur. Par défaut 0
+        debut (datetime, optional): Début de la période. Par défaut DEBUT_PERIODE
+        annees (int, optional): Durée de la période en années. Par défaut 10
+        reference (datetime, optional): Instant séparant passé et futur. Par défaut DATE_REFERENCE
+
+    Returns:
+        RegistreConsultations: Consultations, déjà rattachées aux historiques
+    """
+    rng = random.Random(graine + 1)
+    jours = 365 * annees
+    ssns = [p.ssn for p in patients]
+    consultations = []
+    occupes = set()
+    nombre = int(len(ssns) * par_patient)
+    # Assez de médecins pour que les agendas restent à moitié libres
+    capacite = jours * _CRENEAUX_PAR_JOUR
+    medecins = list(MEDECINS)
+    while len(medecins) * capacite < 2 * nombre:
+        medecins.append(f"{MEDECINS[len(medecins) % len(MEDECINS)]}-{len(medecins) // len(MEDECINS)}")
+    while len(consultations) < nombre:
+        medecin = rng.choice(medecins)
+        jour = rng.randrange(jours)
+        creneau = rng.randrange(_CRENEAUX_PAR_JOUR)
+        if (medecin, jour, creneau) in occupes:
+            continue
+        occupes.add((medecin, jour, creneau))
+        moment = debut + timedelta(days=jour, hours=8, minutes=30 * creneau)
+        if moment >= reference:
+            statut = "planifiée"
+        else:
+            tirage = rng.random()
+            statut = "réalisée" if tirage < 0.85 else ("annulée" if tirage < 0.95 else "planifiée")
+        consultation = Consultation(
+            moment.strftime(Consultation.FORMAT_DATE_HEURE), rng.choice(ssns), medecin, rng.choice(MOTIFS),
+            statut=statut, identifiant=f"{rng.getrandbits(128):032x}"
+        )
+        if statut == "réalisée":
+            consultation.diagnostic = rng.choice(DIAGNOSTICS)
+            consultation.prescriptions = [_prescription(rng) for _ in range(rng.choice((0, 1, 1, 2)))]
+        consultations.append(consultation)
+    registre = RegistreConsultations(consultations)
+    lier_consultations(patients, registre)
+    return registre
+
+
+def generer_cabinet(nb_patients, par_patient=4, graine=0):
+    """
+    Cabinet synthétique complet
+
+    Args:
+        nb_patients (int): Nombre de patients
+        par_patient (float, optional): Consultations par patient en moyenne. Par défaut 4
+        graine (int, optional): Graine du générateur. Par défaut 0
+
+    Returns:
+        tuple: (registre des patients, registre des consultations)
+    """
+    patients = generer_patients(nb_patients, graine)
+    return patients, generer_consultations(patients, par_patient, graine)
@@ -0,0 +1,269 @@
+"""
+Mesures de durée et de pic mémoire des opérations du cabinet sur des données synthétiques
+"""
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from models import Consultation, ConsultationConflictError
+from services.consultation_service import planifier_consultation
+from services.patient_service import (
+    rechercher_patient, rechercher_patients_par_nom, differer_persistance, annuler_mutations
+)
+from storage import StockageJSON
+from storage.loader import lier_consultations
+from utils import configurer_logs
+from .generateur import generer_cabinet, NOMS, PRENOMS, DEBUT_PERIODE
+
+# Appels par mesure pour les opérations unitaires (recherche, planification)
+APPELS_RECHERCHE = 10000
+APPELS_RECHERCHE_NOM = 1000
+APPELS_PLANIFICATION = 1000
+# Processus du chargement réparti (au moins deux pour qu'il ait lieu)
+PROCESSUS_CHARGEMENT = max(2, os.cpu_count() or 1)
+
+
+class Operation:
+    """
+    Opération mesurée
+
+    Attributs:
+        nom (str): Nom dans les résultats
+        appels (int): Nombre d'appels unitaires effectués par executer
+    """
+
+    def __init__(self, nom, preparer, executer, nettoyer=None, appels=1):
+        """
+        Args:
+            nom (str): Nom dans les résultats
+            preparer (callable): preparer() -> état passé à executer, hors mesure
+            executer (callable): executer(état), seule partie mesurée
+            nettoyer (callable, optional): nettoyer(état) après la mesure (remise en l'état)
+            appels (int, optional): Appels unitaires faits par executer. Par défaut 1
+        """
+        self.nom = nom
+        self.appels = appels
+        self._preparer = preparer
+        self._executer = executer
+        self._nettoyer = nettoyer
+
+    def mesurer(self, memoire=False):
+        """
+        Exécute l'opération une fois
+
+        Args:
+            memoire (bool, optional): Mesure aussi le pic mémoire (tracemalloc,
+                durée alors faussée). Par défaut False
+
+        Returns:
+            float ou int: Durée en secondes, ou pic mémoire en octets si memoire
+        """
+        etat = self._preparer()
+        gc.collect()
+        if memoire:
+            tracemalloc.start()
+            try:
+                self._executer(etat)
+                resultat = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+        else:
+            debut = time.perf_counter()
+            self._executer(etat)
+            resultat = time.perf_counter() - debut
+        if self._nettoyer is not None:
+            self._nettoyer(etat)
+        return resultat
+
+
+def _operations(patients, consultations, dossier, graine):
+    """Opérations mesurées sur un cabinet généré"""
+    # Un fichier par taille : le dossier est partagé par toutes les tailles mesurées
+    chemin = os.path.join(dossier, f"cabinet_data_{len(patients)}.json")
+    rng = random.Random(graine)
+    ssns = [p.ssn for p in patients]
+
+    def invalider_tout():
+        for p in patients:
+            p.invalider_serialisation()
+        for c in consultations:
+            c.invalider_serialisation()
+        return StockageJSON(chemin)
+
+    def preparer_chargement():
+        if not os.path.exists(chemin):
+            StockageJSON(chemin).sauvegarder(patients, consultations)
+        return StockageJSON(chemin, cache=False)
+
+    def preparer_chargement_parallele():
+        preparer_chargement()
+        return StockageJSON(chemin, cache=False, processus=PROCESSUS_CHARGEMENT)
+
+    def preparer_chargement_cache():
+        preparer_chargement()
+        stockage = StockageJSON(chemin)
+        stockage.point_de_controle(*stockage.charger()[:2])
+        return StockageJSON(chemin)
+
+    def preparer_incrementale():
+        stockage = StockageJSON(chemin)
+        stockage.sauvegarder(patients, consultations)
+        # 1 % des consultations modifiées depuis la dernière sauvegarde
+        for c in rng.sample(list(consultations), max(1, len(consultations) // 100)):
+            c.invalider_serialisation()
+        return stockage
+
+    def preparer_recherches():
+        return [rng.choice(ssns) for _ in range(APPELS_RECHERCHE)]
+
+    def rechercher(ssns_cherches):
+        for ssn in ssns_cherches:
+            rechercher_patient(patients, ssn)
+
+    def preparer_recherches_nom():
+        return [f"{rng.choice(NOMS)[:rng.randint(3, 6)]} {rng.choice(PRENOMS)[:3]}"
+                for _ in range(APPELS_RECHERCHE_NOM)]
+
+    def rechercher_noms(requetes):
+        for requete in requetes:
+            rechercher_patients_par_nom(patients, requete)
+
+    medecins = sorted({c.medecin for c in consultations})
+
+    def preparer_planifications():
+        demandes = []
+        for _ in range(APPELS_PLANIFICATION):
+            moment = DEBUT_PERIODE + timedelta(days=rng.randrange(3650), hours=8,
+                                               minutes=30 * rng.randrange(22))
+            demandes.append((patients.obtenir(rng.choice(ssns)),
+                             moment.strftime(Consultation.FORMAT_DATE_HEURE), rng.choice(medecins)))
+        return {"demandes": demandes, "lot": None}
+
+    def planifier(etat):
+        # Mémoire seulement : la persistance est mesurée par les sauvegardes
+        with differer_persistance() as lot:
+            etat["lot"] = lot
+            for patient, date_heure, medecin in etat["demandes"]:
+                try:
+                    planifier_consultation(consultations, patients, patient, date_heure, medecin, "Mesure")
+                except ConsultationConflictError:
+                    pass
+
+    return [
+        Operation("sauvegarde_complete", invalider_tout,
+                  lambda stockage: stockage.sauvegarder(patients, consultations)),
+        Operation("sauvegarde_incrementale", preparer_incrementale,
+                  lambda stockage: stockage.sauvegarder(patients, consultations)),
+        Operation("chargement", preparer_chargement, lambda stockage: stockage.charger()),
+        Operation("chargement_flux", preparer_chargement, lambda stockage: stockage.charger(flux=True)),
+        Operation("chargement_parallele", preparer_chargement_parallele, lambda stockage: stockage.charger()),
+        Operation("chargement_cache", preparer_chargement_cache, lambda stockage: stockage.charger()),
+        Operation("liaison", lambda: None, lambda _: lier_consultations(patients, consultations)),
+        Operation("recherche_ssn", preparer_recherches, rechercher, appels=APPELS_RECHERCHE),
+        Operation("recherche_nom", preparer_recherches_nom, rechercher_noms, appels=APPELS_RECHERCHE_NOM),
+        Operation("planification", preparer_planifications, planifier,
+                  nettoyer=lambda etat: annuler_mutations(etat["lot"]), appels=APPELS_PLANIFICATION),
+    ]
+
+
+def executer(tailles, repetitions=3, graine=0, par_patient=4, memoire=True, operations=None, afficher=print):
+    """
+    Mesure chaque opération pour chaque taille de cabinet
+
+    Args:
+        tailles (list): Nombres de patients (ex: [1000, 10000])
+        repetitions (int, optional): Mesures de durée par opération. Par défaut 3
+        graine (int, optional): Graine des données et des requêtes. Par défaut 0
+        par_patient (float, optional): Consultations par patient. Par défaut 4
+        memoire (bool, optional): Mesure aussi le pic mémoire (une exécution de plus). Par défaut True
+        operations (list, optional): Noms des opérations à mesurer. Par défaut toutes
+        afficher (callable, optional): Affichage de la progression. Par défaut print
+
+    Returns:
+        dict: {"meta": {...}, "resultats": [{taille, operation, ...}]}
+    """
+    resultats = []
+    with tempfile.TemporaryDirectory() as dossier:
+        # Les logs des services ne doivent pas fausser ni polluer les mesures
+        configurer_logs(os.path.join(dossier, "logs.txt"))
+        for taille in tailles:
+            debut = time.perf_counter()
+            patients, consultations = generer_cabinet(taille, par_patient, graine)
+            afficher(f"{taille} patients, {len(consultations)} consultations "
+                     f"générés en {time.perf_counter() - debut:.1f} s")
+            for operation in _operations(patients, consultations, dossier, graine):
+                if operations and operation.nom not in operations:
+                    continue
+                durees = [operation.mesurer() for _ in range(repetitions)]
+                resultat = {
+                    "taille": taille,
+                    "consultations": len(consultations),
+                    "operation": operation.nom,
+                    "appels": operation.appels,
+                    "min_s": min(durees),
+                    "mediane_s": statistics.median(durees),
+                    "par_appel_us": statistics.median(durees) / operation.appels * 1e6,
+                    "pic_memoire_octets": operation.mesurer(memoire=True) if memoire else None,
+                }
+                resultats.append(resultat)
+                afficher(f"  {operation.nom:<24} médiane {resultat['mediane_s'] * 1000:10.2f} ms"
+                         f"  ({resultat['par_appel_us']:.1f} µs/appel)"
+                         + (f"  pic {resultat['pic_memoire_octets'] / 2 ** 20:.1f} Mio" if memoire else ""))
+        configurer_logs()
+    return {
+        "meta": {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "plateforme": platform.platform(),
+            "processeur": platform.processor() or platform.machine(),
+            "graine": graine,
+            "repetitions": repetitions,
+            "consultations_par_patient": par_patient,
+        },
+        "resultats": resultats,
+    }
+
+
+def comparer(reference, actuel, seuil=0.2):
+    """
+    Compare deux séries de résultats sur les médianes
+
+    Args:
+        reference (dict): Résultats de référence (sortie de executer)
+        actuel (dict): Nouveaux résultats
+        seuil (float, optional): Ralentissement relatif signalé. Par défaut 0.2 (20 %)
+
+    Returns:
+        list: Lignes (taille, opération, médiane de référence, médiane actuelle,
+        rapport, régression ?) pour les mesures présentes des deux côtés
+    """
+    anciens = {(r["taille"], r["operation"]): r for r in reference["resultats"]}
+    lignes = []
+    for r in actuel["resultats"]:
+        ancien = anciens.get((r["taille"], r["operation"]))
+        if ancien is None:
+            continue
+        rapport = r["mediane_s"] / ancien["mediane_s"] if ancien["mediane_s"] else float("inf")
+        lignes.append((r["taille"], r["operation"], ancien["mediane_s"], r["mediane_s"],
+                       rapport, rapport > 1 + seuil))
+    return lignes
+
+
+def enregistrer(resultats, chemin):
+    """Écrit les résultats en JSON"""
+    with open(chemin, "w", encoding="utf-8") as f:
+        json.dump(resultats, f, ensure_ascii=False, indent=2)
+
+
+def lire(chemin):
+    """Relit des résultats écrits par enregistrer"""
+    with open(chemin, "r", encoding="utf-8") as f:
+        return json.load(f)
@@ -1,33 +1,107 @@
+import os
+
 from services.patient_service import (
-    charger_patients, ajouter_patient, rechercher_patient,
-    afficher_patients, afficher_historique_patient
+    DATA_FILE, activer_stockage, ajouter_patient, rechercher_patient,
+    rechercher_patients_par_nom, afficher_patients, afficher_historique_patient
 )
 from services.consultation_service import (
-    charger_consultations, planifier_consultation,
-    afficher_consultations_a_venir, marquer_consultation_realisee,
+    planifier_consultation, prochain_creneau_libre,
+    afficher_consultations_a_venir, afficher_agenda_du_jour, marquer_consultation_realisee,
     annuler_consultation
 )
+from storage import creer_stockage
+from utils import configurer_logs, mesurer, metriques
 from models import (
     PatientNotFoundError, ConsultationNotFoundError,
-    InvalidSecurityNumberError, InvalidConsultationStatusError
+    InvalidSecurityNumberError, InvalidConsultationStatusError,
+    ConsultationConflictError, ConcurrentWriteError
 )
 
+# Lignes affichées avant de demander la page suivante
+TAILLE_PAGE = 50
+
+
+def afficher_par_pages(afficher, total):
+    """
+    Affiche une liste page par page jusqu'à la fin ou à l'arrêt demandé
+    
+    Args:
+        afficher (callable): afficher(decalage, limite) -> nombre de lignes affichées
+        total (int): Nombre total de lignes
+    """
+    decalage = 0
+    while True:
+        affichees = afficher(decalage, TAILLE_PAGE)
+        decalage += affichees
+        if affichees < TAILLE_PAGE or decalage >= total:
+            break
+        suite = input(f"-- {decalage}/{total} -- Entrée : page suivante, q : arrêter ").strip().lower()
+        if suite == "q":
+            break
+
+
+def ouvrir_cabinet():
+    """
+    Charge les données selon la configuration d'environnement et active le stockage
+    
+    Returns:
+        tuple: (stockage, registre des patients, registre des consultations,
+        consultations orphelines)
+    """
+    # Chargement des données (une seule lecture, liens reconstruits) selon le mode de stockage
+    # ("json" : réécriture complète, "journal" : instantané + journal d'opérations,
+    #  "sqlite" : base indexée, "partitionne" : fichiers par préfixe de SSN et par mois ;
+    #  ces deux derniers sont créés depuis le JSON au premier lancement)
+    mode_stockage = os.environ.get("CABINET_STOCKAGE", "json")
+    flux = os.environ.get("CABINET_FLUX") == "1"
+    # Analyse d'un gros fichier JSON répartie sur plusieurs processus : CABINET_PROCESSUS=4
+    processus = int(os.environ.get("CABINET_PROCESSUS", "0")) or None
+    stockage = creer_stockage(mode_stockage, DATA_FILE, processus)
+    if os.environ.get("CABINET_LOGS_SYNCHRONES") == "1":
+        configurer_logs(asynchrone=False)
+    # Profilage optionnel : CABINET_PROFIL="Action 1,Action 2", CABINET_PROFIL_MODE=cprofile|tracemalloc
+    if os.environ.get("CABINET_PROFIL"):
+        metriques.configurer_profilage(
+            [a.strip() for a in os.environ["CABINET_PROFIL"].split(",")],
+            os.environ.get("CABINET_PROFIL_MODE", "cprofile")
+        )
+    patients, consultations, orphelines = mesurer("Chargement des données")(stockage.charger)(flux)
+    if mode_stockage in ("sqlite", "partitionne") and not patients and not consultations:
+        # Stockage vide : migration unique depuis le fichier JSON
+        from storage import StockageJSON, migrer
+        nb_patients, nb_consultations = migrer(StockageJSON(DATA_FILE), stockage, flux)
+        print(f"✓ Migration vers le stockage {mode_stockage} : "
+              f"{nb_patients} patient(s), {nb_consultations} consultation(s).")
+        patients, consultations, orphelines = stockage.charger()
+    activer_stockage(stockage)
+    return stockage, patients, consultations, orphelines
+
+
+def fermer_cabinet(stockage, patients, consultations):
+    """Consolide et ferme le stockage puis écrit l'instantané indexé"""
+    stockage.point_de_controle(patients, consultations)
+    stockage.fermer()
+    # Instantané indexé pour les outils de consultation en lecture seule
+    from storage.snapshot import chemin_instantane_indexe, ecrire_instantane_indexe
+    mesurer("Écriture de l'instantané indexé")(ecrire_instantane_indexe)(
+        chemin_instantane_indexe(DATA_FILE), patients, consultations)
+
 
 def main():
     """Programme principal de gestion du cabinet médical"""
     
-    # Chargement des données
-    patients = charger_patients()
-    consultations = charger_consultations()
+    stockage, patients, consultations, orphelines = ouvrir_cabinet()
     
-    # Reconstruction des liens patient-consultations
-    for consultation in consultations:
-        for patient in patients:
-            if patient.ssn == consultation.patient_ssn:
-                patient.ajouter_consultation(consultation)
-                break
+    if orphelines:
+        print(f"⚠ {len(orphelines)} consultation(s) sans patient correspondant :")
+        for c in orphelines:
+            print(f"  {c.patient_ssn} - {c}")
     
     while True:
+        # Postes partageant le même fichier : reprise de ce que les autres ont écrit
+        if stockage.actualiser(patients, consultations):
+            print("↻ Données mises à jour depuis un autre poste.")
+        
         print("\n" + "="*50)
         print("GESTION CABINET MÉDICAL")
         print("="*50)
@@ -40,6 +114,12 @@ def main():
         print("7. Marquer consultation réalisée")
         print("8. Annuler consultation")
         print("9. Quitter")
+        print("10. Statistiques de performance")
+        print("11. Agenda du jour")
+        print("12. Prochain créneau libre d'un médecin")
+        print("13. Import en masse (CSV/JSONL)")
+        print("14. Rechercher patient par nom")
+        print("15. Statistiques du cabinet")
         print("="*50)
         
         choix = input("Votre choix : ").strip()
@@ -66,12 +146,17 @@ def main():
                 print(f"  Téléphone : {p.telephone}")
                 
             elif choix == "3":
-                afficher_patients(patients)
+                tri = input("Trier par (vide = ordre d'ajout, nom, age, ssn) : ").strip().lower() or None
+                afficher_par_pages(
+                    lambda decalage, limite: afficher_patients(patients, tri, decalage, limite),
+                    len(patients))
                 
             elif choix == "4":
                 print("\n--- Historique patient ---")
                 ssn = input("Numéro sécu : ").strip()
-                afficher_historique_patient(patients, ssn)
+                afficher_par_pages(
+                    lambda decalage, limite: afficher_historique_patient(patients, ssn, decalage, limite),
+                    len(rechercher_patient(patients, ssn).consultations))
                 
             elif choix == "5":
                 print("\n--- Planifier une consultation ---")
@@ -89,9 +174,7 @@ def main():
                 
             elif choix == "7":
                 print("\n--- Marquer consultation réalisée ---")
-                afficher_consultations_a_venir(consultations)
-                
-                consultations_planifiees = [c for c in consultations if c.statut == "planifiée"]
+                consultations_planifiees = afficher_consultations_a_venir(consultations)
                 if not consultations_planifiees:
                     continue
                     
@@ -112,9 +195,7 @@ def main():
                 
             elif choix == "8":
                 print("\n--- Annuler une consultation ---")
-                afficher_consultations_a_venir(consultations)
-                
-                consultations_planifiees = [c for c in consultations if c.statut == "planifiée"]
+                consultations_planifiees = afficher_consultations_a_venir(consultations)
                 if not consultations_planifiees:
                     continue
                     
@@ -134,11 +215,69 @@ def main():
                 print("✓ Consultation annulée.")
                 
             elif choix == "9":
+                fermer_cabinet(stockage, patients, consultations)
                 print("\nAu revoir !")
                 break
                 
+            elif choix == "10":
+                print("\n--- Statistiques de performance ---")
+                rapport = metriques.rapport()
+                if not rapport:
+                    print("Aucune mesure pour le moment.")
+                for action, stats in rapport.items():
+                    print(f"{action} : {stats['appels']} appel(s), p50 {stats['p50_ms']} ms, "
+                          f"p95 {stats['p95_ms']} ms, p99 {stats['p99_ms']} ms, max {stats['max_ms']} ms")
+                fichiers = metriques.exporter("metriques.json")
+                print(f"✓ Rapport exporté dans metriques.json ({len(fichiers)} profil(s) .prof).")
+                
+            elif choix == "11":
+                afficher_agenda_du_jour(consultations)
+                
+            elif choix == "12":
+                print("\n--- Prochain créneau libre ---")
+                medecin = input("Nom du médecin : ").strip()
+                apres = input("À partir de (YYYY-MM-DD HH:MM) : ").strip()
+                duree_str = input("Durée en minutes (vide = 30) : ").strip()
+                duree = int(duree_str) if duree_str else None
+                creneau = prochain_creneau_libre(consultations, medecin, apres, duree)
+                print(f"✓ Prochain créneau libre pour Dr {medecin} : {creneau}")
+                
+            elif choix == "13":
+                print("\n--- Import en masse ---")
+                type_import = input("Importer (p)atients ou (c)onsultations : ").strip().lower()
+                chemin = input("Fichier CSV ou JSONL : ").strip()
+                from services.import_service import importer_patients, importer_consultations
+                if type_import.startswith("p"):
+                    rapport = importer_patients(patients, consultations, chemin)
+                elif type_import.startswith("c"):
+                    rapport = importer_consultations(patients, consultations, chemin)
+                else:
+                    print("✗ Erreur : Choisir p ou c.")
+                    continue
+                print(f"✓ Import terminé : {rapport}")
+                for numero, message in rapport.erreurs[:20]:
+                    print(f"  Ligne {numero} : {message}")
+                if len(rapport.erreurs) > 20:
+                    print(f"  ... et {len(rapport.erreurs) - 20} autre(s) erreur(s)")
+                
+            elif choix == "14":
+                print("\n--- Rechercher un patient par nom ---")
+                requete = input("Nom et/ou prénom : ").strip()
+                resultats = rechercher_patients_par_nom(patients, requete)
+                if not resultats:
+                    print("Aucun patient ne correspond.")
+                for p in resultats:
+                    print(f"{p.ssn} - {p.nom} {p.prenom} ({p.age} ans)")
+                
+            elif choix == "15":
+                print("\n--- Statistiques du cabinet ---")
+                debut = input("Depuis (YYYY-MM-DD, vide = début) : ").strip() or None
+                fin = input("Jusqu'au (YYYY-MM-DD exclu, vide = aucune limite) : ").strip() or None
+                from services.analyse_service import afficher_statistiques
+                afficher_statistiques(patients, consultations, debut, fin)
+                
             else:
-                print("✗ Choix invalide. Veuillez choisir entre 1 et 9.")
+                print("✗ Choix invalide. Veuillez choisir entre 1 et 15.")
                 
         except PatientNotFoundError as e:
             print(f"✗ Erreur : {e}")
@@ -146,6 +285,12 @@ def main():
             print(f"✗ Erreur : {e}")
         except InvalidConsultationStatusError as e:
             print(f"✗ Erreur : {e}")
+        except ConsultationConflictError as e:
+            print(f"✗ Erreur : {e}")
+        except ConcurrentWriteError as e:
+            print(f"✗ Conflit avec un autre poste : {e}")
+        except TimeoutError as e:
+            print(f"✗ Fichier occupé par un autre poste : {e}")
         except ValueError as e:
             print(f"✗ Erreur de format : {e}")
         except Exception as e:
@@ -1,6 +1,7 @@
 # Permet d'importer facilement toutes les classes depuis le package models
 from .patient import Patient
 from .consultation import Consultation
+from .registry import RegistrePatients, RegistreConsultations
 from .prescription import (
     Prescription,
     PrescriptionMedicamenteuse,
@@ -23,4 +24,16 @@ class InvalidSecurityNumberError(Exception):
 
 class InvalidConsultationStatusError(Exception):
     """Exception levée quand le statut de consultation est invalide"""
+    pass
+
+class ConsultationConflictError(Exception):
+    """Exception levée quand un médecin est déjà occupé sur le créneau demandé"""
+    pass
+
+class ConcurrentWriteError(Exception):
+    """Exception levée quand une écriture contredit celle d'un autre terminal"""
+    pass
+
+class ConflitModification(ConcurrentWriteError):
+    """Exception levée quand un même champ a reçu deux valeurs différentes sur deux terminaux"""
     pass
\ No newline at end of file
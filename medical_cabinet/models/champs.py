@@ -0,0 +1,29 @@
+"""
+Champs enregistrés des objets métier dont la forme JSON est mémorisée
+"""
+import operator
+
+
+def champ_persiste(nom, doc):
+    """
+    Propriété d'un champ écrit dans le fichier de données
+    
+    La valeur est rangée dans l'attribut "_<nom>" ; toute affectation oublie
+    la forme JSON mémorisée (_serialisation), pour que la prochaine sauvegarde
+    incrémentale réécrive l'objet. La lecture passe par operator.attrgetter
+    (implémenté en C), presque aussi rapide qu'un accès direct.
+    
+    Args:
+        nom (str): Nom public du champ
+        doc (str): Description du champ
+        
+    Returns:
+        property: Propriété à déclarer dans la classe
+    """
+    attribut = "_" + nom
+
+    def ecrire(objet, valeur):
+        setattr(objet, attribut, valeur)
+        objet._serialisation = None
+
+    return property(operator.attrgetter(attribut), ecrire, doc=doc)
@@ -1,20 +1,56 @@
+import sys
+from datetime import timedelta
+
+from utils.dates import lire_date_heure
+from .champs import champ_persiste
+
+
 class Consultation:
     """
     Classe représentant une consultation médicale
     
     Attributs:
         date_heure (str): Date et heure du rendez-vous
+        moment (datetime): Date et heure analysées (pour les tris et index)
         patient_ssn (str): Numéro de sécurité sociale du patient
         medecin (str): Nom du médecin
         motif (str): Motif de la consultation
         diagnostic (str): Diagnostic (None si non réalisée)
         prescriptions (list): Liste des prescriptions
         statut (str): Statut (planifiée, réalisée, annulée)
+        identifiant (str): Identifiant unique et stable de la consultation
+        duree (int): Durée prévue en minutes
+    
+    Les instances n'ont pas de __dict__ (__slots__) et les chaînes très
+    répétées (statut, médecin, SSN du patient) sont internées : toutes les
+    consultations d'un même médecin partagent la même chaîne.
+    
+    La forme JSON de la consultation est mémorisée par le stockage et oubliée
+    à chaque modification : affecter un champ modifiable (motif, diagnostic,
+    prescriptions, durée, statut) suffit ; date, patient, médecin et
+    identifiant sont fixés à la création (clés des index du registre).
+    Compléter la liste des prescriptions en place passe par ajouter_prescription.
     """
     
+    __slots__ = ("date_heure", "moment", "patient_ssn", "medecin", "_motif", "_diagnostic",
+                 "_prescriptions", "_statut", "identifiant", "_duree", "_serialisation")
+
+    motif = champ_persiste("motif", "Motif de la consultation")
+    diagnostic = champ_persiste("diagnostic", "Diagnostic (None si non renseigné)")
+    prescriptions = champ_persiste("prescriptions", "Liste des prescriptions")
+    duree = champ_persiste("duree", "Durée prévue en minutes")
+    
     STATUTS = ["planifiée", "réalisée", "annulée"]
+    # Machine à états : statuts atteignables depuis chaque statut
+    TRANSITIONS = {
+        "planifiée": ("réalisée", "annulée"),
+        "réalisée": (),
+        "annulée": ()
+    }
+    FORMAT_DATE_HEURE = "%Y-%m-%d %H:%M"
+    DUREE_PAR_DEFAUT = 30
 
-    def __init__(self, date_heure, patient_ssn, medecin, motif, diagnostic=None, prescriptions=None, statut="planifiée"):
+    def __init__(self, date_heure, patient_ssn, medecin, motif, diagnostic=None, prescriptions=None, statut="planifiée", identifiant=None, duree=None):
         """
         Initialise une consultation
         
@@ -26,14 +62,52 @@ class Consultation:
             diagnostic (str, optional): Diagnostic. Par défaut None
             prescriptions (list, optional): Liste de prescriptions. Par défaut None
             statut (str, optional): Statut. Par défaut "planifiée"
+            identifiant (str, optional): Identifiant. Généré si absent
+            duree (int, optional): Durée en minutes. Par défaut DUREE_PAR_DEFAUT
+            
+        Raises:
+            ValueError: Si date_heure n'est pas au format YYYY-MM-DD HH:MM
         """
         self.date_heure = date_heure
-        self.patient_ssn = patient_ssn
-        self.medecin = medecin
-        self.motif = motif
-        self.diagnostic = diagnostic
-        self.prescriptions = prescriptions if prescriptions else []
-        self.statut = statut
+        self.moment = lire_date_heure(date_heure)
+        self.patient_ssn = sys.intern(patient_ssn)
+        self.medecin = sys.intern(medecin)
+        self._motif = motif
+        self._diagnostic = diagnostic
+        self._prescriptions = prescriptions if prescriptions else []
+        self._statut = sys.intern(statut)
+        if not identifiant:
+            # Import différé : uuid (et platform) ne servent qu'aux nouvelles consultations
+            import uuid
+            identifiant = uuid.uuid4().hex
+        self.identifiant = identifiant
+        self._duree = duree if duree else self.DUREE_PAR_DEFAUT
+        self._serialisation = None
+
+    @property
+    def statut(self):
+        """Statut de la consultation (chaîne internée)"""
+        return self._statut
+
+    @statut.setter
+    def statut(self, statut):
+        """Setter pour le statut, qui réutilise la chaîne de STATUTS"""
+        self._statut = sys.intern(statut)
+        self._serialisation = None
+
+    @property
+    def fin(self):
+        """Date et heure de fin prévue"""
+        return self.moment + timedelta(minutes=self.duree)
+
+    @property
+    def modifiee(self):
+        """Indique si la consultation doit être resérialisée à la prochaine sauvegarde"""
+        return self._serialisation is None
+
+    def invalider_serialisation(self):
+        """Oublie la forme JSON mémorisée (à appeler après toute modification directe)"""
+        self._serialisation = None
 
     def ajouter_diagnostic(self, diagnostic):
         """
@@ -59,21 +133,28 @@ class Consultation:
         Args:
             prescription: Objet Prescription à ajouter
         """
-        self.prescriptions.append(prescription)
+        self._prescriptions.append(prescription)
+        self._serialisation = None
 
     def changer_statut(self, nouveau_statut):
         """
-        Change le statut de la consultation
+        Change le statut de la consultation selon la machine à états TRANSITIONS
         
         Args:
             nouveau_statut (str): Nouveau statut (planifiée, réalisée, annulée)
             
         Raises:
-            InvalidConsultationStatusError: Si le statut est invalide
+            InvalidConsultationStatusError: Si le statut est invalide ou
+                n'est pas atteignable depuis le statut actuel
         """
         if nouveau_statut not in self.STATUTS:
             from models import InvalidConsultationStatusError
             raise InvalidConsultationStatusError(f"Statut invalide : {nouveau_statut}")
+        if nouveau_statut not in self.TRANSITIONS[self.statut]:
+            from models import InvalidConsultationStatusError
+            raise InvalidConsultationStatusError(
+                f"Transition interdite : {self.statut} -> {nouveau_statut}"
+            )
         self.statut = nouveau_statut
 
     def __str__(self):
@@ -0,0 +1,263 @@
+import bisect
+import unicodedata
+from collections import Counter
+
+
+def plier(texte):
+    """
+    Forme de comparaison d'un texte : sans accents, sans casse
+    
+    Args:
+        texte (str): Texte à normaliser
+    
+    Returns:
+        str: Texte replié ("Éloïse" -> "eloise")
+    """
+    decompose = unicodedata.normalize("NFKD", texte)
+    return "".join(c for c in decompose if not unicodedata.combining(c)).casefold()
+
+
+def termes_plies(texte):
+    """Découpe un texte replié en mots (tirets, apostrophes et espaces séparent)"""
+    return "".join(c if c.isalnum() else " " for c in plier(texte)).split()
+
+
+def _trigrammes(terme):
+    """Trigrammes d'un terme encadré d'espaces ("ab" -> " ab", "ab ")"""
+    encadre = f" {terme} "
+    return {encadre[i:i + 3] for i in range(len(encadre) - 2)}
+
+
+def _tolerance(terme):
+    """Nombre de fautes de frappe admises selon la longueur du terme"""
+    if len(terme) < 4:
+        return 0
+    return 1 if len(terme) < 8 else 2
+
+
+def _distance_bornee(a, b, borne):
+    """Distance de Levenshtein entre a et b, ou borne + 1 si elle la dépasse"""
+    if abs(len(a) - len(b)) > borne:
+        return borne + 1
+    precedente = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        courante = [i]
+        for j, cb in enumerate(b, 1):
+            courante.append(min(precedente[j] + 1, courante[j - 1] + 1,
+                                precedente[j - 1] + (ca != cb)))
+        if min(courante) > borne:
+            return borne + 1
+        precedente = courante
+    return precedente[-1]
+
+
+class IndexNoms:
+    """
+    Index de recherche des patients par nom et prénom
+    
+    Les noms sont repliés (accents et casse) et découpés en termes. Chaque
+    terme distinct est rangé dans une liste triée, parcourue par dichotomie
+    pour la recherche par préfixe (équivalent compact d'un trie), et dans un
+    index de trigrammes pour tolérer les fautes de frappe. L'index est tenu
+    à jour patient par patient.
+    
+    Attributs:
+        _patients_par_terme (dict): Terme -> ensemble des patients qui le portent
+        _termes (list): Termes distincts triés
+        _en_attente (list): Nouveaux termes pas encore insérés dans _termes
+        _par_trigramme (dict): Trigramme -> ensemble des termes qui le contiennent
+    """
+
+    # Au-delà, les termes en attente sont fusionnés par un tri plutôt qu'un à un
+    _SEUIL_TRI = 64
+
+    def __init__(self):
+        self._patients_par_terme = {}
+        self._termes = []
+        self._en_attente = []
+        self._par_trigramme = {}
+
+    @staticmethod
+    def _termes_du_patient(patient):
+        return termes_plies(f"{patient.nom} {patient.prenom}")
+
+    def ajouter(self, patient):
+        """Indexe le nom et le prénom d'un patient"""
+        for terme in self._termes_du_patient(patient):
+            porteurs = self._patients_par_terme.get(terme)
+            if porteurs is None:
+                porteurs = self._patients_par_terme[terme] = set()
+                self._en_attente.append(terme)
+                for trigramme in _trigrammes(terme):
+                    self._par_trigramme.setdefault(trigramme, set()).add(terme)
+            porteurs.add(patient)
+
+    def retirer(self, patient):
+        """Retire un patient de l'index"""
+        for terme in self._termes_du_patient(patient):
+            porteurs = self._patients_par_terme.get(terme)
+            if porteurs is None:
+                continue
+            porteurs.discard(patient)
+            if porteurs:
+                continue
+            del self._patients_par_terme[terme]
+            self._ranger()
+            del self._termes[bisect.bisect_left(self._termes, terme)]
+            for trigramme in _trigrammes(terme):
+                self._par_trigramme[trigramme].discard(terme)
+
+    def _ranger(self):
+        """Insère les termes en attente dans la liste triée"""
+        if not self._en_attente:
+            return
+        if len(self._en_attente) < self._SEUIL_TRI:
+            for terme in self._en_attente:
+                bisect.insort(self._termes, terme)
+        else:
+            self._termes.extend(self._en_attente)
+            self._termes.sort()
+        self._en_attente = []
+
+    def _bornes_prefixe(self, prefixe):
+        """Positions [debut, fin[ des termes commençant par prefixe dans _termes"""
+        debut = bisect.bisect_left(self._termes, prefixe)
+        return debut, bisect.bisect_left(self._termes, prefixe + "\U0010ffff", debut)
+
+    def _proches(self, terme):
+        """
+        Termes à distance d'édition tolérée de terme
+        
+        Returns:
+            dict: Terme indexé -> distance d'édition
+        """
+        tolerance = _tolerance(terme)
+        if not tolerance:
+            return {}
+        trigrammes = _trigrammes(terme)
+        communs = Counter()
+        for trigramme in trigrammes:
+            communs.update(self._par_trigramme.get(trigramme, ()))
+        # Une faute modifie au plus trois trigrammes
+        proches = {}
+        for candidat, nombre in communs.items():
+            if nombre >= max(len(trigrammes), len(candidat)) - 3 * tolerance:
+                distance = _distance_bornee(terme, candidat, tolerance)
+                if distance <= tolerance:
+                    proches[candidat] = distance
+        return proches
+
+    def _termes_candidats(self, terme, bornes, proches):
+        """
+        Termes indexés correspondant à un mot de requête, du plus au moins pertinent
+        
+        Yields:
+            tuple: (terme indexé, qualité) avec 0 = identique, 1 = début de mot,
+            2 et plus = faute(s) de frappe
+        """
+        debut, fin = bornes
+        for position in range(debut, fin):
+            candidat = self._termes[position]
+            yield candidat, 0 if candidat == terme else 1
+        for candidat, distance in sorted(proches.items(), key=lambda e: (e[1], e[0])):
+            yield candidat, 1 + distance
+
+    @staticmethod
+    def _qualite(terme_patient, terme, proches):
+        """Qualité de la correspondance d'un mot du patient avec un mot de requête, ou None"""
+        if terme_patient.startswith(terme):
+            return 0 if terme_patient == terme else 1
+        distance = proches.get(terme_patient)
+        return None if distance is None else 1 + distance
+
+    def rechercher(self, requete, limite=10):
+        """
+        Recherche les patients dont le nom et le prénom correspondent à la requête
+        
+        Chaque mot de la requête doit correspondre à un mot du nom ou du prénom,
+        exactement, comme début de mot, ou à une faute de frappe près (les
+        fautes ne sont envisagées que pour un mot absent de l'index).
+        
+        Args:
+            requete (str): Texte saisi (ex: "dup jea", "Lefebre")
+            limite (int, optional): Nombre maximal de résultats. Par défaut 10
+        
+        Returns:
+            list: Patients classés du plus pertinent au moins pertinent
+        """
+        termes = termes_plies(requete)
+        if not termes or limite <= 0:
+            return []
+        self._ranger()
+        bornes = [self._bornes_prefixe(terme) for terme in termes]
+        proches = [{} if terme in self._patients_par_terme else self._proches(terme) for terme in termes]
+        effectifs = [self._effectif(b, p) for b, p in zip(bornes, proches)]
+        if not all(effectifs):
+            return []
+
+        # Le mot de requête le plus sélectif fournit les candidats, dans l'ordre
+        # de pertinence ; les autres mots sont vérifiés sur chaque candidat
+        pilote = min(range(len(termes)), key=lambda i: effectifs[i])
+        autres = [(termes[i], proches[i]) for i in range(len(termes)) if i != pilote]
+        # Meilleure qualité que peuvent atteindre les autres mots
+        meilleur = sum(0 if t in self._patients_par_terme else (1 if not p else 1 + min(p.values()))
+                       for t, p in autres)
+        tous_exacts = all(t in self._patients_par_terme for t, _ in autres)
+
+        resultats = {}
+        parfaits = 0
+        for terme, qualite in self._termes_candidats(termes[pilote], bornes[pilote], proches[pilote]):
+            porteurs = self._patients_par_terme[terme]
+            if autres and tous_exacts:
+                # Correspondances parfaites par appartenance aux ensembles des autres mots
+                ensembles = [self._patients_par_terme[t] for t, _ in autres]
+                for patient in porteurs:
+                    if patient not in resultats and all(patient in e for e in ensembles):
+                        resultats[patient] = qualite
+                        parfaits += 1
+                        if parfaits >= limite:
+                            break
+                if parfaits >= limite:
+                    break
+            for patient in porteurs:
+                if patient in resultats:
+                    continue
+                score = self._score(patient, autres)
+                if score is None:
+                    continue
+                resultats[patient] = qualite + score
+                # Aucun candidat suivant ne peut faire mieux que qualite + meilleur
+                if score == meilleur:
+                    parfaits += 1
+                    if parfaits >= limite:
+                        break
+            if parfaits >= limite:
+                break
+        classes = sorted(resultats, key=lambda p: (resultats[p], plier(p.nom), plier(p.prenom), p.ssn))
+        return classes[:limite]
+
+    def _effectif(self, bornes, proches, plafond=64):
+        """Nombre de patients portant un terme candidat (estimé au-delà de plafond termes)"""
+        debut, fin = bornes
+        termes = list(proches)
+        if fin - debut > plafond:
+            return (fin - debut) * len(self._patients_par_terme[self._termes[debut]]) + 1
+        termes.extend(self._termes[debut:fin])
+        return sum(len(self._patients_par_terme[t]) for t in termes)
+
+    def _score(self, patient, autres):
+        """Somme des meilleures qualités des autres mots de requête sur ce patient, ou None"""
+        if not autres:
+            return 0
+        termes_patient = self._termes_du_patient(patient)
+        score = 0
+        for terme, proches in autres:
+            qualites = [q for q in (self._qualite(t, terme, proches) for t in termes_patient) if q is not None]
+            if not qualites:
+                return None
+            score += min(qualites)
+        return score
+
+    def __len__(self):
+        """Nombre de termes distincts indexés"""
+        return len(self._patients_par_terme)
@@ -1,5 +1,7 @@
-from datetime import datetime, date
+from datetime import date
 from utils.validators import validate_ssn
+from utils.dates import lire_date
+from .champs import champ_persiste
 
 
 class Patient:
@@ -14,8 +16,20 @@ class Patient:
         adresse (str): Adresse du patient
         telephone (str): Numéro de téléphone
         consultations (list): Liste des consultations du patient
+    
+    Les instances n'ont pas de __dict__ (__slots__) pour réduire l'empreinte mémoire.
+    La forme JSON du patient est mémorisée par le stockage et oubliée à chaque
+    modification : affecter un champ enregistré suffit (voir champ_persiste).
     """
     
+    __slots__ = ("_ssn", "_nom", "_prenom", "_date_naissance", "_adresse", "_telephone", "consultations",
+                 "_serialisation")
+
+    nom = champ_persiste("nom", "Nom du patient")
+    prenom = champ_persiste("prenom", "Prénom du patient")
+    date_naissance = champ_persiste("date_naissance", "Date de naissance (date)")
+    adresse = champ_persiste("adresse", "Adresse du patient")
+    
     def __init__(self, ssn, nom, prenom, date_naissance, adresse, telephone):
         """
         Initialise un patient
@@ -36,18 +50,19 @@ class Patient:
             raise InvalidSecurityNumberError(f"Numéro de sécurité sociale invalide : {ssn}")
         
         self._ssn = ssn  # attribut sensible
-        self.nom = nom
-        self.prenom = prenom
+        self._nom = nom
+        self._prenom = prenom
         
         # Conversion de la date de naissance si c'est un string
         if isinstance(date_naissance, str):
-            self.date_naissance = datetime.strptime(date_naissance, "%Y-%m-%d").date()
+            self._date_naissance = lire_date(date_naissance)
         else:
-            self.date_naissance = date_naissance
+            self._date_naissance = date_naissance
             
-        self.adresse = adresse
+        self._adresse = adresse
         self._telephone = telephone  # attribut sensible
         self.consultations = []
+        self._serialisation = None
 
     @property
     def ssn(self):
@@ -63,13 +78,34 @@ class Patient:
     def telephone(self, new_number):
         """Setter pour le téléphone"""
         self._telephone = new_number
+        self._serialisation = None
+
+    @property
+    def modifie(self):
+        """Indique si le patient doit être resérialisé à la prochaine sauvegarde"""
+        return self._serialisation is None
+
+    def invalider_serialisation(self):
+        """Oublie la forme JSON mémorisée (à appeler après toute modification directe)"""
+        self._serialisation = None
 
     @property
     def age(self):
         """Calcule automatiquement l'âge du patient"""
-        today = date.today()
-        return today.year - self.date_naissance.year - (
-            (today.month, today.day) < (self.date_naissance.month, self.date_naissance.day)
+        return self.age_le(date.today())
+
+    def age_le(self, jour):
+        """
+        Âge du patient à une date donnée
+        
+        Args:
+            jour (date): Date de référence (calculée une fois pour toute une liste)
+            
+        Returns:
+            int: Âge en années
+        """
+        return jour.year - self.date_naissance.year - (
+            (jour.month, jour.day) < (self.date_naissance.month, self.date_naissance.day)
         )
 
     def ajouter_consultation(self, consultation):
@@ -81,11 +117,40 @@ class Patient:
         """
         self.consultations.append(consultation)
 
-    def afficher_historique(self):
-        """Affiche toutes les consultations du patient"""
+    def lignes_historique(self, decalage=0, limite=None):
+        """
+        Lignes de l'historique produites à la demande
+        
+        Args:
+            decalage (int, optional): Consultations sautées. Par défaut 0
+            limite (int, optional): Nombre maximal de lignes. Par défaut toutes
+            
+        Yields:
+            str: Une consultation formatée
+        """
+        from utils.rendu import page
+        for c in page(self.consultations, decalage, limite):
+            yield str(c)
+
+    def afficher_historique(self, decalage=0, limite=None, sortie=None):
+        """
+        Affiche les consultations du patient, par blocs
+        
+        Args:
+            decalage (int, optional): Consultations sautées. Par défaut 0
+            limite (int, optional): Nombre maximal de lignes. Par défaut toutes
+            sortie (SortieTamponnee, optional): Destination. Par défaut la sortie standard
+            
+        Returns:
+            int: Nombre de consultations affichées
+        """
+        from utils.rendu import SortieTamponnee
         if not self.consultations:
             print("Aucune consultation pour ce patient.")
-        else:
-            print(f"\n--- Historique de {self.prenom} {self.nom} ---")
-            for c in self.consultations:
-                print(c)
\ No newline at end of file
+            return 0
+        sortie = sortie if sortie is not None else SortieTamponnee()
+        if decalage == 0:
+            sortie.ecrire(f"\n--- Historique de {self.prenom} {self.nom} ---")
+        affichees = sortie.ecrire_lignes(self.lignes_historique(decalage, limite))
+        sortie.vider()
+        return affichees
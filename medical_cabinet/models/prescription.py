@@ -8,8 +8,12 @@ class Prescription(ABC):
     Attributs:
         posologie (str): Posologie du traitement
         duree (str): Durée du traitement
+    
+    La hiérarchie utilise __slots__ (pas de __dict__ par instance).
     """
     
+    __slots__ = ("posologie", "duree")
+    
     def __init__(self, posologie, duree):
         """
         Initialise une prescription
@@ -43,6 +47,8 @@ class PrescriptionMedicamenteuse(Prescription):
         duree (str): Durée du traitement
     """
     
+    __slots__ = ("medicament", "frequence")
+    
     def __init__(self, medicament, posologie, frequence, duree):
         """
         Initialise une prescription médicamenteuse
@@ -72,6 +78,8 @@ class PrescriptionExamen(Prescription):
         laboratoire (str): Laboratoire recommandé
     """
     
+    __slots__ = ("type_examen", "laboratoire")
+    
     def __init__(self, type_examen, laboratoire, posologie="", duree=""):
         """
         Initialise une prescription d'examen
@@ -100,6 +108,8 @@ class PrescriptionKinesitherapie(Prescription):
         zone (str): Zone à traiter
     """
     
+    __slots__ = ("nb_seances", "zone")
+    
     def __init__(self, nb_seances, zone, posologie="", duree=""):
         """
         Initialise une prescription de kinésithérapie
@@ -0,0 +1,537 @@
+import bisect
+import heapq
+import itertools
+from datetime import date, datetime, time, timedelta
+
+from .name_index import IndexNoms
+
+
+class RegistrePatients:
+    """
+    Collection de patients indexée par numéro de sécurité sociale
+    
+    Remplace la liste de patients : recherche, insertion et test d'existence
+    en O(1), itération dans l'ordre d'insertion, recherche par nom indexée.
+    
+    Attributs:
+        _par_ssn (dict): Patients indexés par SSN (ordre d'insertion conservé)
+        _index_noms (IndexNoms): Index des noms et prénoms repliés
+    """
+
+    def __init__(self, patients=None):
+        """
+        Initialise le registre
+        
+        Args:
+            patients (iterable, optional): Patients initiaux. Par défaut aucun
+        """
+        self._par_ssn = {}
+        self._index_noms = IndexNoms()
+        for patient in patients or []:
+            self.ajouter(patient)
+
+    def ajouter(self, patient):
+        """
+        Ajoute un patient au registre
+        
+        Args:
+            patient (Patient): Patient à ajouter
+            
+        Raises:
+            InvalidSecurityNumberError: Si le SSN est déjà enregistré
+        """
+        if patient.ssn in self._par_ssn:
+            from models import InvalidSecurityNumberError
+            raise InvalidSecurityNumberError("Numéro de sécurité sociale déjà utilisé.")
+        self._par_ssn[patient.ssn] = patient
+        self._index_noms.ajouter(patient)
+
+    # Compatibilité avec le code qui manipulait une liste
+    append = ajouter
+
+    def retirer(self, ssn):
+        """
+        Retire un patient du registre (annulation d'un ajout)
+        
+        Args:
+            ssn (str): Numéro de sécurité sociale
+        """
+        self._index_noms.retirer(self._par_ssn.pop(ssn))
+
+    def actualiser(self, patient, source):
+        """
+        Recopie dans un patient du registre les champs d'une autre version du même patient
+        
+        Args:
+            patient (Patient): Patient du registre
+            source (Patient): Version à recopier (ex: relue sur le disque)
+        """
+        self._index_noms.retirer(patient)
+        patient.nom = source.nom
+        patient.prenom = source.prenom
+        patient.date_naissance = source.date_naissance
+        patient.adresse = source.adresse
+        patient.telephone = source.telephone
+        self._index_noms.ajouter(patient)
+
+    def obtenir(self, ssn):
+        """
+        Retourne le patient correspondant au SSN
+        
+        Args:
+            ssn (str): Numéro de sécurité sociale
+            
+        Returns:
+            Patient: Le patient, ou None s'il n'existe pas
+        """
+        return self._par_ssn.get(ssn)
+
+    def rechercher_nom(self, requete, limite=10):
+        """
+        Recherche des patients par nom et prénom (sans accents ni casse,
+        début de mot accepté, fautes de frappe tolérées)
+        
+        Args:
+            requete (str): Texte saisi, ex: "dupont jea"
+            limite (int, optional): Nombre maximal de résultats. Par défaut 10
+            
+        Returns:
+            list: Patients classés par pertinence
+        """
+        return self._index_noms.rechercher(requete, limite)
+
+    def __contains__(self, ssn):
+        """Teste l'existence d'un SSN dans le registre"""
+        return ssn in self._par_ssn
+
+    def __iter__(self):
+        """Itère sur les patients dans l'ordre d'insertion"""
+        return iter(self._par_ssn.values())
+
+    def __len__(self):
+        """Nombre de patients enregistrés"""
+        return len(self._par_ssn)
+
+
+def _cle_chronologique(consultation):
+    """Clé de tri des index : date/heure, puis identifiant pour départager"""
+    return (consultation.moment, consultation.identifiant)
+
+
+class _IndexChronologique:
+    """
+    Consultations triées par date/heure (puis identifiant)
+    
+    Insertion et retrait par recherche dichotomique ; une plage de dates
+    se lit en O(log n + k). La clé est recalculée à la volée (bisect key=)
+    pour ne pas stocker de tuple par consultation.
+    """
+
+    __slots__ = ("_consultations",)
+
+    def __init__(self):
+        self._consultations = []
+
+    def ajouter(self, consultation):
+        bisect.insort(self._consultations, consultation, key=_cle_chronologique)
+
+    def etendre(self, consultations):
+        """Ajoute un lot de consultations en un seul tri (O(n log n) au lieu de O(n²))"""
+        self._consultations.extend(consultations)
+        self._consultations.sort(key=_cle_chronologique)
+
+    def _trouver(self, consultation):
+        """Position de la consultation dans l'index, ou None"""
+        position = bisect.bisect_left(self._consultations, _cle_chronologique(consultation),
+                                      key=_cle_chronologique)
+        if position < len(self._consultations) and self._consultations[position] is consultation:
+            return position
+        return None
+
+    def retirer(self, consultation):
+        del self._consultations[self._trouver(consultation)]
+
+    def _position(self, moment, gauche=0):
+        return bisect.bisect_left(self._consultations, (moment,), gauche, key=_cle_chronologique)
+
+    def plage(self, debut=None, fin=None):
+        """Consultations avec debut <= moment < fin (bornes optionnelles)"""
+        gauche = 0 if debut is None else self._position(debut)
+        droite = len(self._consultations) if fin is None else self._position(fin, gauche)
+        for position in range(gauche, droite):
+            yield self._consultations[position]
+
+    def __len__(self):
+        return len(self._consultations)
+
+
+class _PartitionStatut(_IndexChronologique):
+    """
+    Index chronologique des consultations d'un statut donné
+    
+    Une consultation qui change de statut n'est pas retirée tout de suite :
+    elle devient obsolète (son statut ne correspond plus) et est ignorée à
+    la lecture. La machine à états interdit tout retour vers un statut
+    quitté, et la liste est compactée dès que les obsolètes dépassent la
+    moitié : le retrait coûte O(1) amorti et une lecture reste
+    proportionnelle au résultat.
+    """
+
+    __slots__ = ("statut", "_obsoletes")
+
+    def __init__(self, statut):
+        super().__init__()
+        self.statut = statut
+        self._obsoletes = 0
+
+    def retirer(self, consultation):
+        self._obsoletes += 1
+        if self._obsoletes * 2 > len(self._consultations):
+            self._consultations = [c for c in self._consultations if c.statut == self.statut]
+            self._obsoletes = 0
+
+    def supprimer(self, consultation):
+        """Retire immédiatement une consultation qui a encore ce statut"""
+        _IndexChronologique.retirer(self, consultation)
+
+    def restaurer(self, consultation):
+        """Réintègre une consultation revenue à ce statut (annulation d'une transition)"""
+        if self._trouver(consultation) is not None:
+            # Encore présente comme obsolète : elle redevient valide
+            self._obsoletes -= 1
+        else:
+            self.ajouter(consultation)
+
+    def plage(self, debut=None, fin=None):
+        for consultation in super().plage(debut, fin):
+            if consultation.statut == self.statut:
+                yield consultation
+
+    def __len__(self):
+        return len(self._consultations) - self._obsoletes
+
+
+class _AgendaMedecin(_IndexChronologique):
+    """
+    Créneaux occupés d'un médecin (consultations non annulées) triés par début
+    
+    Les créneaux acceptés par conflit() ne se chevauchent pas, mais des
+    données anciennes chargées telles quelles le peuvent : une vérification
+    remonte donc tous les créneaux commencés moins d'une durée maximale
+    avant l'instant demandé (un ou deux en pratique), seuls à pouvoir
+    encore être en cours.
+    """
+
+    __slots__ = ("_duree_max",)
+
+    def __init__(self):
+        super().__init__()
+        # Plus longue durée (minutes) vue dans l'agenda, jamais diminuée
+        self._duree_max = 0
+
+    def ajouter(self, consultation):
+        super().ajouter(consultation)
+        self._duree_max = max(self._duree_max, consultation.duree)
+
+    def etendre(self, consultations):
+        super().etendre(consultations)
+        self._duree_max = max([self._duree_max] + [c.duree for c in consultations])
+
+    def _en_cours(self, instant, position):
+        """Créneaux commencés avant position pouvant durer jusqu'après instant"""
+        limite = instant - timedelta(minutes=self._duree_max)
+        for precedent in range(position - 1, -1, -1):
+            consultation = self._consultations[precedent]
+            if consultation.moment <= limite:
+                return
+            if consultation.fin > instant:
+                yield consultation
+
+    def conflit(self, debut, fin):
+        """Retourne une consultation chevauchant [debut, fin[, ou None"""
+        position = self._position(debut)
+        for consultation in self._en_cours(debut, position):
+            return consultation
+        if position < len(self._consultations) and self._consultations[position].moment < fin:
+            return self._consultations[position]
+        return None
+
+    def prochain_creneau_libre(self, apres, duree):
+        """Premier instant >= apres laissant duree libre avant le créneau suivant"""
+        candidat = apres
+        position = self._position(apres)
+        for consultation in self._en_cours(apres, position):
+            candidat = max(candidat, consultation.fin)
+        for consultation in itertools.islice(self._consultations, position, None):
+            if consultation.moment >= candidat + duree:
+                break
+            candidat = max(candidat, consultation.fin)
+        return candidat
+
+
+class RegistreConsultations:
+    """
+    Collection de consultations indexée par identifiant et par date, partitionnée par statut
+    
+    Remplace la liste de consultations : l'itération suit l'ordre d'insertion,
+    et chaque statut dispose de son propre index chronologique pour répondre
+    aux requêtes « prochaines consultations », « entre deux dates » et
+    « agenda du jour » en O(log n + k). Chaque médecin dispose d'un agenda
+    de ses créneaux non annulés pour détecter les conflits de planification.
+    
+    Les changements de statut doivent passer par changer_statut pour que
+    les partitions restent à jour.
+    
+    Attributs:
+        _par_identifiant (dict): Consultations indexées par identifiant (ordre d'insertion)
+        _par_statut (dict): Statut -> _PartitionStatut
+        _par_medecin (dict): Médecin -> _AgendaMedecin
+    """
+
+    def __init__(self, consultations=None):
+        """
+        Initialise le registre
+        
+        Args:
+            consultations (iterable, optional): Consultations initiales. Par défaut aucune
+        """
+        from models import Consultation
+        self._par_identifiant = {}
+        self._par_statut = {statut: _PartitionStatut(statut) for statut in Consultation.STATUTS}
+        self._par_medecin = {}
+        if consultations:
+            self._ajouter_lot(consultations)
+
+    def _ajouter_lot(self, consultations):
+        """
+        Indexe les consultations initiales : chaque index est trié une fois
+        plutôt qu'inséré consultation par consultation (insertions en milieu
+        de liste, quadratiques sur un gros fichier)
+        """
+        par_statut = {statut: [] for statut in self._par_statut}
+        par_medecin = {}
+        for consultation in consultations:
+            if consultation.identifiant in self._par_identifiant:
+                raise ValueError(f"Consultation {consultation.identifiant} déjà enregistrée.")
+            self._par_identifiant[consultation.identifiant] = consultation
+            par_statut[consultation.statut].append(consultation)
+            if consultation.statut != "annulée":
+                par_medecin.setdefault(consultation.medecin, []).append(consultation)
+        for statut, lot in par_statut.items():
+            self._par_statut[statut].etendre(lot)
+        for medecin, lot in par_medecin.items():
+            self._agenda(medecin).etendre(lot)
+
+    def ajouter(self, consultation):
+        """
+        Ajoute une consultation au registre
+        
+        Args:
+            consultation (Consultation): Consultation à ajouter
+            
+        Raises:
+            ValueError: Si l'identifiant est déjà enregistré
+        """
+        if consultation.identifiant in self._par_identifiant:
+            raise ValueError(f"Consultation {consultation.identifiant} déjà enregistrée.")
+        self._par_identifiant[consultation.identifiant] = consultation
+        self._par_statut[consultation.statut].ajouter(consultation)
+        if consultation.statut != "annulée":
+            self._agenda(consultation.medecin).ajouter(consultation)
+
+    # Compatibilité avec le code qui manipulait une liste
+    append = ajouter
+
+    def changer_statut(self, consultation, nouveau_statut):
+        """
+        Applique une transition de statut et met à jour les partitions
+        
+        Coût O(1) amorti pour quitter l'ancienne partition ; l'insertion dans
+        la nouvelle est dichotomique (en fin de liste pour les dates récentes).
+        
+        Args:
+            consultation (Consultation): Consultation du registre
+            nouveau_statut (str): Nouveau statut
+            
+        Raises:
+            InvalidConsultationStatusError: Si la transition est interdite
+        """
+        ancien_statut = consultation.statut
+        consultation.changer_statut(nouveau_statut)
+        self._par_statut[ancien_statut].retirer(consultation)
+        self._par_statut[nouveau_statut].ajouter(consultation)
+        # Une consultation annulée libère le créneau du médecin
+        if nouveau_statut == "annulée":
+            self._agenda(consultation.medecin).retirer(consultation)
+
+    def retirer(self, consultation):
+        """
+        Retire une consultation du registre (annulation d'un ajout)
+        
+        Args:
+            consultation (Consultation): Consultation du registre
+        """
+        del self._par_identifiant[consultation.identifiant]
+        self._par_statut[consultation.statut].supprimer(consultation)
+        if consultation.statut != "annulée":
+            self._agenda(consultation.medecin).retirer(consultation)
+
+    def restaurer_statut(self, consultation, ancien_statut):
+        """
+        Rétablit le statut précédent d'une consultation, hors machine à états
+        
+        Réservé à l'annulation d'une transaction (voir services.transaction)
+        et à la reprise du statut écrit par un autre terminal (voir StockageJSON).
+        
+        Args:
+            consultation (Consultation): Consultation du registre
+            ancien_statut (str): Statut à rétablir
+        """
+        statut_actuel = consultation.statut
+        self._par_statut[statut_actuel].supprimer(consultation)
+        consultation.statut = ancien_statut
+        self._par_statut[ancien_statut].restaurer(consultation)
+        if statut_actuel == "annulée" and ancien_statut != "annulée":
+            self._agenda(consultation.medecin).ajouter(consultation)
+        elif ancien_statut == "annulée" and statut_actuel != "annulée":
+            self._agenda(consultation.medecin).retirer(consultation)
+
+    def _agenda(self, medecin):
+        agenda = self._par_medecin.get(medecin)
+        if agenda is None:
+            agenda = self._par_medecin[medecin] = _AgendaMedecin()
+        return agenda
+
+    def conflit(self, medecin, debut, duree):
+        """
+        Cherche une consultation du médecin chevauchant le créneau demandé
+        
+        Args:
+            medecin (str): Nom du médecin
+            debut (datetime): Début du créneau
+            duree (int): Durée en minutes
+            
+        Returns:
+            Consultation: Une consultation en conflit, ou None si le créneau est libre
+        """
+        agenda = self._par_medecin.get(medecin)
+        if agenda is None:
+            return None
+        return agenda.conflit(debut, debut + timedelta(minutes=duree))
+
+    def prochain_creneau_libre(self, medecin, apres, duree):
+        """
+        Premier créneau libre d'un médecin à partir d'un instant
+        
+        Args:
+            medecin (str): Nom du médecin
+            apres (datetime): Instant de départ
+            duree (int): Durée souhaitée en minutes
+            
+        Returns:
+            datetime: Début du premier créneau libre de cette durée
+        """
+        agenda = self._par_medecin.get(medecin)
+        if agenda is None:
+            return apres
+        return agenda.prochain_creneau_libre(apres, timedelta(minutes=duree))
+
+    def obtenir(self, identifiant):
+        """
+        Retourne la consultation correspondant à l'identifiant
+        
+        Args:
+            identifiant (str): Identifiant de la consultation
+            
+        Returns:
+            Consultation: La consultation, ou None si elle n'existe pas
+        """
+        return self._par_identifiant.get(identifiant)
+
+    def par_statut(self, statut, debut=None, fin=None):
+        """
+        Consultations d'un statut par ordre chronologique
+        
+        Args:
+            statut (str): Statut recherché
+            debut (datetime, optional): Borne incluse. Par défaut aucune
+            fin (datetime, optional): Borne exclue. Par défaut aucune
+            
+        Returns:
+            list: Consultations triées par date/heure
+        """
+        return list(self._par_statut[statut].plage(debut, fin))
+
+    def prochaines(self, n=None, apres=None):
+        """
+        Prochaines consultations planifiées
+        
+        Args:
+            n (int, optional): Nombre maximal de résultats. Par défaut toutes
+            apres (datetime, optional): Instant de départ. Par défaut maintenant
+            
+        Returns:
+            list: Consultations planifiées à partir de l'instant, triées
+        """
+        if apres is None:
+            apres = datetime.now()
+        return list(itertools.islice(self._par_statut["planifiée"].plage(apres), n))
+
+    def entre(self, debut, fin, statut=None):
+        """
+        Consultations dont la date/heure est dans [debut, fin[
+        
+        Args:
+            debut (datetime): Borne incluse
+            fin (datetime): Borne exclue
+            statut (str, optional): Restreint à un statut. Par défaut tous
+            
+        Returns:
+            list: Consultations triées par date/heure
+        """
+        if statut is not None:
+            return self.par_statut(statut, debut, fin)
+        # Fusion des partitions, chacune déjà triée
+        return list(heapq.merge(
+            *(index.plage(debut, fin) for index in self._par_statut.values()),
+            key=_cle_chronologique))
+
+    def agenda_du_jour(self, jour=None):
+        """
+        Consultations d'une journée, tous statuts confondus
+        
+        Args:
+            jour (date, optional): Journée. Par défaut aujourd'hui
+            
+        Returns:
+            list: Consultations de la journée triées par heure
+        """
+        if jour is None:
+            jour = date.today()
+        debut = datetime.combine(jour, time.min)
+        return self.entre(debut, debut + timedelta(days=1))
+
+    def compter(self, statut):
+        """Nombre de consultations ayant ce statut, en O(1)"""
+        return len(self._par_statut[statut])
+
+    def compter_par_statut(self):
+        """
+        Nombre de consultations pour chaque statut
+        
+        Returns:
+            dict: Statut -> nombre de consultations
+        """
+        return {statut: len(partition) for statut, partition in self._par_statut.items()}
+
+    def __contains__(self, consultation):
+        """Teste la présence d'une consultation dans le registre"""
+        return self._par_identifiant.get(consultation.identifiant) is consultation
+
+    def __iter__(self):
+        """Itère sur les consultations dans l'ordre d'insertion"""
+        return iter(self._par_identifiant.values())
+
+    def __len__(self):
+        """Nombre de consultations enregistrées"""
+        return len(self._par_identifiant)
@@ -0,0 +1,388 @@
+"""
+API HTTP/JSON locale au-dessus des services du cabinet (asyncio, bibliothèque standard)
+
+Les données restent en mémoire avec leurs index ; les lectures sont servies
+directement, les mutations passent une à une par une tâche d'écriture unique
+et leur persistance s'exécute dans un fil séparé, sans bloquer les lectures.
+
+Usage : python serveur.py [--hote 127.0.0.1] [--port 8080]
+"""
+import argparse
+import asyncio
+import json
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from main import ouvrir_cabinet, fermer_cabinet
+from models import (
+    PatientNotFoundError, ConsultationNotFoundError,
+    InvalidSecurityNumberError, InvalidConsultationStatusError,
+    ConsultationConflictError, ConcurrentWriteError
+)
+from services.patient_service import (
+    ajouter_patient, rechercher_patient, rechercher_patients_par_nom, selection_patients,
+    differer_persistance, valider_mutations, annuler_mutations
+)
+from services.consultation_service import (
+    planifier_consultation, prochain_creneau_libre,
+    marquer_consultation_realisee, annuler_consultation, ajouter_diagnostic
+)
+from storage.serialization import consultation_vers_dict
+from utils import metriques
+
+# Code HTTP renvoyé pour chaque exception métier
+CODES_ERREUR = [
+    (PatientNotFoundError, 404),
+    (ConsultationNotFoundError, 404),
+    (InvalidSecurityNumberError, 400),
+    (InvalidConsultationStatusError, 409),
+    (ConsultationConflictError, 409),
+    (ConcurrentWriteError, 409),
+    (ValueError, 400),
+    (TypeError, 400),
+]
+
+MESSAGES_HTTP = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found",
+                 405: "Method Not Allowed", 409: "Conflict", 413: "Payload Too Large",
+                 500: "Internal Server Error"}
+
+# Taille maximale d'un corps de requête
+TAILLE_MAX_CORPS = 1024 * 1024
+
+
+class RequeteInvalide(Exception):
+    """Exception levée quand la requête HTTP elle-même est mal formée"""
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+
+def _patient_json(patient, aujourd_hui=None):
+    """Représentation d'un patient renvoyée par l'API"""
+    return {
+        "ssn": patient.ssn,
+        "nom": patient.nom,
+        "prenom": patient.prenom,
+        "date_naissance": patient.date_naissance.isoformat(),
+        "age": patient.age_le(aujourd_hui or date.today()),
+        "adresse": patient.adresse,
+        "telephone": patient.telephone
+    }
+
+
+def _entier(parametres, cle, defaut=None):
+    """Paramètre de requête entier optionnel"""
+    valeur = parametres.get(cle)
+    return defaut if valeur in (None, "") else int(valeur)
+
+
+class ServeurCabinet:
+    """
+    Serveur HTTP/JSON du cabinet
+
+    Attributs:
+        stockage (Stockage): Stockage actif
+        patients (RegistrePatients): Registre des patients, résident en mémoire
+        consultations (RegistreConsultations): Registre des consultations, résident en mémoire
+    """
+
+    def __init__(self, stockage, patients, consultations):
+        """
+        Initialise le serveur (la tâche d'écriture démarre avec servir)
+
+        Args:
+            stockage (Stockage): Stockage actif (voir services.activer_stockage)
+            patients (RegistrePatients): Registre des patients
+            consultations (RegistreConsultations): Registre des consultations
+        """
+        self.stockage = stockage
+        self.patients = patients
+        self.consultations = consultations
+        self._file_ecritures = None
+        self._ecrivain = None
+        # Un seul fil : les sauvegardes restent dans l'ordre des mutations
+        self._executeur = ThreadPoolExecutor(max_workers=1, thread_name_prefix="persistance")
+        # La fusion des écritures d'autres processus modifie les registres depuis
+        # ce fil : les lectures prennent le même verrou que le stockage
+        self._verrou_memoire = threading.Lock()
+        stockage.verrou_memoire = self._verrou_memoire
+        self._routes = [
+            ("GET", r"/patients", self.lister_patients, False),
+            ("POST", r"/patients", self.creer_patient, True),
+            ("GET", r"/patients/recherche", self.rechercher_patients, False),
+            ("GET", r"/patients/(?P<ssn>\d+)", self.lire_patient, False),
+            ("GET", r"/consultations/a-venir", self.consultations_a_venir, False),
+            ("GET", r"/consultations/agenda", self.agenda, False),
+            ("POST", r"/consultations", self.creer_consultation, True),
+            ("POST", r"/consultations/(?P<identifiant>\w+)/realisee", self.marquer_realisee, True),
+            ("POST", r"/consultations/(?P<identifiant>\w+)/annulee", self.annuler, True),
+            ("POST", r"/consultations/(?P<identifiant>\w+)/diagnostic", self.diagnostiquer, True),
+            ("GET", r"/medecins/(?P<medecin>[^/]+)/creneau-libre", self.creneau_libre, False),
+            ("GET", r"/metriques", self.lire_metriques, False),
+        ]
+        self._routes = [(methode, re.compile(motif + r"/?"), action, ecriture)
+                        for methode, motif, action, ecriture in self._routes]
+
+    # --- Lectures : exécutées directement sur la boucle, sous le verrou mémoire ---
+
+    def lister_patients(self, parametres, corps):
+        aujourd_hui = date.today()
+        selection = selection_patients(self.patients, parametres.get("tri") or None,
+                                       _entier(parametres, "decalage", 0), _entier(parametres, "limite", 100))
+        return 200, {"total": len(self.patients),
+                     "patients": [_patient_json(p, aujourd_hui) for p in selection]}
+
+    def rechercher_patients(self, parametres, corps):
+        resultats = rechercher_patients_par_nom(self.patients, parametres.get("q", ""),
+                                                _entier(parametres, "limite", 10))
+        return 200, [_patient_json(p) for p in resultats]
+
+    def lire_patient(self, parametres, corps, ssn):
+        patient = rechercher_patient(self.patients, ssn)
+        donnees = _patient_json(patient)
+        donnees["consultations"] = [consultation_vers_dict(c) for c in patient.consultations]
+        return 200, donnees
+
+    def consultations_a_venir(self, parametres, corps):
+        return 200, [consultation_vers_dict(c)
+                     for c in self.consultations.prochaines(_entier(parametres, "n", 50))]
+
+    def agenda(self, parametres, corps):
+        jour = parametres.get("jour")
+        jour = date.fromisoformat(jour) if jour else None
+        return 200, [consultation_vers_dict(c) for c in self.consultations.agenda_du_jour(jour)]
+
+    def creneau_libre(self, parametres, corps, medecin):
+        debut = prochain_creneau_libre(self.consultations, unquote(medecin), parametres["apres"],
+                                       _entier(parametres, "duree"))
+        return 200, {"medecin": unquote(medecin), "debut": debut}
+
+    def lire_metriques(self, parametres, corps):
+        return 200, metriques.rapport()
+
+    # --- Mutations : exécutées une à une par la tâche d'écriture ---
+
+    def _consultation(self, identifiant):
+        consultation = self.consultations.obtenir(identifiant)
+        if consultation is None:
+            raise ConsultationNotFoundError(f"Consultation {identifiant} non trouvée.")
+        return consultation
+
+    def creer_patient(self, parametres, corps):
+        patient = ajouter_patient(self.patients, self.consultations, corps["ssn"], corps["nom"],
+                                  corps["prenom"], corps["date_naissance"],
+                                  corps.get("adresse", ""), corps.get("telephone", ""))
+        return 201, _patient_json(patient)
+
+    def creer_consultation(self, parametres, corps):
+        patient = rechercher_patient(self.patients, corps["ssn"])
+        consultation = planifier_consultation(self.consultations, self.patients, patient,
+                                              corps["date_heure"], corps["medecin"],
+                                              corps.get("motif", ""), corps.get("duree"))
+        return 201, consultation_vers_dict(consultation)
+
+    def marquer_realisee(self, parametres, corps, identifiant):
+        consultation = self._consultation(identifiant)
+        marquer_consultation_realisee(self.consultations, self.patients, consultation)
+        return 200, consultation_vers_dict(consultation)
+
+    def annuler(self, parametres, corps, identifiant):
+        consultation = self._consultation(identifiant)
+        annuler_consultation(self.consultations, self.patients, consultation)
+        return 200, consultation_vers_dict(consultation)
+
+    def diagnostiquer(self, parametres, corps, identifiant):
+        consultation = self._consultation(identifiant)
+        ajouter_diagnostic(self.consultations, self.patients, consultation, corps["diagnostic"])
+        return 200, consultation_vers_dict(consultation)
+
+    async def _ecrire(self):
+        """
+        Tâche d'écriture unique
+
+        Les écritures des autres processus sont d'abord reprises dans le fil
+        de persistance. Chaque mutation est ensuite appliquée en mémoire sur
+        la boucle, persistance différée, puis écrite dans ce même fil ; la réponse n'est
+        envoyée qu'une fois l'écriture faite, et la mutation est défaite si
+        elle échoue. La mutation suivante attend la fin de l'écriture.
+        """
+        boucle = asyncio.get_running_loop()
+        while True:
+            action, arguments, futur = await self._file_ecritures.get()
+            try:
+                # Reprise de ce que d'autres processus ont écrit dans le même stockage,
+                # dans le fil de persistance : relire et fusionner le fichier peut
+                # attendre le verrou d'un autre poste sans bloquer les lectures
+                await boucle.run_in_executor(self._executeur, self.stockage.actualiser,
+                                             self.patients, self.consultations)
+                with differer_persistance() as lot:
+                    resultat = action(*arguments)
+                if lot["operations"]:
+                    try:
+                        await boucle.run_in_executor(self._executeur, valider_mutations,
+                                                     self.patients, self.consultations, lot["operations"])
+                    except BaseException:
+                        annuler_mutations(lot)
+                        raise
+            except Exception as e:
+                if not futur.cancelled():
+                    futur.set_exception(e)
+            else:
+                if not futur.cancelled():
+                    futur.set_result(resultat)
+
+    async def traiter(self, methode, cible, corps):
+        """
+        Exécute une requête décodée
+
+        Args:
+            methode (str): Méthode HTTP
+            cible (str): Chemin et paramètres de la requête
+            corps (bytes): Corps de la requête (JSON)
+
+        Returns:
+            tuple: (code HTTP, données JSON de la réponse)
+        """
+        url = urlsplit(cible)
+        parametres = dict(parse_qsl(url.query))
+        methode_trouvee = False
+        for methode_route, motif, action, ecriture in self._routes:
+            correspondance = motif.fullmatch(url.path)
+            if correspondance is None:
+                continue
+            methode_trouvee = True
+            if methode_route != methode:
+                continue
+            try:
+                donnees = json.loads(corps) if corps else {}
+            except json.JSONDecodeError as e:
+                return 400, {"erreur": f"JSON invalide : {e}"}
+            if not isinstance(donnees, dict):
+                return 400, {"erreur": "Le corps doit être un objet JSON"}
+            arguments = (parametres, donnees, *correspondance.groups())
+            try:
+                if ecriture:
+                    futur = asyncio.get_running_loop().create_future()
+                    await self._file_ecritures.put((action, arguments, futur))
+                    return await futur
+                with self._verrou_memoire:
+                    return action(*arguments)
+            except KeyError as e:
+                return 400, {"erreur": f"Champ manquant : {e.args[0]}"}
+            except Exception as e:
+                for type_erreur, code in CODES_ERREUR:
+                    if isinstance(e, type_erreur):
+                        return code, {"erreur": str(e)}
+                return 500, {"erreur": f"Erreur inattendue : {e}"}
+        if methode_trouvee:
+            return 405, {"erreur": f"Méthode {methode} non autorisée sur {url.path}"}
+        return 404, {"erreur": f"Ressource inconnue : {url.path}"}
+
+    async def _lire_requete(self, lecteur):
+        """
+        Lit une requête HTTP/1.1
+
+        Returns:
+            tuple: (méthode, cible, en-têtes, corps), ou None si la connexion est fermée
+        """
+        ligne = await lecteur.readline()
+        if not ligne.strip():
+            return None
+        try:
+            methode, cible, _ = ligne.decode("latin-1").split(" ", 2)
+        except ValueError:
+            raise RequeteInvalide(400, "Ligne de requête invalide")
+        entetes = {}
+        while True:
+            ligne = await lecteur.readline()
+            if ligne in (b"\r\n", b"\n", b""):
+                break
+            cle, _, valeur = ligne.decode("latin-1").partition(":")
+            entetes[cle.strip().lower()] = valeur.strip()
+        longueur = int(entetes.get("content-length") or 0)
+        if longueur > TAILLE_MAX_CORPS:
+            raise RequeteInvalide(413, "Corps de requête trop volumineux")
+        corps = await lecteur.readexactly(longueur) if longueur else b""
+        return methode.upper(), cible, entetes, corps
+
+    @staticmethod
+    def _ecrire_reponse(ecrivain, code, donnees, garder_ouverte):
+        corps = json.dumps(donnees, ensure_ascii=False).encode("utf-8")
+        en_tete = (f"HTTP/1.1 {code} {MESSAGES_HTTP.get(code, '')}\r\n"
+                   "Content-Type: application/json; charset=utf-8\r\n"
+                   f"Content-Length: {len(corps)}\r\n"
+                   f"Connection: {'keep-alive' if garder_ouverte else 'close'}\r\n\r\n")
+        ecrivain.write(en_tete.encode("latin-1") + corps)
+
+    async def _servir_connexion(self, lecteur, ecrivain):
+        """Sert les requêtes successives d'une connexion (keep-alive)"""
+        try:
+            while True:
+                try:
+                    requete = await self._lire_requete(lecteur)
+                except RequeteInvalide as e:
+                    self._ecrire_reponse(ecrivain, e.code, {"erreur": str(e)}, False)
+                    await ecrivain.drain()
+                    break
+                if requete is None:
+                    break
+                methode, cible, entetes, corps = requete
+                code, donnees = await self.traiter(methode, cible, corps)
+                garder_ouverte = entetes.get("connection", "").lower() != "close"
+                self._ecrire_reponse(ecrivain, code, donnees, garder_ouverte)
+                await ecrivain.drain()
+                if not garder_ouverte:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            ecrivain.close()
+
+    async def servir(self, hote="127.0.0.1", port=8080, pret=None):
+        """
+        Démarre le serveur et la tâche d'écriture, jusqu'à annulation
+
+        Args:
+            hote (str, optional): Adresse d'écoute. Par défaut localhost
+            port (int, optional): Port d'écoute (0 = port libre). Par défaut 8080
+            pret (callable, optional): Appelé avec le port effectif une fois à l'écoute
+        """
+        self._file_ecritures = asyncio.Queue()
+        self._ecrivain = asyncio.create_task(self._ecrire())
+        serveur = await asyncio.start_server(self._servir_connexion, hote, port)
+        if pret is not None:
+            pret(serveur.sockets[0].getsockname()[1])
+        try:
+            async with serveur:
+                await serveur.serve_forever()
+        finally:
+            self._ecrivain.cancel()
+            self._executeur.shutdown(wait=True)
+
+
+def main():
+    """Charge le cabinet et sert l'API jusqu'à Ctrl+C"""
+    analyseur = argparse.ArgumentParser(description="API HTTP/JSON du cabinet médical")
+    analyseur.add_argument("--hote", default="127.0.0.1")
+    analyseur.add_argument("--port", type=int, default=8080)
+    arguments = analyseur.parse_args()
+
+    stockage, patients, consultations, orphelines = ouvrir_cabinet()
+    if orphelines:
+        print(f"⚠ {len(orphelines)} consultation(s) sans patient correspondant.")
+    serveur = ServeurCabinet(stockage, patients, consultations)
+    try:
+        asyncio.run(serveur.servir(arguments.hote, arguments.port,
+                                   lambda port: print(f"✓ API du cabinet sur http://{arguments.hote}:{port}")))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        fermer_cabinet(stockage, patients, consultations)
+        print("\nAu revoir !")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,2 +1,19 @@
 from .patient_service import *
-from .consultation_service import *
\ No newline at end of file
+from .consultation_service import *
+
+# Imports de fichiers et statistiques : chargés à la première utilisation
+# (csv, numpy éventuel) plutôt qu'au démarrage
+_DIFFERES = {
+    "importer_patients": "import_service",
+    "importer_consultations": "import_service",
+    "afficher_statistiques": "analyse_service",
+    "construire_cohorte": "analyse_service",
+}
+
+
+def __getattr__(nom):
+    module = _DIFFERES.get(nom)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {nom!r}")
+    from importlib import import_module
+    return getattr(import_module(f".{module}", __name__), nom)
@@ -0,0 +1,317 @@
+"""
+Statistiques du cabinet calculées sur des colonnes NumPy (âges, activité, annulations)
+
+NumPy n'est nécessaire que pour ce module ; il est importé au premier usage.
+"""
+from datetime import datetime
+from models import Consultation
+from utils.decorators import log_action, mesurer
+
+# Ordinal de 1970-01-01 : origine des datetime64 de NumPy
+_ORDINAL_EPOQUE = 719163
+
+# Lundi = 0 (le 1970-01-01 était un jeudi)
+JOURS_SEMAINE = ["lundi", "mardi", "mercredi", "jeudi", "vendredi", "samedi", "dimanche"]
+
+
+def _numpy():
+    """Importe NumPy, avec un message explicite s'il n'est pas installé"""
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("NumPy est requis pour les statistiques du cabinet (pip install numpy).") from None
+    return numpy
+
+
+class Cohorte:
+    """
+    Vue en colonnes des patients et consultations chargés
+
+    Chaque attribut est un tableau NumPy d'une case par patient ou par
+    consultation ; les requêtes sont des masques et des comptages vectorisés,
+    sans boucle Python par enregistrement. La vue est une copie : elle doit
+    être reconstruite pour refléter de nouvelles mutations.
+
+    Attributs:
+        naissances (ndarray): Dates de naissance (datetime64[D]), une par patient
+        moments (ndarray): Dates/heures des consultations (datetime64[m])
+        statuts (ndarray): Code du statut (index dans Consultation.STATUTS)
+        medecins (list): Noms des médecins ; medecin_codes y renvoie
+        medecin_codes (ndarray): Code du médecin de chaque consultation
+        patient_codes (ndarray): Rang du patient de chaque consultation (-1 si orpheline)
+    """
+
+    def __init__(self, patients, consultations):
+        """
+        Construit les colonnes à partir des registres
+
+        Args:
+            patients (RegistrePatients): Registre des patients
+            consultations (RegistreConsultations): Registre des consultations
+        """
+        np = self._np = _numpy()
+        nb_patients = len(patients)
+        rang_patient = {}
+        annees = np.empty(nb_patients, dtype=np.int64)
+        mois_jours = np.empty(nb_patients, dtype=np.int64)
+        jours = np.empty(nb_patients, dtype=np.int64)
+        for rang, patient in enumerate(patients):
+            naissance = patient.date_naissance
+            rang_patient[patient.ssn] = rang
+            annees[rang] = naissance.year
+            mois_jours[rang] = naissance.month * 100 + naissance.day
+            jours[rang] = naissance.toordinal() - _ORDINAL_EPOQUE
+        self.naissances = jours.view("datetime64[D]")
+        # Année et (mois, jour) gardés à part : l'âge se compare comme Patient.age
+        self._annees_naissance = annees
+        self._mois_jours_naissance = mois_jours
+
+        nb_consultations = len(consultations)
+        code_statut = {statut: code for code, statut in enumerate(Consultation.STATUTS)}
+        code_medecin = {}
+        minutes = np.empty(nb_consultations, dtype=np.int64)
+        self.statuts = np.empty(nb_consultations, dtype=np.int8)
+        self.medecin_codes = np.empty(nb_consultations, dtype=np.int32)
+        self.patient_codes = np.empty(nb_consultations, dtype=np.int64)
+        for rang, consultation in enumerate(consultations):
+            moment = consultation.moment
+            minutes[rang] = ((moment.toordinal() - _ORDINAL_EPOQUE) * 1440
+                             + moment.hour * 60 + moment.minute)
+            self.statuts[rang] = code_statut[consultation.statut]
+            code = code_medecin.get(consultation.medecin)
+            if code is None:
+                code = code_medecin[consultation.medecin] = len(code_medecin)
+            self.medecin_codes[rang] = code
+            self.patient_codes[rang] = rang_patient.get(consultation.patient_ssn, -1)
+        self.moments = minutes.view("datetime64[m]")
+        self.medecins = list(code_medecin)
+
+    def _instant(self, valeur):
+        """Convertit une borne (date, datetime ou "YYYY-MM-DD[ HH:MM]") en datetime64[m]"""
+        if isinstance(valeur, str):
+            valeur = valeur.replace(" ", "T")
+        return self._np.datetime64(valeur).astype("datetime64[m]")
+
+    def _masque(self, debut=None, fin=None, statut=None, medecin=None):
+        """Masque des consultations avec debut <= moment < fin, d'un statut et/ou d'un médecin"""
+        masque = self._np.ones(len(self.moments), dtype=bool)
+        if debut is not None:
+            masque &= self.moments >= self._instant(debut)
+        if fin is not None:
+            masque &= self.moments < self._instant(fin)
+        if statut is not None:
+            masque &= self.statuts == Consultation.STATUTS.index(statut)
+        if medecin is not None:
+            if medecin not in self.medecins:
+                masque[:] = False
+            else:
+                masque &= self.medecin_codes == self.medecins.index(medecin)
+        return masque
+
+    def ages(self, reference=None):
+        """
+        Âge de chaque patient à une date donnée (même calcul que Patient.age)
+
+        Args:
+            reference (date, optional): Date de calcul. Par défaut aujourd'hui
+
+        Returns:
+            ndarray: Âges en années, un par patient
+        """
+        if reference is None:
+            reference = datetime.now().date()
+        pas_encore_fete = self._mois_jours_naissance > reference.month * 100 + reference.day
+        return reference.year - self._annees_naissance - pas_encore_fete
+
+    def distribution_ages(self, largeur=10, reference=None):
+        """
+        Nombre de patients par tranche d'âge
+
+        Args:
+            largeur (int, optional): Largeur des tranches en années. Par défaut 10
+            reference (date, optional): Date de calcul des âges. Par défaut aujourd'hui
+
+        Returns:
+            dict: Tranche ("0-9", "10-19", ...) -> nombre de patients, tranches vides comprises
+        """
+        np = self._np
+        ages = np.clip(self.ages(reference), 0, None)
+        comptes = np.bincount(ages // largeur)
+        return {f"{i * largeur}-{(i + 1) * largeur - 1}": int(n) for i, n in enumerate(comptes)}
+
+    def consultations_par_medecin_par_mois(self, debut=None, fin=None, statut=None):
+        """
+        Tableau croisé médecin x mois du nombre de consultations
+
+        Args:
+            debut (date, optional): Borne incluse. Par défaut aucune
+            fin (date, optional): Borne exclue. Par défaut aucune
+            statut (str, optional): Restreint à un statut. Par défaut tous
+
+        Returns:
+            tuple: (liste des médecins, liste des mois "YYYY-MM", matrice
+            d'effectifs de forme (médecins, mois)), mois sans consultation exclus
+        """
+        np = self._np
+        masque = self._masque(debut, fin, statut)
+        mois, rang_mois = np.unique(self.moments[masque].astype("datetime64[M]"), return_inverse=True)
+        nb_medecins = len(self.medecins)
+        comptes = np.bincount(self.medecin_codes[masque].astype(np.int64) * len(mois) + rang_mois.ravel(),
+                              minlength=nb_medecins * len(mois))
+        return list(self.medecins), [str(m) for m in mois], comptes.reshape(nb_medecins, len(mois))
+
+    def taux(self, debut=None, fin=None, medecin=None, reference=None):
+        """
+        Répartition des consultations par issue
+
+        Une consultation encore « planifiée » dont l'heure est passée n'a pas été
+        honorée (patient absent ou statut jamais mis à jour).
+
+        Args:
+            debut (date, optional): Borne incluse. Par défaut aucune
+            fin (date, optional): Borne exclue. Par défaut aucune
+            medecin (str, optional): Restreint à un médecin. Par défaut tous
+            reference (datetime, optional): Instant séparant passé et futur. Par défaut maintenant
+
+        Returns:
+            dict: Nombre total et taux (entre 0 et 1) de consultations réalisées,
+            annulées, non honorées et à venir
+        """
+        if reference is None:
+            reference = datetime.now()
+        masque = self._masque(debut, fin, medecin=medecin)
+        total = int(masque.sum())
+        statuts = self.statuts[masque]
+        planifiees = statuts == Consultation.STATUTS.index("planifiée")
+        passees = self.moments[masque] < self._instant(reference)
+        effectifs = {
+            "réalisées": int((statuts == Consultation.STATUTS.index("réalisée")).sum()),
+            "annulées": int((statuts == Consultation.STATUTS.index("annulée")).sum()),
+            "non honorées": int((planifiees & passees).sum()),
+            "à venir": int((planifiees & ~passees).sum()),
+        }
+        resultat = {"total": total}
+        for issue, nombre in effectifs.items():
+            resultat[issue] = nombre / total if total else 0.0
+        return resultat
+
+    def taux_annulation_par_medecin(self, debut=None, fin=None):
+        """
+        Taux d'annulation de chaque médecin
+
+        Args:
+            debut (date, optional): Borne incluse. Par défaut aucune
+            fin (date, optional): Borne exclue. Par défaut aucune
+
+        Returns:
+            dict: Médecin -> taux d'annulation (entre 0 et 1), médecins sans consultation exclus
+        """
+        np = self._np
+        masque = self._masque(debut, fin)
+        codes = self.medecin_codes[masque]
+        totaux = np.bincount(codes, minlength=len(self.medecins))
+        annulees = np.bincount(codes[self.statuts[masque] == Consultation.STATUTS.index("annulée")],
+                               minlength=len(self.medecins))
+        return {medecin: float(annulees[code] / totaux[code])
+                for code, medecin in enumerate(self.medecins) if totaux[code]}
+
+    def frequentation(self, debut=None, fin=None, statut=None):
+        """
+        Nombre de consultations par jour de la semaine et par heure
+
+        Args:
+            debut (date, optional): Borne incluse. Par défaut aucune
+            fin (date, optional): Borne exclue. Par défaut aucune
+            statut (str, optional): Restreint à un statut. Par défaut tous
+
+        Returns:
+            ndarray: Matrice 7 x 24 (lundi = ligne 0, heure = colonne)
+        """
+        np = self._np
+        minutes = self.moments[self._masque(debut, fin, statut)].view(np.int64)
+        jours = (minutes // 1440 + 3) % 7
+        heures = minutes // 60 % 24
+        return np.bincount(jours * 24 + heures, minlength=7 * 24).reshape(7, 24)
+
+    def distribution_ages_consultants(self, debut=None, fin=None, largeur=10, statut="réalisée"):
+        """
+        Tranches d'âge des patients vus sur une période, âge pris au jour de la consultation
+
+        Args:
+            debut (date, optional): Borne incluse. Par défaut aucune
+            fin (date, optional): Borne exclue. Par défaut aucune
+            largeur (int, optional): Largeur des tranches en années. Par défaut 10
+            statut (str, optional): Statut compté. Par défaut "réalisée"
+
+        Returns:
+            dict: Tranche -> nombre de consultations
+        """
+        np = self._np
+        masque = self._masque(debut, fin, statut) & (self.patient_codes >= 0)
+        rangs = self.patient_codes[masque]
+        moments = self.moments[masque]
+        annees = moments.astype("datetime64[Y]").view(np.int64) + 1970
+        mois = moments.astype("datetime64[M]").view(np.int64) % 12 + 1
+        jours = (moments.astype("datetime64[D]") - moments.astype("datetime64[M]")).view(np.int64) + 1
+        ages = (annees - self._annees_naissance[rangs]
+                - (self._mois_jours_naissance[rangs] > mois * 100 + jours))
+        comptes = np.bincount(np.clip(ages, 0, None) // largeur)
+        return {f"{i * largeur}-{(i + 1) * largeur - 1}": int(n) for i, n in enumerate(comptes)}
+
+
+@mesurer("Construction de la cohorte")
+def construire_cohorte(patients, consultations):
+    """
+    Construit la vue en colonnes utilisée par les statistiques
+
+    Args:
+        patients (RegistrePatients): Registre des patients
+        consultations (RegistreConsultations): Registre des consultations
+
+    Returns:
+        Cohorte: Colonnes NumPy des patients et consultations
+
+    Raises:
+        ImportError: Si NumPy n'est pas installé
+    """
+    return Cohorte(patients, consultations)
+
+
+@log_action("Affichage des statistiques du cabinet")
+def afficher_statistiques(patients, consultations, debut=None, fin=None):
+    """
+    Affiche les âges des patients, l'activité par médecin et par mois et les taux d'annulation
+
+    Args:
+        patients (RegistrePatients): Registre des patients
+        consultations (RegistreConsultations): Registre des consultations
+        debut (date, optional): Début de la période. Par défaut aucune borne
+        fin (date, optional): Fin (exclue) de la période. Par défaut aucune borne
+
+    Returns:
+        Cohorte: La vue construite, réutilisable pour d'autres requêtes
+    """
+    cohorte = construire_cohorte(patients, consultations)
+
+    print("\n--- Âge des patients ---")
+    for tranche, nombre in cohorte.distribution_ages().items():
+        if nombre:
+            print(f"{tranche} ans : {nombre}")
+
+    print("\n--- Consultations par médecin et par mois ---")
+    medecins, mois, comptes = cohorte.consultations_par_medecin_par_mois(debut, fin)
+    if not mois:
+        print("Aucune consultation sur la période.")
+    for medecin, ligne in zip(medecins, comptes):
+        if ligne.sum():
+            detail = ", ".join(f"{m} : {int(n)}" for m, n in zip(mois, ligne) if n)
+            print(f"Dr {medecin} ({int(ligne.sum())}) - {detail}")
+
+    print("\n--- Issue des consultations ---")
+    taux = cohorte.taux(debut, fin)
+    print(f"{taux.pop('total')} consultation(s)")
+    for issue, valeur in taux.items():
+        print(f"{issue} : {valeur:.1%}")
+    for medecin, valeur in cohorte.taux_annulation_par_medecin(debut, fin).items():
+        print(f"  Dr {medecin} : {valeur:.1%} d'annulations")
+    return cohorte
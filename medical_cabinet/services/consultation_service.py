@@ -1,80 +1,103 @@
 """
 Fonctions métier pour la gestion des consultations du cabinet médical
 """
-import json
-import os
-from models import Consultation, ConsultationNotFoundError, InvalidConsultationStatusError
+from datetime import datetime
+from models import (
+    Consultation, ConsultationNotFoundError,
+    InvalidConsultationStatusError, ConsultationConflictError
+)
+from storage.codec import prescription_vers_donnees
+from storage.serialization import consultation_vers_dict
 
 from utils.decorators import log_action
 
-DATA_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "cabinet_data.json")
-
 
 def charger_consultations():
     """
-    Charge la liste des consultations depuis le fichier JSON
+    Charge les consultations depuis le stockage actif (voir charger_donnees)
     
     Returns:
-        list: Liste des objets Consultation
-    """
-    try:
-        with open(DATA_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            consultations = []
-            for c_data in data.get("consultations", []):
-                consultation = Consultation(
-                    date_heure=c_data["date_heure"],
-                    patient_ssn=c_data["patient_ssn"],
-                    medecin=c_data["medecin"],
-                    motif=c_data["motif"],
-                    diagnostic=c_data.get("diagnostic"),
-                    prescriptions=c_data.get("prescriptions", []),
-                    statut=c_data.get("statut", "planifiée")
-                )
-                consultations.append(consultation)
-            return consultations
-    except (FileNotFoundError, json.JSONDecodeError):
-        return []
+        RegistreConsultations: Registre des consultations
+    """
+    from services.patient_service import charger_donnees
+    return charger_donnees()[1]
 
 
 @log_action("Planification d'une consultation")
-@log_action("Planification d'une consultation")
-def planifier_consultation(consultations, patients, patient, date_heure, medecin, motif):
+def planifier_consultation(consultations, patients, patient, date_heure, medecin, motif, duree=None):
     """
-    Planifie une nouvelle consultation pour un patient
+    Planifie une nouvelle consultation pour un patient si le médecin est libre
     
     Args:
-        consultations (list): Liste des consultations
-        patients (list): Liste des patients
+        consultations (RegistreConsultations): Registre des consultations
+        patients (RegistrePatients): Registre des patients
         patient (Patient): Patient concerné
         date_heure (str): Date et heure (YYYY-MM-DD HH:MM)
         medecin (str): Nom du médecin
         motif (str): Motif de consultation
+        duree (int, optional): Durée en minutes. Par défaut Consultation.DUREE_PAR_DEFAUT
         
     Returns:
         Consultation: La consultation créée
+        
+    Raises:
+        ConsultationConflictError: Si le médecin a déjà une consultation sur ce créneau
     """
-    from services.patient_service import sauvegarder_donnees
+    from services.patient_service import persister
     
-    consultation = Consultation(date_heure, patient.ssn, medecin, motif)
+    consultation = Consultation(date_heure, patient.ssn, medecin, motif, duree=duree)
+    occupee = consultations.conflit(medecin, consultation.moment, consultation.duree)
+    if occupee is not None:
+        libre = consultations.prochain_creneau_libre(medecin, consultation.moment, consultation.duree)
+        raise ConsultationConflictError(
+            f"Dr {medecin} est déjà occupé ({occupee}). "
+            f"Prochain créneau libre : {libre.strftime(Consultation.FORMAT_DATE_HEURE)}"
+        )
     consultations.append(consultation)
     
     # IMPORTANT: Ajouter la consultation à l'historique du patient
     patient.ajouter_consultation(consultation)
     
-    sauvegarder_donnees(patients, consultations)
+    def annulation():
+        consultations.retirer(consultation)
+        patient.consultations.remove(consultation)
+    
+    persister(patients, consultations, "ajout_consultation", annulation=annulation,
+              consultation=consultation_vers_dict(consultation))
     return consultation
 
 
+@log_action("Recherche d'un créneau libre")
+def prochain_creneau_libre(consultations, medecin, apres, duree=None):
+    """
+    Cherche le premier créneau libre d'un médecin à partir d'une date/heure
+    
+    Args:
+        consultations (RegistreConsultations): Registre des consultations
+        medecin (str): Nom du médecin
+        apres (str): Date/heure de départ (YYYY-MM-DD HH:MM)
+        duree (int, optional): Durée en minutes. Par défaut Consultation.DUREE_PAR_DEFAUT
+        
+    Returns:
+        str: Début du créneau libre (YYYY-MM-DD HH:MM)
+    """
+    debut = datetime.strptime(apres, Consultation.FORMAT_DATE_HEURE)
+    libre = consultations.prochain_creneau_libre(medecin, debut, duree or Consultation.DUREE_PAR_DEFAUT)
+    return libre.strftime(Consultation.FORMAT_DATE_HEURE)
+
+
 @log_action("Affichage des consultations à venir")
 def afficher_consultations_a_venir(consultations):
     """
-    Affiche toutes les consultations planifiées
+    Affiche toutes les consultations planifiées par ordre chronologique
     
     Args:
-        consultations (list): Liste des consultations
+        consultations (RegistreConsultations): Registre des consultations
+        
+    Returns:
+        list: Les consultations affichées, dans l'ordre de leurs index
     """
-    consultations_planifiees = [c for c in consultations if c.statut == "planifiée"]
+    consultations_planifiees = consultations.par_statut("planifiée")
     
     if not consultations_planifiees:
         print("Aucune consultation à venir.")
@@ -82,87 +105,125 @@ def afficher_consultations_a_venir(consultations):
         print("\n--- Consultations à venir ---")
         for i, c in enumerate(consultations_planifiees):
             print(f"{i}. {c}")
+    return consultations_planifiees
+
+
+@log_action("Affichage de l'agenda du jour")
+def afficher_agenda_du_jour(consultations, jour=None):
+    """
+    Affiche les consultations d'une journée, tous statuts confondus
+    
+    Args:
+        consultations (RegistreConsultations): Registre des consultations
+        jour (date, optional): Journée à afficher. Par défaut aujourd'hui
+        
+    Returns:
+        list: Les consultations affichées
+    """
+    agenda = consultations.agenda_du_jour(jour)
+    
+    if not agenda:
+        print("Aucune consultation ce jour.")
+    else:
+        print("\n--- Agenda du jour ---")
+        for c in agenda:
+            print(c)
+    return agenda
 
 
-@log_action("Consultation marquée réalisée")
 @log_action("Consultation marquée réalisée")
 def marquer_consultation_realisee(consultations, patients, consultation):
     """
     Marque une consultation comme réalisée
     
     Args:
-        consultations (list): Liste des consultations
-        patients (list): Liste des patients
+        consultations (RegistreConsultations): Registre des consultations
+        patients (RegistrePatients): Registre des patients
         consultation (Consultation): Consultation à marquer
         
     Raises:
         InvalidConsultationStatusError: Si la consultation n'est pas planifiée
     """
-    from services.patient_service import sauvegarder_donnees
+    from services.patient_service import persister
     
     if consultation.statut != "planifiée":
         raise InvalidConsultationStatusError(
             "Seules les consultations planifiées peuvent être marquées comme réalisées."
         )
-    consultation.changer_statut("réalisée")
-    sauvegarder_donnees(patients, consultations)
+    consultations.changer_statut(consultation, "réalisée")
+    persister(patients, consultations, "statut",
+              annulation=lambda: consultations.restaurer_statut(consultation, "planifiée"),
+              id=consultation.identifiant, statut=consultation.statut)
 
 
-@log_action("Consultation annulée")
 @log_action("Consultation annulée")
 def annuler_consultation(consultations, patients, consultation):
     """
     Annule une consultation
     
     Args:
-        consultations (list): Liste des consultations
-        patients (list): Liste des patients
+        consultations (RegistreConsultations): Registre des consultations
+        patients (RegistrePatients): Registre des patients
         consultation (Consultation): Consultation à annuler
         
     Raises:
         InvalidConsultationStatusError: Si la consultation n'est pas planifiée
     """
-    from services.patient_service import sauvegarder_donnees
+    from services.patient_service import persister
     
     if consultation.statut != "planifiée":
         raise InvalidConsultationStatusError(
             "Seules les consultations planifiées peuvent être annulées."
         )
-    consultation.changer_statut("annulée")
-    sauvegarder_donnees(patients, consultations)
+    consultations.changer_statut(consultation, "annulée")
+    persister(patients, consultations, "statut",
+              annulation=lambda: consultations.restaurer_statut(consultation, "planifiée"),
+              id=consultation.identifiant, statut=consultation.statut)
 
 
-@log_action("Ajout d'un diagnostic")
 @log_action("Ajout d'un diagnostic")
 def ajouter_diagnostic(consultations, patients, consultation, diagnostic):
     """
     Ajoute un diagnostic à une consultation réalisée
     
     Args:
-        consultations (list): Liste des consultations
-        patients (list): Liste des patients
+        consultations (RegistreConsultations): Registre des consultations
+        patients (RegistrePatients): Registre des patients
         consultation (Consultation): Consultation concernée
         diagnostic (str): Diagnostic à ajouter
     """
-    from services.patient_service import sauvegarder_donnees
+    from services.patient_service import persister
     
+    precedent = consultation.diagnostic
     consultation.ajouter_diagnostic(diagnostic)
-    sauvegarder_donnees(patients, consultations)
+    
+    def annulation():
+        consultation.diagnostic = precedent
+    
+    # La valeur précédente permet de reconnaître un diagnostic saisi entre-temps sur un autre poste
+    persister(patients, consultations, "diagnostic", annulation=annulation,
+              id=consultation.identifiant, diagnostic=diagnostic, precedent=precedent)
 
 
-@log_action("Ajout d'une prescription")
 @log_action("Ajout d'une prescription")
 def ajouter_prescription(consultations, patients, consultation, prescription):
     """
     Ajoute une prescription à une consultation
     
     Args:
-        consultations (list): Liste des consultations
-        patients (list): Liste des patients
+        consultations (RegistreConsultations): Registre des consultations
+        patients (RegistrePatients): Registre des patients
         consultation (Consultation): Consultation concernée
         prescription (Prescription): Prescription à ajouter
     """
-    from services.patient_service import sauvegarder_donnees
+    from services.patient_service import persister
     
     consultation.ajouter_prescription(prescription)
-    sauvegarder_donnees(patients, consultations)
\ No newline at end of file
+    
+    def annulation():
+        consultation.prescriptions.pop()
+        consultation.invalider_serialisation()
+    
+    persister(patients, consultations, "prescription", annulation=annulation,
+              id=consultation.identifiant,
+              prescription=prescription_vers_donnees(prescription))
\ No newline at end of file
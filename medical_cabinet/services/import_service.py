@@ -0,0 +1,231 @@
+"""
+Import en masse de patients et de consultations depuis des fichiers CSV ou JSONL
+"""
+import json
+import os
+from models import Consultation, PatientNotFoundError, InvalidSecurityNumberError
+from storage.serialization import (
+    dict_vers_patient, dict_vers_consultation, patient_vers_dict, consultation_vers_dict
+)
+from utils.decorators import log_action
+
+# Nombre de lignes validées et intégrées à la fois
+TAILLE_LOT = 1000
+
+# Champs sans lesquels une ligne est rejetée ; les autres colonnes sont facultatives
+CHAMPS_REQUIS_PATIENT = ("ssn", "nom", "prenom", "date_naissance")
+CHAMPS_REQUIS_CONSULTATION = ("patient_ssn", "date_heure", "medecin", "motif")
+
+
+class RapportImport:
+    """
+    Compte rendu d'un import en masse
+
+    Attributs:
+        importes (int): Nombre d'enregistrements ajoutés
+        doublons (list): Numéros de ligne ignorés car déjà présents
+        erreurs (list): Couples (numéro de ligne, message) des lignes rejetées
+    """
+
+    def __init__(self):
+        self.importes = 0
+        self.doublons = []
+        self.erreurs = []
+
+    def __str__(self):
+        """Résumé textuel de l'import"""
+        return (f"{self.importes} importé(s), {len(self.doublons)} doublon(s), "
+                f"{len(self.erreurs)} erreur(s)")
+
+
+def _lire_lignes(chemin, format_fichier=None):
+    """
+    Parcourt un fichier CSV ou JSONL ligne à ligne, sans le charger entièrement
+
+    Args:
+        chemin (str): Fichier à lire
+        format_fichier (str, optional): "csv" ou "jsonl". Par défaut déduit de l'extension
+
+    Yields:
+        tuple: (numéro de ligne, dict des champs ou exception de lecture)
+    """
+    if format_fichier is None:
+        format_fichier = os.path.splitext(chemin)[1].lstrip(".").lower()
+    with open(chemin, "r", encoding="utf-8", newline="") as f:
+        if format_fichier == "csv":
+            # Import différé : csv n'est utile qu'aux imports en masse
+            import csv
+            for numero, ligne in enumerate(csv.DictReader(f), start=2):
+                # Cellules vides conservées (chaîne vide) : chaque validation décide
+                # si le champ est requis ; les cellules en trop (clé None) sont ignorées
+                yield numero, {cle: "" if valeur is None else valeur
+                               for cle, valeur in ligne.items() if cle is not None}
+        elif format_fichier in ("jsonl", "ndjson"):
+            for numero, ligne in enumerate(f, start=1):
+                if not ligne.strip():
+                    continue
+                try:
+                    yield numero, json.loads(ligne)
+                except json.JSONDecodeError as e:
+                    yield numero, e
+        else:
+            raise ValueError(f"Format d'import inconnu : {format_fichier}")
+
+
+def _par_lots(lignes, taille_lot):
+    """Regroupe un itérable en listes de taille_lot éléments"""
+    lot = []
+    for ligne in lignes:
+        lot.append(ligne)
+        if len(lot) >= taille_lot:
+            yield lot
+            lot = []
+    if lot:
+        yield lot
+
+
+def _verifier_champs_requis(donnees, champs):
+    """
+    Raises:
+        ValueError: Si un champ requis est absent ou vide
+    """
+    manquants = [champ for champ in champs if not donnees.get(champ)]
+    if manquants:
+        raise ValueError(f"Champ(s) requis manquant(s) : {', '.join(manquants)}")
+
+
+def _valider_patient(p_data):
+    """
+    Construit un patient (le constructeur valide le SSN et la date de naissance)
+    
+    Adresse et téléphone sont facultatifs : absents ou vides, ils valent "".
+    """
+    if isinstance(p_data, Exception):
+        raise p_data
+    p_data = dict(p_data)
+    p_data.setdefault("ssn", p_data.get("_ssn"))
+    p_data.setdefault("adresse", "")
+    p_data.setdefault("telephone", "")
+    _verifier_champs_requis(p_data, CHAMPS_REQUIS_PATIENT)
+    return dict_vers_patient(p_data)
+
+
+def _valider_consultation(c_data, patients):
+    """Construit une consultation, en vérifiant patient, date, statut et durée"""
+    if isinstance(c_data, Exception):
+        raise c_data
+    _verifier_champs_requis(c_data, CHAMPS_REQUIS_CONSULTATION)
+    # Colonnes facultatives laissées vides = valeurs par défaut
+    c_data = {cle: valeur for cle, valeur in c_data.items() if valeur != ""}
+    if c_data.get("patient_ssn") not in patients:
+        raise PatientNotFoundError(f"Patient {c_data.get('patient_ssn')} non trouvé")
+    if c_data.get("statut", "planifiée") not in Consultation.STATUTS:
+        raise ValueError(f"Statut invalide : {c_data['statut']}")
+    if "duree" in c_data:
+        c_data["duree"] = int(c_data["duree"])
+    return dict_vers_consultation(c_data)
+
+
+@log_action("Import en masse de patients")
+def importer_patients(patients, consultations, chemin, format_fichier=None, taille_lot=TAILLE_LOT):
+    """
+    Importe des patients depuis un fichier CSV ou JSONL
+
+    Les lignes sont lues en flux et validées par lots ; les SSN déjà connus
+    (registre ou lignes précédentes du fichier) sont ignorés. Les données ne
+    sont enregistrées qu'une fois, à la fin de l'import, en une seule
+    transaction : si l'écriture échoue, les patients importés sont retirés
+    de la mémoire.
+
+    Colonnes attendues : ssn, nom, prenom, date_naissance (YYYY-MM-DD), et
+    optionnellement adresse, telephone.
+
+    Args:
+        patients (RegistrePatients): Registre des patients
+        consultations (RegistreConsultations): Registre des consultations
+        chemin (str): Fichier à importer
+        format_fichier (str, optional): "csv" ou "jsonl". Par défaut déduit de l'extension
+        taille_lot (int, optional): Lignes par lot. Par défaut TAILLE_LOT
+
+    Returns:
+        RapportImport: Compte rendu ligne par ligne
+    """
+    from services.patient_service import transaction, persister
+
+    rapport = RapportImport()
+    with transaction(patients, consultations):
+        for lot in _par_lots(_lire_lignes(chemin, format_fichier), taille_lot):
+            for numero, p_data in lot:
+                try:
+                    patient = _valider_patient(p_data)
+                except (InvalidSecurityNumberError, ValueError, KeyError, TypeError) as e:
+                    rapport.erreurs.append((numero, f"{type(e).__name__} : {e}"))
+                    continue
+                if patient.ssn in patients:
+                    rapport.doublons.append(numero)
+                    continue
+                patients.ajouter(patient)
+                persister(patients, consultations, "ajout_patient",
+                          annulation=lambda ssn=patient.ssn: patients.retirer(ssn),
+                          patient=patient_vers_dict(patient))
+                rapport.importes += 1
+    return rapport
+
+
+@log_action("Import en masse de consultations")
+def importer_consultations(patients, consultations, chemin, format_fichier=None, taille_lot=TAILLE_LOT):
+    """
+    Importe des consultations depuis un fichier CSV ou JSONL
+
+    Chaque consultation doit viser un patient existant ; les identifiants
+    déjà connus sont ignorés et les consultations planifiées qui chevauchent
+    l'agenda du médecin sont rejetées. Les données ne sont enregistrées
+    qu'une fois, à la fin de l'import, en une seule transaction : si
+    l'écriture échoue, les consultations importées sont retirées de la mémoire.
+
+    Colonnes attendues : patient_ssn, date_heure (YYYY-MM-DD HH:MM), medecin,
+    motif, et optionnellement id, statut, diagnostic, duree.
+
+    Args:
+        patients (RegistrePatients): Registre des patients
+        consultations (RegistreConsultations): Registre des consultations
+        chemin (str): Fichier à importer
+        format_fichier (str, optional): "csv" ou "jsonl". Par défaut déduit de l'extension
+        taille_lot (int, optional): Lignes par lot. Par défaut TAILLE_LOT
+
+    Returns:
+        RapportImport: Compte rendu ligne par ligne
+    """
+    from services.patient_service import transaction, persister
+
+    rapport = RapportImport()
+    with transaction(patients, consultations):
+        for lot in _par_lots(_lire_lignes(chemin, format_fichier), taille_lot):
+            for numero, c_data in lot:
+                try:
+                    consultation = _valider_consultation(c_data, patients)
+                except (PatientNotFoundError, ValueError, KeyError, TypeError) as e:
+                    rapport.erreurs.append((numero, f"{type(e).__name__} : {e}"))
+                    continue
+                if consultations.obtenir(consultation.identifiant) is not None:
+                    rapport.doublons.append(numero)
+                    continue
+                if consultation.statut == "planifiée":
+                    occupee = consultations.conflit(consultation.medecin, consultation.moment, consultation.duree)
+                    if occupee is not None:
+                        rapport.erreurs.append((numero, f"Conflit d'agenda avec {occupee}"))
+                        continue
+                patient = patients.obtenir(consultation.patient_ssn)
+                consultations.ajouter(consultation)
+                patient.ajouter_consultation(consultation)
+                persister(patients, consultations, "ajout_consultation",
+                          annulation=lambda c=consultation, p=patient: _retirer(consultations, p, c),
+                          consultation=consultation_vers_dict(consultation))
+                rapport.importes += 1
+    return rapport
+
+
+def _retirer(consultations, patient, consultation):
+    """Annule l'ajout d'une consultation importée"""
+    consultations.retirer(consultation)
+    patient.consultations.remove(consultation)
@@ -1,85 +1,207 @@
 """
 Fonctions métier pour la gestion des patients du cabinet médical
 """
-import json
+import heapq
 import os
-from datetime import datetime
+from contextlib import contextmanager
+from datetime import date
 from models import Patient, PatientNotFoundError, InvalidSecurityNumberError
-from utils.decorators import log_action, validate_patient
+from storage.json_backend import StockageJSON
+from storage.serialization import patient_vers_dict
+from utils.decorators import log_action, mesurer, validate_patient
+from utils.rendu import SortieTamponnee, page
 
 # Chemin absolu du fichier JSON, toujours correct quel que soit le dossier courant
 DATA_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "cabinet_data.json")
 
+# Stockage actif ; None = fichier JSON DATA_FILE (voir stockage_actif)
+_stockage = None
+
+# Stockage JSON de DATA_FILE utilisé quand aucun autre n'est activé
+_stockage_fichier = None
+
+# Transaction en cours : mutations différées et leurs annulations, ou None
+_transaction = None
+
+
+def stockage_actif():
+    """
+    Stockage qui charge les données et rend les mutations durables
+    
+    Sans stockage activé, c'est toujours le même StockageJSON de DATA_FILE :
+    la génération lue au chargement sert aux écritures suivantes, qui
+    intègrent celles des autres postes au lieu de les écraser.
+    
+    Returns:
+        Stockage: Le stockage activé, ou celui de DATA_FILE
+    """
+    global _stockage_fichier
+    if _stockage is not None:
+        return _stockage
+    if _stockage_fichier is None:
+        _stockage_fichier = StockageJSON(DATA_FILE)
+    return _stockage_fichier
+
+
+def charger_donnees(flux=False):
+    """
+    Charge patients et consultations depuis le stockage actif
+    
+    Args:
+        flux (bool, optional): Lecture à mémoire bornée si le format le permet. Par défaut False
+        
+    Returns:
+        tuple: (registre des patients, registre des consultations, consultations orphelines)
+    """
+    return stockage_actif().charger(flux)
+
 
 def charger_patients():
     """
-    Charge la liste des patients depuis le fichier JSON
+    Charge les patients depuis le stockage actif (voir charger_donnees)
     
     Returns:
-        list: Liste des objets Patient
+        RegistrePatients: Registre des patients indexé par SSN
     """
-    try:
-        with open(DATA_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            patients = []
-            for p_data in data.get("patients", []):
-                patient = Patient(
-                    ssn=p_data.get("_ssn") or p_data.get("ssn"),
-                    nom=p_data["nom"],
-                    prenom=p_data["prenom"],
-                    date_naissance=p_data["date_naissance"],
-                    adresse=p_data["adresse"],
-                    telephone=p_data.get("_telephone") or p_data.get("telephone")
-                )
-                patients.append(patient)
-            return patients
-    except (FileNotFoundError, json.JSONDecodeError, KeyError, TypeError):
-        return []
+    return charger_donnees()[0]
 
 
+@mesurer("Sauvegarde complète")
 def sauvegarder_donnees(patients, consultations):
     """
-    Sauvegarde complète des patients et consultations dans le fichier JSON
+    Sauvegarde complète des patients et consultations dans le stockage actif
+    
+    Args:
+        patients (RegistrePatients): Registre des patients
+        consultations (RegistreConsultations): Registre des consultations
+    """
+    stockage_actif().sauvegarder(patients, consultations)
+
+
+def activer_stockage(stockage):
+    """
+    Choisit le stockage notifié de chaque mutation
+    
+    Args:
+        stockage (Stockage): Stockage à utiliser, ou None pour le fichier JSON DATA_FILE
+    """
+    global _stockage
+    _stockage = stockage
+
+
+@mesurer("Persistance d'une mutation")
+def persister(patients, consultations, operation, annulation=None, **donnees):
+    """
+    Rend une mutation durable selon le stockage actif
+    
+    Le coût dépend du stockage : réécriture complète (JSON), ajout d'une ligne
+    au journal, ou mise à jour d'une seule ligne (SQLite). Dans une transaction,
+    la mutation est seulement mémorisée jusqu'à sa validation.
+    
+    Args:
+        patients (RegistrePatients): Registre des patients
+        consultations (RegistreConsultations): Registre des consultations
+        operation (str): Type d'opération (voir storage.base.OPERATIONS)
+        annulation (callable, optional): Défait la mutation en mémoire si elle
+            ne peut pas être rendue durable
+        **donnees: Contenu de l'opération
+    """
+    if _transaction is not None:
+        _transaction["operations"].append((operation, donnees))
+        if annulation is not None:
+            _transaction["annulations"].append(annulation)
+        return
+    try:
+        stockage_actif().enregistrer(patients, consultations, operation, **donnees)
+    except Exception:
+        if annulation is not None:
+            annulation()
+        raise
+
+
+@contextmanager
+def transaction(patients, consultations):
+    """
+    Regroupe plusieurs mutations en une seule écriture
+    
+    Les services appelés dans le bloc modifient la mémoire normalement mais
+    leur persistance est différée ; à la sortie du bloc, tout est écrit en une
+    fois (et de façon atomique) par le stockage actif. Si le bloc ou l'écriture
+    lève une exception, les mutations sont défaites en mémoire dans l'ordre
+    inverse et rien n'est écrit. Une transaction imbriquée rejoint la première.
+    
+    Args:
+        patients (RegistrePatients): Registre des patients
+        consultations (RegistreConsultations): Registre des consultations
+        
+    Example:
+        with transaction(patients, consultations):
+            marquer_consultation_realisee(consultations, patients, c)
+            ajouter_diagnostic(consultations, patients, c, "Angine")
+    """
+    if _transaction is not None:
+        yield
+        return
+    with differer_persistance() as lot:
+        yield
+    if lot["operations"]:
+        try:
+            valider_mutations(patients, consultations, lot["operations"])
+        except BaseException:
+            annuler_mutations(lot)
+            raise
+
+
+@contextmanager
+def differer_persistance():
+    """
+    Applique les mutations en mémoire sans les écrire
+    
+    Les opérations et leurs annulations sont collectées dans le lot fourni ;
+    l'appelant l'écrit ensuite avec valider_mutations (par exemple hors du
+    fil principal) ou le défait avec annuler_mutations. Si le bloc lève une
+    exception, les mutations sont défaites aussitôt.
+    
+    Yields:
+        dict: Lot {"operations": [(opération, données)], "annulations": [callable]}
+    """
+    global _transaction
+    if _transaction is not None:
+        yield _transaction
+        return
+    _transaction = {"operations": [], "annulations": []}
+    lot = _transaction
+    try:
+        yield lot
+    except BaseException:
+        _transaction = None
+        annuler_mutations(lot)
+        raise
+    _transaction = None
+
+
+def annuler_mutations(lot):
+    """
+    Défait en mémoire les mutations d'un lot, dans l'ordre inverse
     
     Args:
-        patients (list): Liste des patients
-        consultations (list): Liste des consultations
-    """
-    # Conversion des patients en dictionnaires
-    patients_data = []
-    for p in patients:
-        p_dict = {
-            "_ssn": p.ssn,
-            "nom": p.nom,
-            "prenom": p.prenom,
-            "date_naissance": p.date_naissance.strftime("%Y-%m-%d"),
-            "adresse": p.adresse,
-            "_telephone": p.telephone
-        }
-        patients_data.append(p_dict)
-    
-    # Conversion des consultations en dictionnaires
-    consultations_data = []
-    for c in consultations:
-        c_dict = {
-            "date_heure": c.date_heure,
-            "patient_ssn": c.patient_ssn,
-            "medecin": c.medecin,
-            "motif": c.motif,
-            "diagnostic": c.diagnostic,
-            "prescriptions": c.prescriptions,
-            "statut": c.statut
-        }
-        consultations_data.append(c_dict)
-    
-    # Sauvegarde complète
-    data = {
-        "patients": patients_data,
-        "consultations": consultations_data
-    }
-    
-    with open(DATA_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+        lot (dict): Lot produit par differer_persistance
+    """
+    for annulation in reversed(lot["annulations"]):
+        annulation()
+
+
+@mesurer("Validation d'une transaction")
+def valider_mutations(patients, consultations, operations):
+    """
+    Écrit en une fois les mutations d'une transaction
+    
+    Args:
+        patients (RegistrePatients): Registre des patients
+        consultations (RegistreConsultations): Registre des consultations
+        operations (list): Couples (opération, données) dans l'ordre d'exécution
+    """
+    stockage_actif().enregistrer_lot(patients, consultations, operations)
 
 
 @log_action("Ajout d'un patient")
@@ -88,8 +210,8 @@ def ajouter_patient(patients, consultations, ssn, nom, prenom, date_naissance, a
     Ajoute un nouveau patient au système
     
     Args:
-        patients (list): Liste des patients
-        consultations (list): Liste des consultations
+        patients (RegistrePatients): Registre des patients
+        consultations (RegistreConsultations): Registre des consultations
         ssn (str): Numéro de sécurité sociale
         nom (str): Nom du patient
         prenom (str): Prénom du patient
@@ -103,12 +225,13 @@ def ajouter_patient(patients, consultations, ssn, nom, prenom, date_naissance, a
     Raises:
         InvalidSecurityNumberError: Si le SSN existe déjà
     """
-    if any(p.ssn == ssn for p in patients):
+    if ssn in patients:
         raise InvalidSecurityNumberError("Numéro de sécurité sociale déjà utilisé.")
     
     patient = Patient(ssn, nom, prenom, date_naissance, adresse, telephone)
-    patients.append(patient)
-    sauvegarder_donnees(patients, consultations)
+    patients.ajouter(patient)
+    persister(patients, consultations, "ajout_patient", annulation=lambda: patients.retirer(ssn),
+              patient=patient_vers_dict(patient))
     return patient
 
 
@@ -119,7 +242,7 @@ def rechercher_patient(patients, ssn):
     Recherche un patient par son numéro de sécurité sociale
     
     Args:
-        patients (list): Liste des patients
+        patients (RegistrePatients): Registre des patients
         ssn (str): Numéro de sécurité sociale
         
     Returns:
@@ -128,37 +251,130 @@ def rechercher_patient(patients, ssn):
     Raises:
         PatientNotFoundError: Si le patient n'existe pas
     """
-    for p in patients:
-        if p.ssn == ssn:
-            return p
-    raise PatientNotFoundError(f"Patient {ssn} non trouvé.")
+    patient = patients.obtenir(ssn)
+    if patient is None:
+        raise PatientNotFoundError(f"Patient {ssn} non trouvé.")
+    return patient
+
+
+@log_action("Recherche d'un patient par nom")
+def rechercher_patients_par_nom(patients, requete, limite=10):
+    """
+    Recherche des patients par nom et/ou prénom
+    
+    La casse et les accents sont ignorés, un début de mot suffit ("dup jea")
+    et les fautes de frappe sont tolérées ("lefebre" trouve "Lefèbvre").
+    
+    Args:
+        patients (RegistrePatients): Registre des patients
+        requete (str): Texte saisi
+        limite (int, optional): Nombre maximal de résultats. Par défaut 10
+        
+    Returns:
+        list: Patients classés du plus pertinent au moins pertinent
+    """
+    return patients.rechercher_nom(requete, limite)
+
+
+# Clés de tri de la liste des patients (None = ordre d'ajout)
+TRIS_PATIENTS = {
+    "nom": lambda p: (p.nom.casefold(), p.prenom.casefold(), p.ssn),
+    "age": lambda p: (-p.date_naissance.toordinal(), p.ssn),
+    "ssn": lambda p: p.ssn,
+}
+
+
+def selection_patients(patients, tri=None, decalage=0, limite=None):
+    """
+    Patients d'une page de la liste, triés à la demande
+    
+    Sans tri, rien n'est parcouru au-delà de la page demandée. Avec un tri et
+    une limite, seuls les decalage + limite premiers patients sont triés (tas).
+    
+    Args:
+        patients (RegistrePatients): Registre des patients
+        tri (str, optional): "nom", "age" ou "ssn". Par défaut l'ordre d'ajout
+        decalage (int, optional): Patients sautés. Par défaut 0
+        limite (int, optional): Nombre maximal de patients. Par défaut tous
+        
+    Returns:
+        iterator: Patients de la page
+        
+    Raises:
+        ValueError: Si le tri est inconnu
+    """
+    if tri is None:
+        return page(patients, decalage, limite)
+    if tri not in TRIS_PATIENTS:
+        raise ValueError(f"Tri inconnu : {tri} (choisir parmi {', '.join(TRIS_PATIENTS)})")
+    if limite is None:
+        return page(sorted(patients, key=TRIS_PATIENTS[tri]), decalage)
+    return page(heapq.nsmallest(decalage + limite, patients, key=TRIS_PATIENTS[tri]), decalage)
+
+
+def lignes_patients(patients, tri=None, decalage=0, limite=None):
+    """
+    Lignes de la liste des patients produites à la demande (voir selection_patients)
+    
+    L'âge est calculé avec une seule date du jour pour toute la liste.
+    
+    Args:
+        patients (RegistrePatients): Registre des patients
+        tri (str, optional): "nom", "age" ou "ssn". Par défaut l'ordre d'ajout
+        decalage (int, optional): Patients sautés. Par défaut 0
+        limite (int, optional): Nombre maximal de lignes. Par défaut toutes
+        
+    Yields:
+        str: Un patient formaté
+        
+    Raises:
+        ValueError: Si le tri est inconnu
+    """
+    aujourd_hui = date.today()
+    for p in selection_patients(patients, tri, decalage, limite):
+        yield f"{p.ssn} - {p.nom} {p.prenom} ({p.age_le(aujourd_hui)} ans)"
 
 
 @log_action("Affichage de la liste des patients")
-def afficher_patients(patients):
+def afficher_patients(patients, tri=None, decalage=0, limite=None, sortie=None):
     """
-    Affiche la liste de tous les patients
+    Affiche la liste des patients, par blocs
     
     Args:
-        patients (list): Liste des patients
+        patients (RegistrePatients): Registre des patients
+        tri (str, optional): "nom", "age" ou "ssn". Par défaut l'ordre d'ajout
+        decalage (int, optional): Patients sautés. Par défaut 0
+        limite (int, optional): Nombre maximal de lignes. Par défaut tous
+        sortie (SortieTamponnee, optional): Destination. Par défaut la sortie standard
+        
+    Returns:
+        int: Nombre de patients affichés
     """
     if not patients:
         print("Aucun patient enregistré.")
-    else:
-        print("\n--- Liste des patients ---")
-        for p in patients:
-            print(f"{p.ssn} - {p.nom} {p.prenom} ({p.age} ans)")
+        return 0
+    sortie = sortie if sortie is not None else SortieTamponnee()
+    if decalage == 0:
+        sortie.ecrire("\n--- Liste des patients ---")
+    affiches = sortie.ecrire_lignes(lignes_patients(patients, tri, decalage, limite))
+    sortie.vider()
+    return affiches
 
 
 @log_action("Affichage de l'historique d'un patient")
 @validate_patient
-def afficher_historique_patient(patients, ssn):
+def afficher_historique_patient(patients, ssn, decalage=0, limite=None):
     """
     Affiche l'historique complet d'un patient
     
     Args:
-        patients (list): Liste des patients
+        patients (RegistrePatients): Registre des patients
         ssn (str): Numéro de sécurité sociale
+        decalage (int, optional): Consultations sautées. Par défaut 0
+        limite (int, optional): Nombre maximal de lignes. Par défaut toutes
+        
+    Returns:
+        int: Nombre de consultations affichées
     """
-    patient = rechercher_patient(patients, ssn)
-    patient.afficher_historique()
\ No newline at end of file
+    # Existence déjà vérifiée par validate_patient : accès direct à l'index
+    return patients.obtenir(ssn).afficher_historique(decalage, limite)
@@ -0,0 +1,34 @@
+# Couche de persistance : sérialisation et modes de stockage des données du cabinet
+from .serialization import (
+    patient_vers_dict, dict_vers_patient,
+    consultation_vers_dict, dict_vers_consultation,
+    patient_vers_json, consultation_vers_json, ecrire_donnees, identifiant_historique
+)
+from .codec import (
+    enregistrer_codec, prescription_vers_donnees, donnees_vers_prescription,
+    encoder_consultations, decoder_consultations
+)
+from .base import Stockage, OPERATIONS, creer_stockage, migrer
+from .verrou import VerrouFichier
+from .cache import signature_fichier, lire_cache, ecrire_cache, supprimer_cache
+from .loader import charger_donnees, lire_enregistrements, lier_consultations, departager_identifiants
+
+# Modes de stockage et instantané indexé : chargés à la première utilisation
+# (sqlite3, mmap...), seul le mode choisi est importé (voir creer_stockage)
+_DIFFERES = {
+    "StockageJSON": "json_backend",
+    "Journal": "journal",
+    "StockageSQLite": "sqlite_backend",
+    "StockagePartitionne": "sharded",
+    "InstantaneIndexe": "snapshot",
+    "chemin_instantane_indexe": "snapshot",
+    "ecrire_instantane_indexe": "snapshot",
+}
+
+
+def __getattr__(nom):
+    module = _DIFFERES.get(nom)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {nom!r}")
+    from importlib import import_module
+    return getattr(import_module(f".{module}", __name__), nom)
@@ -0,0 +1,148 @@
+"""
+Abstraction des moyens de stockage des données du cabinet
+"""
+import os
+from abc import ABC, abstractmethod
+from contextlib import nullcontext
+
+
+class Stockage(ABC):
+    """
+    Classe abstraite représentant un moyen de stockage du cabinet
+    
+    Les services travaillent sur les objets en mémoire et notifient le stockage
+    de chaque mutation ; chaque implémentation choisit comment la rendre durable.
+
+    Attributs:
+        verrou_memoire: Verrou pris pendant que le stockage modifie lui-même
+            les registres (fusion des écritures d'autres processus) ; le
+            serveur le partage avec ses lectures. Aucun par défaut
+    """
+
+    verrou_memoire = nullcontext()
+
+    @abstractmethod
+    def charger(self, flux=False):
+        """
+        Charge toutes les données et reconstruit les liens patient-consultations
+        
+        Args:
+            flux (bool, optional): Lecture à mémoire bornée si le format le permet
+            
+        Returns:
+            tuple: (registre des patients, registre des consultations, consultations orphelines)
+        """
+        pass
+
+    @abstractmethod
+    def enregistrer(self, patients, consultations, operation, **donnees):
+        """
+        Rend durable une mutation unique
+        
+        Args:
+            patients (RegistrePatients): Registre des patients
+            consultations (RegistreConsultations): Registre des consultations
+            operation (str): Type d'opération (voir OPERATIONS)
+            **donnees: Contenu de l'opération
+        """
+        pass
+
+    def enregistrer_lot(self, patients, consultations, operations):
+        """
+        Rend durables plusieurs mutations en une seule écriture atomique
+        
+        Par défaut l'état complet est sauvegardé ; les stockages qui savent
+        appliquer un lot de façon atomique le surchargent.
+        
+        Args:
+            patients (RegistrePatients): Registre des patients
+            consultations (RegistreConsultations): Registre des consultations
+            operations (list): Couples (opération, données) dans l'ordre d'exécution
+        """
+        self.sauvegarder(patients, consultations)
+
+    @abstractmethod
+    def sauvegarder(self, patients, consultations):
+        """
+        Remplace le contenu du stockage par l'état complet en mémoire
+        
+        Args:
+            patients (RegistrePatients): Registre des patients
+            consultations (RegistreConsultations): Registre des consultations
+        """
+        pass
+
+    def actualiser(self, patients, consultations):
+        """
+        Intègre en mémoire les écritures faites par d'autres processus (rien par défaut)
+        
+        Args:
+            patients (RegistrePatients): Registre des patients
+            consultations (RegistreConsultations): Registre des consultations
+            
+        Returns:
+            bool: True si des données ont été relues
+        """
+        return False
+
+    def point_de_controle(self, patients, consultations):
+        """Consolide le stockage en fin de session (rien à faire par défaut)"""
+        pass
+
+    def fermer(self):
+        """Libère les ressources du stockage (rien à faire par défaut)"""
+        pass
+
+
+# Opérations notifiées par les services (voir Stockage.enregistrer)
+OPERATIONS = ["ajout_patient", "ajout_consultation", "statut", "diagnostic", "prescription"]
+
+
+def creer_stockage(mode, chemin_donnees, processus=None):
+    """
+    Construit le stockage correspondant à un mode
+    
+    Args:
+        mode (str): "json", "journal", "sqlite" ou "partitionne"
+        chemin_donnees (str): Chemin du fichier JSON principal (les autres
+            fichiers sont placés à côté)
+        processus (int, optional): Processus d'analyse du fichier au chargement
+            (mode json). Par défaut lecture séquentielle
+            
+    Returns:
+        Stockage: Le stockage demandé
+        
+    Raises:
+        ValueError: Si le mode est inconnu
+    """
+    # Imports locaux pour éviter l'import circulaire
+    if mode == "json":
+        from .json_backend import StockageJSON
+        return StockageJSON(chemin_donnees, processus=processus)
+    if mode == "journal":
+        from .journal import Journal
+        return Journal(chemin_donnees)
+    if mode == "sqlite":
+        from .sqlite_backend import StockageSQLite
+        return StockageSQLite(os.path.splitext(chemin_donnees)[0] + ".db")
+    if mode == "partitionne":
+        from .sharded import StockagePartitionne
+        return StockagePartitionne(os.path.splitext(chemin_donnees)[0] + "_partitions")
+    raise ValueError(f"Mode de stockage inconnu : {mode}")
+
+
+def migrer(source, cible, flux=False):
+    """
+    Copie en une fois toutes les données d'un stockage vers un autre
+    
+    Args:
+        source (Stockage): Stockage lu
+        cible (Stockage): Stockage dont le contenu est remplacé
+        flux (bool, optional): Lecture à mémoire bornée de la source. Par défaut False
+        
+    Returns:
+        tuple: (nombre de patients, nombre de consultations) migrés
+    """
+    patients, consultations, _ = source.charger(flux)
+    cible.sauvegarder(patients, consultations)
+    return len(patients), len(consultations)
@@ -0,0 +1,92 @@
+"""
+Cache binaire du graphe chargé, pour des démarrages sans analyse JSON ni validation
+
+Le cache (pickle) contient les registres déjà validés, indexés et reliés. Il
+n'est valable que pour le fichier de données exact dont il provient : taille,
+date de modification et inode sont comparés avant toute désérialisation.
+Comme le fichier de données, il doit rester dans un dossier de confiance
+(pickle exécute du code au chargement).
+"""
+import os
+import pickle
+import sys
+
+from .loader import ramasse_miettes_suspendu
+
+# À incrémenter quand les classes du modèle changent de forme
+FORMAT_CACHE = 3
+
+
+def signature_fichier(chemin):
+    """
+    Empreinte bon marché d'un fichier : change à chaque réécriture
+
+    Args:
+        chemin (str): Fichier à identifier
+
+    Returns:
+        tuple: (taille, date de modification en ns, inode), ou None si absent
+    """
+    try:
+        etat = os.stat(chemin)
+    except FileNotFoundError:
+        return None
+    return (etat.st_size, etat.st_mtime_ns, etat.st_ino)
+
+
+def _en_tete(signature):
+    """En-tête comparé avant de lire les données du cache"""
+    return {"format": FORMAT_CACHE, "python": sys.version_info[:2], "signature": list(signature)}
+
+
+def lire_cache(chemin_cache, signature):
+    """
+    Relit le graphe mis en cache s'il correspond au fichier de données
+
+    Args:
+        chemin_cache (str): Fichier du cache
+        signature (tuple): Signature actuelle du fichier de données
+
+    Returns:
+        tuple: (patients, consultations, orphelines), ou None si le cache est
+        absent, périmé ou illisible
+    """
+    if signature is None:
+        return None
+    # Sans ramasse-miettes, le temps de lecture est divisé par ~4
+    try:
+        with ramasse_miettes_suspendu(), open(chemin_cache, "rb") as f:
+            if pickle.load(f) != _en_tete(signature):
+                return None
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        # Cache tronqué ou écrit par une version incompatible : on l'ignore
+        return None
+
+
+def ecrire_cache(chemin_cache, signature, patients, consultations, orphelines):
+    """
+    Met en cache le graphe correspondant à la version du fichier de données
+
+    Args:
+        chemin_cache (str): Fichier du cache
+        signature (tuple): Signature du fichier de données dont la mémoire est le reflet
+        patients (RegistrePatients): Registre des patients
+        consultations (RegistreConsultations): Registre des consultations
+        orphelines (list): Consultations sans patient
+    """
+    temporaire = chemin_cache + ".tmp"
+    with open(temporaire, "wb") as f:
+        pickle.dump(_en_tete(signature), f, protocol=pickle.HIGHEST_PROTOCOL)
+        pickle.dump((patients, consultations, orphelines), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporaire, chemin_cache)
+
+
+def supprimer_cache(chemin_cache):
+    """Supprime le cache s'il existe"""
+    try:
+        os.remove(chemin_cache)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,128 @@
+"""
+Codecs des prescriptions et encodage binaire compact des lots de consultations
+"""
+import marshal
+
+from models import (
+    Consultation,
+    PrescriptionMedicamenteuse,
+    PrescriptionExamen,
+    PrescriptionKinesitherapie
+)
+
+# Étiquette -> (classe, champs dans l'ordre du constructeur)
+_CODECS = {}
+# Classe -> étiquette
+_ETIQUETTES = {}
+
+# En-tête des lots binaires ; marshal dépend de la version de Python,
+# ces lots servent donc d'échange ou de cache, pas d'archive
+ENTETE_LOT = b"CABC1"
+
+
+def enregistrer_codec(classe, etiquette, champs):
+    """
+    Associe une sous-classe de Prescription à une représentation étiquetée
+
+    Args:
+        classe (type): Sous-classe de Prescription
+        etiquette (str): Étiquette courte et unique
+        champs (list): Attributs transmis au constructeur, dans l'ordre
+
+    Raises:
+        ValueError: Si l'étiquette est déjà utilisée par une autre classe
+    """
+    if etiquette in _CODECS and _CODECS[etiquette][0] is not classe:
+        raise ValueError(f"Étiquette de prescription déjà utilisée : {etiquette}")
+    _CODECS[etiquette] = (classe, tuple(champs))
+    _ETIQUETTES[classe] = etiquette
+
+
+enregistrer_codec(PrescriptionMedicamenteuse, "medicament", ["medicament", "posologie", "frequence", "duree"])
+enregistrer_codec(PrescriptionExamen, "examen", ["type_examen", "laboratoire", "posologie", "duree"])
+enregistrer_codec(PrescriptionKinesitherapie, "kine", ["nb_seances", "zone", "posologie", "duree"])
+
+
+def prescription_vers_donnees(prescription):
+    """
+    Encode une prescription en liste [étiquette, champ1, champ2, ...]
+
+    Les valeurs déjà sérialisables (anciennes données) sont conservées telles quelles.
+
+    Args:
+        prescription (Prescription): Prescription à encoder
+
+    Returns:
+        list: Représentation compacte et sérialisable
+
+    Raises:
+        TypeError: Si la classe n'a pas de codec enregistré
+    """
+    if isinstance(prescription, (dict, list, str)):
+        return prescription
+    etiquette = _ETIQUETTES.get(type(prescription))
+    if etiquette is None:
+        raise TypeError(f"Aucun codec pour la prescription {type(prescription).__name__}")
+    _, champs = _CODECS[etiquette]
+    return [etiquette] + [getattr(prescription, champ) for champ in champs]
+
+
+def donnees_vers_prescription(donnees):
+    """
+    Reconstruit une prescription depuis sa représentation compacte
+
+    Args:
+        donnees (list): [étiquette, champ1, champ2, ...]
+
+    Returns:
+        Prescription: La prescription, ou les données inchangées si elles
+        ne sont pas étiquetées (anciennes données)
+    """
+    if isinstance(donnees, (list, tuple)) and donnees and donnees[0] in _CODECS:
+        classe, _ = _CODECS[donnees[0]]
+        return classe(*donnees[1:])
+    return donnees
+
+
+def encoder_consultations(consultations):
+    """
+    Encode un lot de consultations en binaire (tuples marshal)
+
+    Args:
+        consultations (iterable): Consultations à encoder
+
+    Returns:
+        bytes: Lot encodé
+    """
+    lignes = [
+        (c.identifiant, c.date_heure, c.patient_ssn, c.medecin, c.motif, c.diagnostic,
+         c.statut, c.duree, [prescription_vers_donnees(p) for p in c.prescriptions])
+        for c in consultations
+    ]
+    return ENTETE_LOT + marshal.dumps(lignes)
+
+
+def decoder_consultations(lot):
+    """
+    Décode un lot produit par encoder_consultations
+
+    Args:
+        lot (bytes): Lot encodé
+
+    Returns:
+        list: Consultations reconstruites
+
+    Raises:
+        ValueError: Si le lot n'a pas le bon en-tête
+    """
+    if not lot.startswith(ENTETE_LOT):
+        raise ValueError("Lot de consultations binaire invalide")
+    consultations = []
+    for (identifiant, date_heure, patient_ssn, medecin, motif, diagnostic,
+         statut, duree, prescriptions) in marshal.loads(lot[len(ENTETE_LOT):]):
+        consultations.append(Consultation(
+            date_heure, patient_ssn, medecin, motif, diagnostic,
+            [donnees_vers_prescription(p) for p in prescriptions],
+            statut, identifiant, duree
+        ))
+    return consultations
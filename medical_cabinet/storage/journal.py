@@ -0,0 +1,206 @@
+"""
+Stockage journalisé : instantané JSON complet + journal d'opérations en ajout seul
+
+Chaque mutation ajoute une ligne au journal (coût proportionnel au changement),
+le chargement rejoue le journal sur l'instantané, et une compaction périodique
+réécrit l'instantané puis vide le journal.
+"""
+import json
+import logging
+import os
+
+from models import RegistrePatients, RegistreConsultations
+from .base import Stockage, OPERATIONS
+from .codec import donnees_vers_prescription
+from .loader import lire_enregistrements, lier_consultations, departager_identifiants
+from .serialization import dict_vers_patient, dict_vers_consultation, ecrire_donnees
+
+_journal = logging.getLogger(__name__)
+
+
+class Journal(Stockage):
+    """
+    Stockage journalisé : journal d'écriture anticipée associé à un instantané JSON
+
+    Attributs:
+        chemin_instantane (str): Fichier JSON complet (format de cabinet_data.json)
+        chemin_journal (str): Fichier JSON Lines des opérations depuis l'instantané
+        seuil_compaction (int): Nombre d'entrées déclenchant une compaction
+        nb_entrees (int): Nombre d'entrées actuellement dans le journal
+    """
+
+    def __init__(self, chemin_instantane, chemin_journal=None, seuil_compaction=500):
+        """
+        Initialise le journal
+
+        Args:
+            chemin_instantane (str): Chemin du fichier JSON complet
+            chemin_journal (str, optional): Chemin du journal. Par défaut <instantané>.journal.jsonl
+            seuil_compaction (int, optional): Entrées avant compaction. Par défaut 500
+        """
+        self.chemin_instantane = chemin_instantane
+        if chemin_journal is None:
+            chemin_journal = os.path.splitext(chemin_instantane)[0] + ".journal.jsonl"
+        self.chemin_journal = chemin_journal
+        self.seuil_compaction = seuil_compaction
+        self.nb_entrees = 0
+        self._sequence = 0
+        self._fichier = None
+
+    def charger(self, flux=False):
+        """
+        Charge l'instantané, rejoue les opérations du journal et relie le graphe
+
+        Les entrées déjà incluses dans l'instantané (numéro de séquence inférieur
+        ou égal) sont ignorées, ainsi qu'une dernière ligne tronquée par un arrêt brutal.
+        Aucun fichier n'est écrit : les consultations de l'ancien format reçoivent
+        des identifiants stables (voir identifiant_historique), inscrits dans
+        l'instantané à la prochaine compaction.
+
+        Args:
+            flux (bool, optional): Analyse incrémentale de l'instantané. Par défaut False
+
+        Returns:
+            tuple: (registre des patients, registre des consultations, consultations orphelines)
+        """
+        patients = RegistrePatients()
+        consultations = []
+        self._sequence = 0
+        try:
+            for cle, element in lire_enregistrements(self.chemin_instantane, flux):
+                if cle == "patients":
+                    patients.ajouter(dict_vers_patient(element))
+                elif cle == "consultations":
+                    consultations.append(dict_vers_consultation(element))
+                elif cle == "sequence":
+                    self._sequence = element
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+        departager_identifiants(consultations)
+        par_identifiant = {c.identifiant: c for c in consultations}
+
+        self.nb_entrees = 0
+        try:
+            with open(self.chemin_journal, "r", encoding="utf-8") as f:
+                for ligne in f:
+                    try:
+                        entree = json.loads(ligne)
+                    except json.JSONDecodeError:
+                        # Écriture interrompue : seule la dernière ligne peut être incomplète
+                        break
+                    if entree["seq"] <= self._sequence:
+                        continue
+                    self._rejouer(entree, patients, consultations, par_identifiant)
+                    self._sequence = entree["seq"]
+                    self.nb_entrees += 1
+        except FileNotFoundError:
+            pass
+        consultations = RegistreConsultations(consultations)
+        return patients, consultations, lier_consultations(patients, consultations)
+
+    def _rejouer(self, entree, patients, consultations, par_identifiant):
+        """Applique une entrée du journal à l'état en cours de reconstruction"""
+        operation = entree["op"]
+        if operation == "ajout_patient":
+            patients.ajouter(dict_vers_patient(entree["patient"]))
+        elif operation == "ajout_consultation":
+            consultation = dict_vers_consultation(entree["consultation"])
+            consultations.append(consultation)
+            par_identifiant[consultation.identifiant] = consultation
+        elif operation == "lot":
+            for sous_entree in entree["operations"]:
+                self._rejouer(sous_entree, patients, consultations, par_identifiant)
+        else:
+            consultation = par_identifiant.get(entree["id"])
+            if consultation is None:
+                # Consultation absente de l'instantané (fichier remplacé à la main,
+                # identifiants régénérés...) : l'entrée ne peut pas être appliquée
+                _journal.warning("Entrée %s du journal ignorée : consultation %s inconnue",
+                                 entree.get("seq"), entree["id"])
+            elif operation == "statut":
+                consultation.statut = entree["statut"]
+            elif operation == "diagnostic":
+                consultation.diagnostic = entree["diagnostic"]
+            elif operation == "prescription":
+                consultation.ajouter_prescription(donnees_vers_prescription(entree["prescription"]))
+
+    def enregistrer(self, patients, consultations, operation, **donnees):
+        """Ajoute l'opération au journal, puis compacte si le seuil est atteint"""
+        self.ajouter_entree(operation, **donnees)
+        if self.doit_compacter():
+            self.compacter(patients, consultations)
+
+    def enregistrer_lot(self, patients, consultations, operations):
+        """
+        Ajoute tout le lot comme une seule ligne du journal
+        
+        Une ligne tronquée étant ignorée au rechargement, le lot est rejoué
+        entièrement ou pas du tout.
+        """
+        self.ajouter_entree("lot", operations=[{"op": op, **donnees} for op, donnees in operations])
+        if self.doit_compacter():
+            self.compacter(patients, consultations)
+
+    def ajouter_entree(self, operation, **donnees):
+        """
+        Ajoute une opération à la fin du journal et la force sur disque
+
+        Args:
+            operation (str): Type d'opération (voir OPERATIONS), ou "lot"
+            **donnees: Contenu de l'opération
+
+        Raises:
+            ValueError: Si l'opération est inconnue
+        """
+        if operation not in OPERATIONS and operation != "lot":
+            raise ValueError(f"Opération de journal inconnue : {operation}")
+        self._sequence += 1
+        entree = {"seq": self._sequence, "op": operation, **donnees}
+
+        if self._fichier is None:
+            self._fichier = open(self.chemin_journal, "a", encoding="utf-8")
+        self._fichier.write(json.dumps(entree, ensure_ascii=False) + "\n")
+        self._fichier.flush()
+        os.fsync(self._fichier.fileno())
+        self.nb_entrees += 1
+
+    def doit_compacter(self):
+        """Indique si le journal a atteint le seuil de compaction"""
+        return self.nb_entrees >= self.seuil_compaction
+
+    def compacter(self, patients, consultations):
+        """
+        Réécrit l'instantané à partir de l'état en mémoire puis vide le journal
+
+        L'instantané est écrit dans un fichier temporaire puis substitué
+        atomiquement ; il mémorise la dernière séquence appliquée, de sorte
+        qu'un arrêt avant la remise à zéro du journal ne rejoue rien deux fois.
+
+        Args:
+            patients (RegistrePatients): Registre des patients
+            consultations (RegistreConsultations): Registre des consultations
+        """
+        temporaire = self.chemin_instantane + ".tmp"
+        with open(temporaire, "w", encoding="utf-8") as f:
+            ecrire_donnees(f, patients, consultations, self._sequence)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporaire, self.chemin_instantane)
+
+        self.fermer()
+        open(self.chemin_journal, "w", encoding="utf-8").close()
+        self.nb_entrees = 0
+
+    def sauvegarder(self, patients, consultations):
+        """Remplace l'instantané par l'état complet et vide le journal"""
+        self.compacter(patients, consultations)
+
+    def point_de_controle(self, patients, consultations):
+        """Compacte le journal en fin de session"""
+        self.compacter(patients, consultations)
+
+    def fermer(self):
+        """Ferme le fichier journal s'il est ouvert"""
+        if self._fichier is not None:
+            self._fichier.close()
+            self._fichier = None
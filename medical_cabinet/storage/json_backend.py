@@ -0,0 +1,294 @@
+"""
+Stockage dans un unique fichier JSON réécrit à chaque mutation (format historique)
+
+Plusieurs processus (un par poste d'accueil) peuvent partager le fichier :
+les écritures sont sérialisées par un verrou et le fichier porte un numéro
+de génération. Un processus dont la copie en mémoire est périmée intègre
+d'abord ce que les autres ont écrit au lieu de l'écraser.
+"""
+import os
+import re
+
+from models import ConcurrentWriteError, ConflitModification, ConsultationConflictError
+from .base import Stockage
+from .cache import signature_fichier, lire_cache, ecrire_cache
+from .codec import prescription_vers_donnees
+from .loader import charger_donnees
+from .serialization import ecrire_donnees, patient_vers_dict, consultation_vers_dict
+from .verrou import VerrouFichier
+
+# En-tête écrit par ecrire_donnees(..., generation=n)
+_EN_TETE_GENERATION = re.compile(r'\{\s*"generation":\s*(\d+)')
+
+
+def _enregistrements_touches(operations):
+    """
+    SSN et identifiants de consultations modifiés par des opérations
+
+    Returns:
+        tuple: (SSN des patients ajoutés, identifiants des consultations ajoutées,
+        identifiant -> {opération: données de sa première occurrence} pour les
+        consultations modifiées)
+    """
+    ssns, ajoutees, modifiees = set(), set(), {}
+    for operation, donnees in operations:
+        if operation == "ajout_patient":
+            ssns.add(donnees["patient"]["_ssn"])
+        elif operation == "ajout_consultation":
+            ajoutees.add(donnees["consultation"]["id"])
+        else:
+            modifiees.setdefault(donnees["id"], {}).setdefault(operation, donnees)
+    return ssns, ajoutees, modifiees
+
+
+def _fusionner_consultation(locale, disque, operations):
+    """
+    Version fusionnée d'une consultation modifiée ici et peut-être sur un autre poste
+    
+    Chaque champ touché ici garde la valeur locale, les autres prennent celle
+    du fichier ; les prescriptions sont réunies (par valeur). La version du
+    fichier, relue pour l'occasion, reçoit le résultat.
+    
+    Args:
+        locale (Consultation): Consultation en mémoire
+        disque (Consultation): Même consultation relue dans le fichier
+        operations (dict): Opération -> données, pour les opérations locales
+        
+    Returns:
+        Consultation: disque, complétée
+        
+    Raises:
+        ConcurrentWriteError: Statut changé différemment des deux côtés
+        ConflitModification: Diagnostic saisi différemment des deux côtés
+    """
+    if "statut" in operations:
+        if disque.statut not in ("planifiée", locale.statut):
+            raise ConcurrentWriteError(
+                f"La consultation {locale} a été marquée « {disque.statut} » sur un autre poste.")
+        disque.statut = locale.statut
+    if "diagnostic" in operations:
+        precedent = operations["diagnostic"].get("precedent")
+        if disque.diagnostic not in (precedent, locale.diagnostic):
+            raise ConflitModification(
+                f"Le diagnostic de la consultation {locale} a été saisi sur un autre poste "
+                f"(« {disque.diagnostic} »).")
+        disque.diagnostic = locale.diagnostic
+    valeurs = [prescription_vers_donnees(p) for p in disque.prescriptions]
+    for prescription in locale.prescriptions:
+        valeur = prescription_vers_donnees(prescription)
+        if valeur not in valeurs:
+            valeurs.append(valeur)
+            disque.prescriptions.append(prescription)
+    return disque
+
+
+def _chevauchent(a, b):
+    """Teste si deux consultations non annulées d'un même médecin se chevauchent"""
+    return a.medecin == b.medecin and a.moment < b.fin and b.moment < a.fin
+
+
+class StockageJSON(Stockage):
+    """
+    Stockage JSON complet
+
+    Attributs:
+        chemin (str): Chemin du fichier JSON
+        chemin_cache (str): Cache binaire du graphe chargé (voir storage.cache),
+            None pour toujours analyser le JSON
+        generation (int): Génération du fichier correspondant à la mémoire,
+            None tant que le fichier n'a pas été lu par ce stockage
+        processus (int): Processus d'analyse des gros fichiers (voir
+            charger_donnees), None pour une lecture séquentielle
+    """
+
+    def __init__(self, chemin, cache=True, processus=None):
+        """
+        Initialise le stockage
+
+        Args:
+            chemin (str): Chemin du fichier JSON
+            cache (bool, optional): Démarrage depuis le cache binaire quand le
+                fichier n'a pas changé. Par défaut True
+            processus (int, optional): Analyse et validation réparties sur ce
+                nombre de processus (gros fichiers). Par défaut aucune répartition
+        """
+        self.chemin = chemin
+        self.chemin_cache = os.path.splitext(chemin)[0] + ".cache.pickle" if cache else None
+        self.generation = None
+        self.processus = processus
+        # Signature du fichier dont la mémoire est le reflet (voir point_de_controle)
+        self._signature = None
+        self._verrou = VerrouFichier(chemin + ".lock")
+
+    def _lire_generation(self):
+        """Génération inscrite en tête du fichier (0 si absent ou ancien format)"""
+        try:
+            with open(self.chemin, "r", encoding="utf-8") as f:
+                correspondance = _EN_TETE_GENERATION.match(f.read(64))
+        except FileNotFoundError:
+            return 0
+        return int(correspondance.group(1)) if correspondance else 0
+
+    def charger(self, flux=False):
+        """
+        Charge le fichier en une seule lecture (voir charger_donnees) et note sa génération
+
+        Si le cache binaire correspond exactement au fichier, le graphe en est
+        relu tel quel : ni analyse JSON, ni validation, ni reconstruction des index.
+        """
+        with self._verrou:
+            self.generation = self._lire_generation()
+            self._signature = signature_fichier(self.chemin)
+            if self.chemin_cache is not None:
+                donnees = lire_cache(self.chemin_cache, self._signature)
+                if donnees is not None:
+                    return donnees
+            return charger_donnees(self.chemin, flux, self.processus)
+
+    def enregistrer(self, patients, consultations, operation, **donnees):
+        """Réécrit le fichier complet, quelle que soit la mutation"""
+        self.enregistrer_lot(patients, consultations, [(operation, donnees)])
+
+    def enregistrer_lot(self, patients, consultations, operations):
+        """
+        Réécrit le fichier complet après avoir intégré les écritures des autres processus
+
+        Raises:
+            ConcurrentWriteError: Si un autre processus a modifié différemment
+                un enregistrement touché par les opérations
+            ConsultationConflictError: Si un autre processus a réservé un
+                créneau chevauchant une consultation ajoutée
+        """
+        with self._verrou:
+            generation = self._lire_generation()
+            if self.generation is not None and generation != self.generation:
+                self._fusionner(patients, consultations, operations)
+            self._ecrire(patients, consultations, generation + 1)
+
+    def sauvegarder(self, patients, consultations):
+        """
+        Sauvegarde complète des patients et consultations dans le fichier JSON
+
+        Le fichier est écrit à côté puis substitué d'un bloc (os.replace) :
+        un arrêt en cours d'écriture laisse l'ancienne version intacte. Seuls
+        les enregistrements modifiés depuis la dernière sauvegarde sont
+        resérialisés (voir ecrire_donnees). Les écritures des autres processus
+        depuis la lecture sont d'abord intégrées en mémoire.
+        """
+        self.enregistrer_lot(patients, consultations, [])
+
+    def actualiser(self, patients, consultations):
+        """
+        Intègre en mémoire ce que les autres processus ont écrit depuis la dernière lecture
+
+        Ne coûte que la lecture de l'en-tête quand le fichier n'a pas changé.
+
+        Returns:
+            bool: True si des données ont été relues
+        """
+        if self.generation is None or self._lire_generation() == self.generation:
+            return False
+        with self._verrou:
+            generation = self._lire_generation()
+            if generation == self.generation:
+                return False
+            self._fusionner(patients, consultations, [])
+            self.generation = generation
+            self._signature = signature_fichier(self.chemin)
+        return True
+
+    def point_de_controle(self, patients, consultations):
+        """
+        Met en cache le graphe en mémoire pour le prochain démarrage
+
+        Le cache n'est écrit que si le fichier est toujours celui que la
+        mémoire reflète (aucune écriture d'un autre processus depuis).
+        """
+        if self.chemin_cache is None:
+            return
+        with self._verrou:
+            if self._signature is None or signature_fichier(self.chemin) != self._signature:
+                return
+            orphelines = [c for c in consultations if c.patient_ssn not in patients]
+            ecrire_cache(self.chemin_cache, self._signature, patients, consultations, orphelines)
+
+    def _ecrire(self, patients, consultations, generation):
+        """Écrit le fichier complet sous le verrou et mémorise sa nouvelle génération"""
+        temporaire = self.chemin + ".tmp"
+        with open(temporaire, "w", encoding="utf-8") as f:
+            ecrire_donnees(f, patients, consultations, generation=generation)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporaire, self.chemin)
+        self.generation = generation
+        self._signature = signature_fichier(self.chemin)
+
+    def _fusionner(self, patients, consultations, operations):
+        """
+        Intègre en mémoire la version du fichier écrite par d'autres processus
+
+        Les enregistrements absents de la mémoire sont ajoutés ; ceux que la
+        mémoire a sans les avoir touchés reprennent la version du fichier
+        (champs du patient, statut, diagnostic et prescriptions de la
+        consultation). Les consultations touchées par les opérations sont
+        fusionnées champ par champ (voir _fusionner_consultation). Les
+        conflits sont détectés avant toute modification de la mémoire.
+
+        Raises:
+            ConcurrentWriteError: Même SSN créé des deux côtés, ou même
+                consultation passée à deux statuts différents
+            ConflitModification: Même consultation avec deux diagnostics différents
+            ConsultationConflictError: Créneau réservé des deux côtés
+        """
+        disque_patients, disque_consultations, _ = charger_donnees(self.chemin, processus=self.processus)
+        ssns, ajoutees, modifiees = _enregistrements_touches(operations)
+
+        nouveaux_patients, patients_modifies = [], []
+        for patient in disque_patients:
+            local = patients.obtenir(patient.ssn)
+            if local is None:
+                nouveaux_patients.append(patient)
+            elif patient.ssn in ssns:
+                raise ConcurrentWriteError(
+                    f"Le patient {patient.ssn} vient d'être créé sur un autre poste.")
+            elif patient_vers_dict(patient) != patient_vers_dict(local):
+                patients_modifies.append((local, patient))
+
+        nouvelles_consultations, consultations_modifiees = [], []
+        for consultation in disque_consultations:
+            local = consultations.obtenir(consultation.identifiant)
+            if local is None:
+                nouvelles_consultations.append(consultation)
+                continue
+            if consultation.identifiant in modifiees:
+                consultation = _fusionner_consultation(local, consultation, modifiees[consultation.identifiant])
+            if consultation_vers_dict(consultation) != consultation_vers_dict(local):
+                consultations_modifiees.append((local, consultation))
+
+        # Créneaux réservés ici et sur un autre poste en même temps
+        for identifiant in ajoutees:
+            locale = consultations.obtenir(identifiant)
+            if locale is None or locale.statut == "annulée":
+                continue
+            for consultation in nouvelles_consultations:
+                if consultation.statut != "annulée" and _chevauchent(locale, consultation):
+                    raise ConsultationConflictError(
+                        f"Dr {locale.medecin} vient d'être réservé sur un autre poste ({consultation}).")
+
+        # Seule étape qui modifie la mémoire : les lectures concurrentes l'attendent
+        with self.verrou_memoire:
+            for patient in nouveaux_patients:
+                patient.consultations = []
+                patients.ajouter(patient)
+            for local, patient in patients_modifies:
+                patients.actualiser(local, patient)
+            for consultation in nouvelles_consultations:
+                consultations.ajouter(consultation)
+                patient = patients.obtenir(consultation.patient_ssn)
+                if patient is not None:
+                    patient.ajouter_consultation(consultation)
+            for local, consultation in consultations_modifiees:
+                if consultation.statut != local.statut:
+                    consultations.restaurer_statut(local, consultation.statut)
+                local.diagnostic = consultation.diagnostic
+                local.prescriptions = consultation.prescriptions
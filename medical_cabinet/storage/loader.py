@@ -0,0 +1,337 @@
+"""
+Chargement des données du cabinet et reconstruction du graphe patients-consultations
+"""
+import contextlib
+import gc
+import json
+import os
+import sys
+
+from models import RegistrePatients, RegistreConsultations
+from .serialization import dict_vers_patient, dict_vers_consultation
+
+# Taille des blocs lus en mode flux
+TAILLE_BLOC = 64 * 1024
+
+# Chargement parallèle : en dessous de cette taille de fichier, lancer les
+# processus coûte plus qu'il ne rapporte
+SEUIL_PARALLELE = 8 * 2 ** 20
+# Taille visée (en caractères) d'un lot de texte confié à un processus
+TAILLE_LOT = 2 * 2 ** 20
+
+# Repères de la mise en forme d'ecrire_donnees (json, indent=2). Une chaîne
+# JSON ne contient jamais de saut de ligne brut : ces séquences n'apparaissent
+# qu'entre deux enregistrements d'un tableau racine et à sa fermeture.
+_SEPARATEUR = "\n    },\n    {"
+_FIN_TABLEAU = "\n  ]"
+
+
+@contextlib.contextmanager
+def ramasse_miettes_suspendu():
+    """
+    Suspend le ramasse-miettes cyclique le temps de créer un graphe d'objets
+    
+    Des centaines de milliers d'objets créés d'un coup le déclencheraient à
+    répétition sans rien libérer (temps de construction presque doublé).
+    """
+    actif = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if actif:
+            gc.enable()
+
+
+class _LecteurFlux:
+    """
+    Analyseur JSON incrémental du fichier du cabinet
+    
+    Parcourt l'objet racine et produit un à un les éléments de ses tableaux,
+    en ne gardant en mémoire que le bloc courant et l'enregistrement en cours.
+    """
+
+    _BLANCS = " \t\r\n"
+    _DELIMITEURS = _BLANCS + ",:]}"
+
+    def __init__(self, fichier, taille_bloc=TAILLE_BLOC):
+        self._fichier = fichier
+        self._taille_bloc = taille_bloc
+        self._decodeur = json.JSONDecoder()
+        self._tampon = ""
+        self._pos = 0
+        self._fin = False
+
+    def _lire_bloc(self):
+        """Ajoute un bloc au tampon en oubliant la partie déjà consommée"""
+        bloc = self._fichier.read(self._taille_bloc)
+        if not bloc:
+            self._fin = True
+            return False
+        self._tampon = self._tampon[self._pos:] + bloc
+        self._pos = 0
+        return True
+
+    def _caractere(self):
+        """Retourne le prochain caractère significatif sans le consommer"""
+        while True:
+            while self._pos < len(self._tampon) and self._tampon[self._pos] in self._BLANCS:
+                self._pos += 1
+            if self._pos < len(self._tampon):
+                return self._tampon[self._pos]
+            if not self._lire_bloc():
+                raise json.JSONDecodeError("Fin de fichier inattendue", self._tampon, self._pos)
+
+    def _attendre(self, caractere):
+        """Consomme le caractère attendu ou lève une erreur de format"""
+        if self._caractere() != caractere:
+            raise json.JSONDecodeError(f"'{caractere}' attendu", self._tampon, self._pos)
+        self._pos += 1
+
+    def _valeur(self):
+        """Décode la valeur suivante, en lisant des blocs tant qu'elle est incomplète"""
+        self._caractere()
+        while True:
+            try:
+                valeur, fin = self._decodeur.raw_decode(self._tampon, self._pos)
+                # Un nombre coupé par la fin du bloc ("1." de "1.5") se décode
+                # sans erreur : la valeur n'est sûre que suivie d'un délimiteur
+                if self._fin or (fin < len(self._tampon) and self._tampon[fin] in self._DELIMITEURS):
+                    self._pos = fin
+                    return valeur
+            except json.JSONDecodeError:
+                if self._fin:
+                    raise
+            self._lire_bloc()
+
+    def elements(self):
+        """
+        Parcourt l'objet racine
+        
+        Yields:
+            tuple: (clé, élément) pour chaque élément d'un tableau racine,
+            (clé, valeur) pour les autres valeurs racine
+        """
+        self._attendre("{")
+        if self._caractere() == "}":
+            return
+        while True:
+            cle = self._valeur()
+            self._attendre(":")
+            if self._caractere() == "[":
+                self._pos += 1
+                if self._caractere() == "]":
+                    self._pos += 1
+                else:
+                    while True:
+                        yield cle, self._valeur()
+                        if self._caractere() == "]":
+                            self._pos += 1
+                            break
+                        self._attendre(",")
+            else:
+                yield cle, self._valeur()
+            if self._caractere() == "}":
+                return
+            self._attendre(",")
+
+
+def lire_enregistrements(chemin, flux=False):
+    """
+    Parcourt le fichier du cabinet enregistrement par enregistrement
+    
+    Args:
+        chemin (str): Chemin du fichier JSON
+        flux (bool, optional): Analyse incrémentale à mémoire bornée. Par défaut False
+        
+    Yields:
+        tuple: ("patients", dict), ("consultations", dict) ou (clé, valeur) pour
+        les autres entrées racine (ex: "sequence")
+    """
+    with open(chemin, "r", encoding="utf-8") as f:
+        if flux:
+            yield from _LecteurFlux(f).elements()
+            return
+        data = json.load(f)
+    for cle, valeur in data.items():
+        if isinstance(valeur, list):
+            for element in valeur:
+                yield cle, element
+        else:
+            yield cle, valeur
+
+
+def charger_donnees(chemin, flux=False, processus=None):
+    """
+    Charge patients et consultations en une seule lecture du fichier et les relie
+    
+    Args:
+        chemin (str): Chemin du fichier JSON
+        flux (bool, optional): Analyse incrémentale (mémoire proportionnelle à
+            un enregistrement plutôt qu'au document). Par défaut False
+        processus (int, optional): Analyse et validation réparties sur ce
+            nombre de processus pour les gros fichiers (voir
+            construire_en_parallele). Par défaut aucune répartition
+            
+    Returns:
+        tuple: (registre des patients, registre des consultations, consultations orphelines)
+    """
+    try:
+        with ramasse_miettes_suspendu():
+            objets = None
+            if processus and processus > 1 and not flux and os.path.getsize(chemin) >= SEUIL_PARALLELE:
+                objets = construire_en_parallele(chemin, processus)
+            if objets is None:
+                objets = {"patients": [], "consultations": []}
+                for cle, element in lire_enregistrements(chemin, flux):
+                    if cle == "patients":
+                        objets[cle].append(dict_vers_patient(element))
+                    elif cle == "consultations":
+                        objets[cle].append(dict_vers_consultation(element))
+            departager_identifiants(objets["consultations"])
+            patients = RegistrePatients()
+            for patient in objets["patients"]:
+                patients.ajouter(patient)
+            consultations = RegistreConsultations(objets["consultations"])
+    except (FileNotFoundError, json.JSONDecodeError, KeyError, TypeError):
+        return RegistrePatients(), RegistreConsultations(), []
+    return patients, consultations, lier_consultations(patients, consultations)
+
+
+def _decouper(texte, cle, taille_lot):
+    """
+    Découpe un tableau racine en lots de texte JSON sans l'analyser
+    
+    Returns:
+        list: Lots "[{...}, ...]" dans l'ordre du fichier, ou None si la mise
+        en forme n'est pas celle d'ecrire_donnees
+    """
+    ouverture = f'\n  "{cle}": ['
+    debut = texte.find(ouverture)
+    if debut == -1:
+        return None
+    debut += len(ouverture)
+    if texte.startswith("]", debut):
+        return []
+    fin = texte.find(_FIN_TABLEAU, debut)
+    if fin == -1:
+        return None
+    lots = []
+    while True:
+        coupure = texte.find(_SEPARATEUR, debut + taille_lot, fin)
+        if coupure == -1:
+            lots.append("[" + texte[debut:fin] + "]")
+            return lots
+        # Le lot se termine sur "}" ; le suivant reprend après la virgule
+        lots.append("[" + texte[debut:coupure + 6] + "]")
+        debut = coupure + 7
+
+
+def _construire_lot(cle, lot):
+    """Analyse et valide un lot d'enregistrements (exécuté dans un processus de travail)"""
+    convertir = dict_vers_patient if cle == "patients" else dict_vers_consultation
+    with ramasse_miettes_suspendu():
+        return [convertir(element) for element in json.loads(lot)]
+
+
+def construire_en_parallele(chemin, processus, taille_lot=TAILLE_LOT):
+    """
+    Analyse JSON, validation et construction des enregistrements réparties sur plusieurs processus
+    
+    Le texte des tableaux est découpé aux frontières d'enregistrements sans
+    être analysé ; chaque processus décode ses lots et construit les patients
+    et consultations (SSN, dates) qu'il renvoie. Les lots sont réassemblés
+    dans l'ordre du fichier : le résultat ne dépend ni du nombre de
+    processus ni de l'ordre dans lequel ils terminent. Une erreur de
+    validation dans un lot est relevée telle quelle.
+    
+    Args:
+        chemin (str): Chemin du fichier JSON (écrit par ecrire_donnees)
+        processus (int): Nombre de processus de travail
+        taille_lot (int, optional): Taille visée d'un lot en caractères. Par défaut TAILLE_LOT
+        
+    Returns:
+        dict: {"patients": [Patient], "consultations": [Consultation]}, ou None
+        si le fichier n'a pas la mise en forme attendue (lecture séquentielle à faire)
+        
+    Raises:
+        InvalidSecurityNumberError, ValueError: Enregistrement invalide dans un lot
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    with open(chemin, "r", encoding="utf-8") as f:
+        texte = f.read()
+    taches = []
+    for cle in ("patients", "consultations"):
+        lots = _decouper(texte, cle, taille_lot)
+        if lots is None:
+            return None
+        taches.extend((cle, lot) for lot in lots)
+    del texte
+
+    objets = {"patients": [], "consultations": []}
+    if not taches:
+        return objets
+    with ProcessPoolExecutor(min(processus, len(taches))) as executeur:
+        resultats = executeur.map(_construire_lot, *zip(*taches))
+        try:
+            for (cle, _), construits in zip(taches, resultats):
+                objets[cle].extend(construits)
+        except json.JSONDecodeError:
+            # Découpage trompé par une mise en forme inhabituelle
+            return None
+    # Les chaînes internées par chaque processus arrivent en copies distinctes
+    for consultation in objets["consultations"]:
+        consultation.patient_ssn = sys.intern(consultation.patient_ssn)
+        consultation.medecin = sys.intern(consultation.medecin)
+        consultation.statut = consultation.statut
+    return objets
+
+
+def departager_identifiants(consultations):
+    """
+    Rend uniques les identifiants en double, dans l'ordre du fichier
+    
+    Deux consultations de l'ancien format ayant même patient, date/heure et
+    médecin reçoivent le même identifiant historique : la seconde est
+    suffixée de son rang, ce qui reste identique d'un chargement à l'autre.
+    
+    Args:
+        consultations (list): Consultations lues, dans l'ordre du fichier
+    """
+    vus = set()
+    for consultation in consultations:
+        if consultation.identifiant in vus:
+            rang = 1
+            while f"{consultation.identifiant}-{rang}" in vus:
+                rang += 1
+            consultation.identifiant = f"{consultation.identifiant}-{rang}"
+        vus.add(consultation.identifiant)
+
+
+def lier_consultations(patients, consultations):
+    """
+    Rattache chaque consultation à l'historique de son patient en une seule passe
+    
+    Les consultations sont regroupées par SSN puis chaque groupe est affecté
+    au patient correspondant via le registre : coût O(P + C) au lieu de O(P·C).
+    Les historiques existants sont remplacés, l'appel est donc idempotent.
+    
+    Args:
+        patients (RegistrePatients): Registre des patients
+        consultations (iterable): Consultations (ordre conservé par patient)
+        
+    Returns:
+        list: Consultations orphelines dont le SSN ne correspond à aucun patient
+    """
+    par_ssn = {}
+    for consultation in consultations:
+        par_ssn.setdefault(consultation.patient_ssn, []).append(consultation)
+
+    for patient in patients:
+        patient.consultations = par_ssn.pop(patient.ssn, [])
+
+    orphelines = []
+    for groupe in par_ssn.values():
+        orphelines.extend(groupe)
+    return orphelines
@@ -0,0 +1,185 @@
+"""
+Conversion des objets métier en dictionnaires JSON et inversement
+"""
+import json
+
+from models import Patient, Consultation
+from .codec import prescription_vers_donnees, donnees_vers_prescription
+
+
+def patient_vers_dict(patient):
+    """
+    Convertit un patient en dictionnaire sérialisable
+    
+    Args:
+        patient (Patient): Patient à convertir
+        
+    Returns:
+        dict: Représentation JSON du patient
+    """
+    return {
+        "_ssn": patient.ssn,
+        "nom": patient.nom,
+        "prenom": patient.prenom,
+        "date_naissance": patient.date_naissance.strftime("%Y-%m-%d"),
+        "adresse": patient.adresse,
+        "_telephone": patient.telephone
+    }
+
+
+def dict_vers_patient(p_data):
+    """
+    Reconstruit un patient depuis sa représentation JSON
+    
+    Args:
+        p_data (dict): Données du patient
+        
+    Returns:
+        Patient: Le patient reconstruit
+    """
+    return Patient(
+        ssn=p_data.get("_ssn") or p_data.get("ssn"),
+        nom=p_data["nom"],
+        prenom=p_data["prenom"],
+        date_naissance=p_data["date_naissance"],
+        adresse=p_data["adresse"],
+        telephone=p_data.get("_telephone") or p_data.get("telephone")
+    )
+
+
+def consultation_vers_dict(consultation):
+    """
+    Convertit une consultation en dictionnaire sérialisable
+    
+    Args:
+        consultation (Consultation): Consultation à convertir
+        
+    Returns:
+        dict: Représentation JSON de la consultation
+    """
+    return {
+        "id": consultation.identifiant,
+        "date_heure": consultation.date_heure,
+        "patient_ssn": consultation.patient_ssn,
+        "medecin": consultation.medecin,
+        "motif": consultation.motif,
+        "diagnostic": consultation.diagnostic,
+        "prescriptions": [prescription_vers_donnees(p) for p in consultation.prescriptions],
+        "statut": consultation.statut,
+        "duree": consultation.duree
+    }
+
+
+def identifiant_historique(c_data):
+    """
+    Identifiant stable d'une consultation enregistrée sans identifiant (ancien format)
+    
+    Dérivé du patient, de la date/heure et du médecin : chaque chargement,
+    dans chaque processus, attribue le même identifiant à la même consultation.
+    
+    Args:
+        c_data (dict): Données de la consultation
+        
+    Returns:
+        str: Identifiant hexadécimal (uuid5)
+    """
+    # Import différé, comme pour les identifiants des nouvelles consultations
+    import uuid
+    cle = f"{c_data['patient_ssn']}|{c_data['date_heure']}|{c_data['medecin']}"
+    return uuid.uuid5(uuid.NAMESPACE_OID, cle).hex
+
+
+def dict_vers_consultation(c_data):
+    """
+    Reconstruit une consultation depuis sa représentation JSON
+    
+    Args:
+        c_data (dict): Données de la consultation (sans "id" dans l'ancien
+            format : voir identifiant_historique)
+        
+    Returns:
+        Consultation: La consultation reconstruite
+    """
+    identifiant = c_data.get("id")
+    if not identifiant:
+        identifiant = identifiant_historique(c_data)
+    return Consultation(
+        date_heure=c_data["date_heure"],
+        patient_ssn=c_data["patient_ssn"],
+        medecin=c_data["medecin"],
+        motif=c_data["motif"],
+        diagnostic=c_data.get("diagnostic"),
+        prescriptions=[donnees_vers_prescription(p) for p in c_data.get("prescriptions", [])],
+        statut=c_data.get("statut", "planifiée"),
+        identifiant=identifiant,
+        duree=c_data.get("duree")
+    )
+
+
+def patient_vers_json(patient):
+    """
+    Texte JSON d'un patient tel qu'écrit dans le fichier, recalculé seulement s'il a été modifié
+    
+    Args:
+        patient (Patient): Patient à convertir
+        
+    Returns:
+        str: Texte JSON indenté pour figurer dans la liste "patients"
+    """
+    if patient._serialisation is None:
+        patient._serialisation = _indenter(patient_vers_dict(patient))
+    return patient._serialisation
+
+
+def consultation_vers_json(consultation):
+    """
+    Texte JSON d'une consultation tel qu'écrit dans le fichier, recalculé seulement si elle a été modifiée
+    
+    Args:
+        consultation (Consultation): Consultation à convertir
+        
+    Returns:
+        str: Texte JSON indenté pour figurer dans la liste "consultations"
+    """
+    if consultation._serialisation is None:
+        consultation._serialisation = _indenter(consultation_vers_dict(consultation))
+    return consultation._serialisation
+
+
+def _indenter(donnees):
+    """Encode un élément de liste avec l'indentation qu'il a dans json.dump(indent=2)"""
+    # Un texte JSON ne contient pas de saut de ligne brut : on peut réindenter
+    return json.dumps(donnees, ensure_ascii=False, indent=2).replace("\n", "\n    ")
+
+
+def _liste(cle, textes):
+    """Texte de "cle": [...] à partir des textes JSON des éléments"""
+    if not textes:
+        return f'  "{cle}": []'
+    return f'  "{cle}": [\n    ' + ",\n    ".join(textes) + "\n  ]"
+
+
+def ecrire_donnees(f, patients, consultations, sequence=None, generation=None):
+    """
+    Écrit le fichier de données complet en réutilisant les formes JSON mémorisées
+    
+    Seuls les patients et consultations modifiés depuis la dernière
+    sauvegarde sont resérialisés ; le résultat est identique à
+    json.dump(..., ensure_ascii=False, indent=2).
+    
+    Args:
+        f (file): Fichier texte ouvert en écriture
+        patients (RegistrePatients): Registre des patients
+        consultations (RegistreConsultations): Registre des consultations
+        sequence (int, optional): Numéro de séquence du journal à inscrire en tête
+        generation (int, optional): Numéro de version du fichier à inscrire en tête
+    """
+    f.write("{\n")
+    if generation is not None:
+        f.write(f'  "generation": {generation},\n')
+    if sequence is not None:
+        f.write(f'  "sequence": {sequence},\n')
+    f.write(_liste("patients", [patient_vers_json(p) for p in patients]))
+    f.write(",\n")
+    f.write(_liste("consultations", [consultation_vers_json(c) for c in consultations]))
+    f.write("\n}")
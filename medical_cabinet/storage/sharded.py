@@ -0,0 +1,351 @@
+"""
+Stockage partitionné : patients répartis par préfixe de SSN, consultations par mois
+
+Un manifeste liste les partitions existantes. Chaque partition est un petit
+fichier au format de cabinet_data.json, réécrit seulement quand une mutation
+la concerne ; les requêtes ciblées (un patient, une journée) ne lisent que
+les partitions utiles.
+
+Un lot ne remplace jamais une partition en place : ses partitions sont
+écrites sous un nouveau numéro de génération, puis le manifeste qui les
+désigne est substitué d'un bloc. C'est ce remplacement qui valide le lot
+entier ; un arrêt avant lui laisse le manifeste précédent et ses fichiers
+intacts, les fichiers orphelins étant supprimés par la sauvegarde complète
+suivante.
+"""
+import json
+import os
+from datetime import date, datetime
+
+from models import RegistrePatients, RegistreConsultations
+from .base import Stockage
+from .loader import lire_enregistrements, lier_consultations
+from .serialization import dict_vers_patient, dict_vers_consultation, ecrire_donnees
+
+# Version 2 : partitions suffixées par la génération du lot qui les a écrites
+VERSION_MANIFESTE = 2
+
+
+def _ecrire_atomique(chemin, ecrire):
+    """Écrit un fichier via un fichier temporaire substitué d'un bloc"""
+    temporaire = chemin + ".tmp"
+    with open(temporaire, "w", encoding="utf-8") as f:
+        ecrire(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporaire, chemin)
+
+
+def _suffixe(generation):
+    """Suffixe des fichiers d'une génération (aucun pour les manifestes version 1)"""
+    return "" if generation is None else f".g{generation}"
+
+
+def _entree(valeur):
+    """Entrée de manifeste d'une partition (version 1 : effectif seul)"""
+    if isinstance(valeur, int):
+        return {"effectif": valeur, "generation": None}
+    return valeur
+
+
+def _mois(consultation):
+    """
+    Clé de partition d'une consultation : "YYYY-MM" de sa date
+    
+    Tirée de la date analysée et non du texte saisi, qui peut ne pas être
+    complété de zéros ("2024-3-5 9:00").
+    """
+    return consultation.moment.strftime("%Y-%m")
+
+
+def _bornes_mois(mois):
+    """Premier instant du mois et premier instant du mois suivant"""
+    debut = datetime.strptime(mois, "%Y-%m")
+    if debut.month == 12:
+        return debut, debut.replace(year=debut.year + 1, month=1)
+    return debut, debut.replace(month=debut.month + 1)
+
+
+class StockagePartitionne(Stockage):
+    """
+    Stockage réparti en partitions JSON indépendantes
+    
+    Arborescence du dossier (<g> : génération qui a écrit la partition) :
+        manifeste.json                    partitions existantes, effectifs et générations
+        patients/<préfixe>.g<g>.json      patients dont le SSN commence par le préfixe
+        patients/<préfixe>.g<g>.mois.json SSN -> mois où le patient a des consultations
+        consultations/<AAAA-MM>.g<g>.json consultations du mois
+    
+    Attributs:
+        dossier (str): Dossier des partitions
+        longueur_prefixe (int): Nombre de chiffres du SSN formant la clé de partition
+    """
+
+    def __init__(self, dossier, longueur_prefixe=3):
+        """
+        Initialise le stockage (le manifeste existant impose sa longueur de préfixe)
+        
+        Args:
+            dossier (str): Dossier des partitions (créé si besoin)
+            longueur_prefixe (int, optional): Chiffres du SSN par partition. Par défaut 3
+        """
+        self.dossier = dossier
+        self.longueur_prefixe = longueur_prefixe
+        self._manifeste = {"version": VERSION_MANIFESTE, "longueur_prefixe": longueur_prefixe,
+                           "generation": 0, "patients": {}, "consultations": {}}
+        try:
+            with open(self._chemin_manifeste(), "r", encoding="utf-8") as f:
+                self._manifeste = json.load(f)
+            self.longueur_prefixe = self._manifeste["longueur_prefixe"]
+        except FileNotFoundError:
+            pass
+        self._manifeste.setdefault("generation", 0)
+        for section in ("patients", "consultations"):
+            self._manifeste[section] = {cle: _entree(valeur)
+                                        for cle, valeur in self._manifeste[section].items()}
+        # Préfixe -> SSN des patients de la partition (construit au chargement)
+        self._ssn_par_prefixe = None
+
+    # --- Chemins ---
+
+    def _chemin_manifeste(self):
+        return os.path.join(self.dossier, "manifeste.json")
+
+    def _chemin_patients(self, prefixe, generation):
+        return os.path.join(self.dossier, "patients", f"{prefixe}{_suffixe(generation)}.json")
+
+    def _chemin_mois_patients(self, prefixe, generation):
+        return os.path.join(self.dossier, "patients", f"{prefixe}{_suffixe(generation)}.mois.json")
+
+    def _chemin_consultations(self, mois, generation):
+        return os.path.join(self.dossier, "consultations", f"{mois}{_suffixe(generation)}.json")
+
+    def _generation(self, section, cle):
+        """Génération de la partition validée par le manifeste"""
+        return self._manifeste[section][cle]["generation"]
+
+    def _prefixe(self, ssn):
+        return ssn[:self.longueur_prefixe]
+
+    # --- Lecture ---
+
+    def _lire_partition(self, chemin, flux=False):
+        """Parcourt les enregistrements d'une partition (vide si le fichier manque)"""
+        try:
+            yield from lire_enregistrements(chemin, flux)
+        except FileNotFoundError:
+            return
+
+    def _lire_mois_patients(self, prefixe):
+        try:
+            chemin = self._chemin_mois_patients(prefixe, self._generation("patients", prefixe))
+            with open(chemin, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def charger(self, flux=False):
+        """Charge toutes les partitions listées dans le manifeste"""
+        patients = RegistrePatients()
+        self._ssn_par_prefixe = {}
+        for prefixe in self._manifeste["patients"]:
+            groupe = self._ssn_par_prefixe[prefixe] = []
+            chemin = self._chemin_patients(prefixe, self._generation("patients", prefixe))
+            for cle, element in self._lire_partition(chemin, flux):
+                if cle == "patients":
+                    patient = dict_vers_patient(element)
+                    patients.ajouter(patient)
+                    groupe.append(patient.ssn)
+        consultations = []
+        for mois in self._manifeste["consultations"]:
+            chemin = self._chemin_consultations(mois, self._generation("consultations", mois))
+            for cle, element in self._lire_partition(chemin, flux):
+                if cle == "consultations":
+                    consultations.append(dict_vers_consultation(element))
+        consultations = RegistreConsultations(consultations)
+        return patients, consultations, lier_consultations(patients, consultations)
+
+    def charger_patient(self, ssn):
+        """
+        Charge un seul patient et son historique en ne lisant que ses partitions
+        
+        Args:
+            ssn (str): Numéro de sécurité sociale
+        
+        Returns:
+            Patient: Le patient avec ses consultations, ou None
+        """
+        prefixe = self._prefixe(ssn)
+        if prefixe not in self._manifeste["patients"]:
+            return None
+        patient = None
+        for cle, element in self._lire_partition(
+                self._chemin_patients(prefixe, self._generation("patients", prefixe))):
+            if cle == "patients" and (element.get("_ssn") or element.get("ssn")) == ssn:
+                patient = dict_vers_patient(element)
+                break
+        if patient is None:
+            return None
+        for mois in self._lire_mois_patients(prefixe).get(ssn, []):
+            if mois not in self._manifeste["consultations"]:
+                continue
+            chemin = self._chemin_consultations(mois, self._generation("consultations", mois))
+            patient.consultations.extend(
+                dict_vers_consultation(element)
+                for cle, element in self._lire_partition(chemin)
+                if cle == "consultations" and element["patient_ssn"] == ssn)
+        return patient
+
+    def charger_mois(self, mois):
+        """
+        Charge les consultations d'un mois (une seule partition)
+        
+        Args:
+            mois (str): Mois au format YYYY-MM
+        
+        Returns:
+            list: Consultations du mois triées par date/heure
+        """
+        if mois not in self._manifeste["consultations"]:
+            return []
+        chemin = self._chemin_consultations(mois, self._generation("consultations", mois))
+        consultations = [dict_vers_consultation(element)
+                         for cle, element in self._lire_partition(chemin)
+                         if cle == "consultations"]
+        consultations.sort(key=lambda c: (c.moment, c.identifiant))
+        return consultations
+
+    def agenda_du_jour(self, jour=None):
+        """
+        Consultations d'une journée, en ne lisant que la partition de son mois
+        
+        Args:
+            jour (date, optional): Journée. Par défaut aujourd'hui
+        
+        Returns:
+            list: Consultations de la journée triées par heure
+        """
+        if jour is None:
+            jour = date.today()
+        return [c for c in self.charger_mois(jour.strftime("%Y-%m")) if c.moment.date() == jour]
+
+    # --- Écriture ---
+
+    def _grouper_patients(self, patients):
+        """Construit l'association préfixe -> SSN si le stockage n'a pas chargé ces patients"""
+        if self._ssn_par_prefixe is None:
+            self._ssn_par_prefixe = {}
+            for patient in patients:
+                self._ssn_par_prefixe.setdefault(self._prefixe(patient.ssn), []).append(patient.ssn)
+
+    def _ecrire_patients(self, patients, prefixe, manifeste):
+        """Écrit la partition d'un préfixe et l'index des mois de ses patients (génération du manifeste)"""
+        generation = manifeste["generation"]
+        groupe = [patients.obtenir(ssn) for ssn in self._ssn_par_prefixe.get(prefixe, [])]
+        groupe = [p for p in groupe if p is not None]
+        os.makedirs(os.path.join(self.dossier, "patients"), exist_ok=True)
+        _ecrire_atomique(self._chemin_patients(prefixe, generation),
+                         lambda f: ecrire_donnees(f, groupe, []))
+        mois_par_ssn = {p.ssn: sorted({_mois(c) for c in p.consultations}) for p in groupe}
+        _ecrire_atomique(self._chemin_mois_patients(prefixe, generation),
+                         lambda f: json.dump(mois_par_ssn, f, ensure_ascii=False))
+        manifeste["patients"][prefixe] = {"effectif": len(groupe), "generation": generation}
+
+    def _ecrire_consultations(self, consultations, mois, manifeste):
+        """Écrit la partition d'un mois depuis l'index chronologique du registre (génération du manifeste)"""
+        groupe = consultations.entre(*_bornes_mois(mois))
+        os.makedirs(os.path.join(self.dossier, "consultations"), exist_ok=True)
+        _ecrire_atomique(self._chemin_consultations(mois, manifeste["generation"]),
+                         lambda f: ecrire_donnees(f, [], groupe))
+        manifeste["consultations"][mois] = {"effectif": len(groupe), "generation": manifeste["generation"]}
+
+    def _ecrire_manifeste(self, manifeste):
+        os.makedirs(self.dossier, exist_ok=True)
+        manifeste["patients"] = dict(sorted(manifeste["patients"].items()))
+        manifeste["consultations"] = dict(sorted(manifeste["consultations"].items()))
+        _ecrire_atomique(self._chemin_manifeste(),
+                         lambda f: json.dump(manifeste, f, ensure_ascii=False, indent=2))
+
+    def _fichiers(self, manifeste):
+        """Chemins des fichiers de partition désignés par un manifeste"""
+        fichiers = set()
+        for prefixe, entree in manifeste["patients"].items():
+            fichiers.add(self._chemin_patients(prefixe, entree["generation"]))
+            fichiers.add(self._chemin_mois_patients(prefixe, entree["generation"]))
+        for mois, entree in manifeste["consultations"].items():
+            fichiers.add(self._chemin_consultations(mois, entree["generation"]))
+        return fichiers
+
+    def _partitions_touchees(self, patients, consultations, operation, donnees):
+        """Partitions (préfixes, mois) à réécrire pour une mutation"""
+        if operation == "ajout_patient":
+            ssn = donnees["patient"]["_ssn"]
+            prefixe = self._prefixe(ssn)
+            groupe = self._ssn_par_prefixe.setdefault(prefixe, [])
+            if ssn not in groupe:
+                groupe.append(ssn)
+            return {prefixe}, set()
+        if operation == "ajout_consultation":
+            c = donnees["consultation"]
+            return {self._prefixe(c["patient_ssn"])}, {_mois(consultations.obtenir(c["id"]))}
+        if operation in ("statut", "diagnostic", "prescription"):
+            return set(), {_mois(consultations.obtenir(donnees["id"]))}
+        raise ValueError(f"Opération inconnue : {operation}")
+
+    def _reecrire(self, patients, consultations, prefixes, mois, complet=False):
+        """
+        Écrit les partitions sous une nouvelle génération puis valide le tout par le manifeste
+
+        Args:
+            prefixes (set): Préfixes des partitions de patients à écrire
+            mois (set): Mois des partitions de consultations à écrire
+            complet (bool, optional): Les partitions écrites remplacent toutes
+                les autres, et tout fichier non désigné par le nouveau
+                manifeste est supprimé. Par défaut False
+        """
+        precedents = self._fichiers(self._manifeste)
+        manifeste = dict(self._manifeste, version=VERSION_MANIFESTE,
+                         generation=self._manifeste["generation"] + 1,
+                         patients={} if complet else dict(self._manifeste["patients"]),
+                         consultations={} if complet else dict(self._manifeste["consultations"]))
+        for prefixe in sorted(prefixes):
+            self._ecrire_patients(patients, prefixe, manifeste)
+        for m in sorted(mois):
+            self._ecrire_consultations(consultations, m, manifeste)
+        # Point de validation du lot
+        self._ecrire_manifeste(manifeste)
+        self._manifeste = manifeste
+        valides = self._fichiers(manifeste)
+        if complet:
+            # Y compris les restes d'un lot interrompu avant son manifeste
+            precedents = {os.path.join(racine, nom)
+                          for racine in (os.path.join(self.dossier, "patients"),
+                                         os.path.join(self.dossier, "consultations"))
+                          if os.path.isdir(racine)
+                          for nom in os.listdir(racine)}
+        for chemin in precedents - valides:
+            try:
+                os.remove(chemin)
+            except FileNotFoundError:
+                pass
+
+    def enregistrer(self, patients, consultations, operation, **donnees):
+        """Réécrit uniquement les partitions concernées par la mutation"""
+        self.enregistrer_lot(patients, consultations, [(operation, donnees)])
+
+    def enregistrer_lot(self, patients, consultations, operations):
+        """Réécrit une seule fois chaque partition concernée par le lot, validé d'un bloc par le manifeste"""
+        self._grouper_patients(patients)
+        prefixes, mois = set(), set()
+        for operation, donnees in operations:
+            p, m = self._partitions_touchees(patients, consultations, operation, donnees)
+            prefixes |= p
+            mois |= m
+        self._reecrire(patients, consultations, prefixes, mois)
+
+    def sauvegarder(self, patients, consultations):
+        """Réécrit toutes les partitions et supprime celles devenues vides"""
+        self._ssn_par_prefixe = None
+        self._grouper_patients(patients)
+        mois = {_mois(c) for c in consultations}
+        self._reecrire(patients, consultations, set(self._ssn_par_prefixe), mois, complet=True)
@@ -0,0 +1,186 @@
+"""
+Instantané en lecture seule, projeté en mémoire, avec index des patients par SSN
+
+Format du fichier (entiers petit-boutistes) :
+    en-tête  : signature (8 octets), nombre de patients (8 octets)
+    index    : une entrée de taille fixe par patient, triée par SSN :
+               SSN (15 octets), position (8 octets), longueur (4 octets)
+    données  : pour chaque patient, un objet JSON compact
+               {"patient": {...}, "consultations": [...]}
+
+Un outil de consultation ouvre le fichier avec mmap, cherche le SSN par
+dichotomie dans l'index et ne décode que l'enregistrement demandé.
+"""
+import json
+import mmap
+import os
+import struct
+
+from .serialization import (
+    patient_vers_dict, dict_vers_patient,
+    consultation_vers_dict, dict_vers_consultation
+)
+
+SIGNATURE = b"CABIDX1\0"
+_ENTETE = struct.Struct("<8sQ")
+_ENTREE = struct.Struct("<15sQI")
+
+
+def chemin_instantane_indexe(chemin_donnees):
+    """Chemin de l'instantané indexé associé au fichier de données principal"""
+    return os.path.splitext(chemin_donnees)[0] + ".instantane.bin"
+
+
+def ecrire_instantane_indexe(chemin, patients, consultations=None):
+    """
+    Écrit l'instantané indexé de tous les patients et de leurs consultations
+    
+    Le fichier est écrit à côté puis substitué d'un bloc : un lecteur qui l'a
+    déjà ouvert garde sa version.
+    
+    Args:
+        chemin (str): Fichier de destination
+        patients (RegistrePatients): Registre des patients (historiques reliés)
+        consultations (RegistreConsultations, optional): Inutilisé, accepté par
+            symétrie avec les stockages
+    
+    Returns:
+        int: Nombre de patients écrits
+    """
+    enregistrements = []
+    for patient in sorted(patients, key=lambda p: p.ssn):
+        donnees = {
+            "patient": patient_vers_dict(patient),
+            "consultations": [consultation_vers_dict(c) for c in patient.consultations]
+        }
+        enregistrements.append((patient.ssn, json.dumps(donnees, ensure_ascii=False,
+                                                        separators=(",", ":")).encode("utf-8")))
+
+    position = _ENTETE.size + _ENTREE.size * len(enregistrements)
+    index = bytearray()
+    for ssn, octets in enregistrements:
+        index += _ENTREE.pack(ssn.encode("ascii"), position, len(octets))
+        position += len(octets)
+
+    temporaire = chemin + ".tmp"
+    with open(temporaire, "wb") as f:
+        f.write(_ENTETE.pack(SIGNATURE, len(enregistrements)))
+        f.write(index)
+        for _, octets in enregistrements:
+            f.write(octets)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporaire, chemin)
+    return len(enregistrements)
+
+
+class InstantaneIndexe:
+    """
+    Lecteur d'un instantané indexé (lecture seule, projection mémoire)
+    
+    L'ouverture ne lit que l'en-tête ; chaque recherche parcourt l'index par
+    dichotomie (O(log P) accès) puis décode un seul enregistrement.
+    
+    Attributs:
+        chemin (str): Fichier de l'instantané
+    """
+
+    def __init__(self, chemin):
+        """
+        Ouvre l'instantané
+        
+        Args:
+            chemin (str): Fichier produit par ecrire_instantane_indexe
+        
+        Raises:
+            FileNotFoundError: Si le fichier n'existe pas
+            ValueError: Si le fichier n'est pas un instantané indexé
+        """
+        self.chemin = chemin
+        with open(chemin, "rb") as f:
+            self._memoire = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._memoire) < _ENTETE.size:
+            self._memoire.close()
+            raise ValueError(f"Instantané indexé invalide : {chemin}")
+        signature, self._nombre = _ENTETE.unpack_from(self._memoire, 0)
+        if signature != SIGNATURE:
+            self._memoire.close()
+            raise ValueError(f"Instantané indexé invalide : {chemin}")
+
+    def _entree(self, rang):
+        return _ENTREE.unpack_from(self._memoire, _ENTETE.size + rang * _ENTREE.size)
+
+    def _chercher(self, ssn):
+        """Position et longueur de l'enregistrement d'un SSN, ou None"""
+        cle = ssn.encode("ascii", "replace")
+        bas, haut = 0, self._nombre
+        while bas < haut:
+            milieu = (bas + haut) // 2
+            ssn_milieu, position, longueur = self._entree(milieu)
+            if ssn_milieu < cle:
+                bas = milieu + 1
+            elif ssn_milieu > cle:
+                haut = milieu
+            else:
+                return position, longueur
+        return None
+
+    def _enregistrement(self, ssn):
+        trouve = self._chercher(ssn)
+        if trouve is None:
+            return None
+        position, longueur = trouve
+        return json.loads(self._memoire[position:position + longueur].decode("utf-8"))
+
+    def obtenir_patient(self, ssn):
+        """
+        Reconstruit un patient et son historique
+        
+        Args:
+            ssn (str): Numéro de sécurité sociale
+        
+        Returns:
+            Patient: Le patient avec ses consultations, ou None s'il est absent
+        """
+        donnees = self._enregistrement(ssn)
+        if donnees is None:
+            return None
+        patient = dict_vers_patient(donnees["patient"])
+        patient.consultations = [dict_vers_consultation(c) for c in donnees["consultations"]]
+        return patient
+
+    def consultations_du_patient(self, ssn):
+        """
+        Consultations d'un patient, sans construire le patient
+        
+        Args:
+            ssn (str): Numéro de sécurité sociale
+        
+        Returns:
+            list: Consultations du patient (vide s'il est absent)
+        """
+        donnees = self._enregistrement(ssn)
+        if donnees is None:
+            return []
+        return [dict_vers_consultation(c) for c in donnees["consultations"]]
+
+    def ssns(self):
+        """Itère sur les SSN de l'instantané, dans l'ordre croissant, sans décoder les données"""
+        for rang in range(self._nombre):
+            yield self._entree(rang)[0].decode("ascii")
+
+    def __contains__(self, ssn):
+        return self._chercher(ssn) is not None
+
+    def __len__(self):
+        return self._nombre
+
+    def fermer(self):
+        """Libère la projection mémoire"""
+        self._memoire.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
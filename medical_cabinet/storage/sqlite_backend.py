@@ -0,0 +1,251 @@
+"""
+Stockage SQLite : tables indexées, mises à jour ligne par ligne
+"""
+import json
+import sqlite3
+
+from models import RegistrePatients, RegistreConsultations, Patient, Consultation
+from .base import Stockage
+from .codec import prescription_vers_donnees, donnees_vers_prescription
+from .loader import lier_consultations
+from .serialization import patient_vers_dict, consultation_vers_dict
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS patients (
+    rang INTEGER PRIMARY KEY,
+    ssn TEXT NOT NULL UNIQUE,
+    nom TEXT NOT NULL,
+    prenom TEXT NOT NULL,
+    date_naissance TEXT NOT NULL,
+    adresse TEXT,
+    telephone TEXT
+);
+CREATE TABLE IF NOT EXISTS consultations (
+    rang INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    patient_ssn TEXT NOT NULL,
+    date_heure TEXT NOT NULL,
+    medecin TEXT NOT NULL,
+    motif TEXT,
+    diagnostic TEXT,
+    statut TEXT NOT NULL,
+    duree INTEGER NOT NULL DEFAULT 30
+);
+CREATE TABLE IF NOT EXISTS prescriptions (
+    rang INTEGER PRIMARY KEY,
+    consultation_id TEXT NOT NULL,
+    donnees TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_consultations_patient ON consultations (patient_ssn);
+CREATE INDEX IF NOT EXISTS idx_consultations_medecin ON consultations (medecin, date_heure);
+CREATE INDEX IF NOT EXISTS idx_consultations_date ON consultations (date_heure);
+CREATE INDEX IF NOT EXISTS idx_consultations_statut ON consultations (statut, date_heure);
+CREATE INDEX IF NOT EXISTS idx_prescriptions_consultation ON prescriptions (consultation_id);
+"""
+
+_COLONNES_PATIENT = "ssn, nom, prenom, date_naissance, adresse, telephone"
+_COLONNES_CONSULTATION = "id, patient_ssn, date_heure, medecin, motif, diagnostic, statut, duree"
+
+# Au-delà, les prescriptions sont lues par un parcours de table plutôt que par IN (...)
+_LIMITE_PARAMETRES = 500
+
+
+class StockageSQLite(Stockage):
+    """
+    Stockage dans une base SQLite (module standard sqlite3)
+
+    Chaque mutation se traduit par un INSERT ou un UPDATE d'une seule ligne,
+    et les requêtes ponctuelles utilisent les index sans tout charger.
+
+    Attributs:
+        chemin (str): Chemin du fichier de base de données
+    """
+
+    def __init__(self, chemin):
+        """
+        Ouvre (ou crée) la base et son schéma
+
+        Args:
+            chemin (str): Chemin du fichier .db (":memory:" accepté)
+        """
+        self.chemin = chemin
+        # La connexion sert aussi depuis le fil de persistance du serveur ;
+        # les écritures y sont sérialisées par un exécuteur à fil unique
+        self._connexion = sqlite3.connect(chemin, check_same_thread=False)
+        self._connexion.executescript(SCHEMA)
+        # Bases créées avant l'ajout de la durée des consultations
+        colonnes = [ligne[1] for ligne in self._connexion.execute("PRAGMA table_info(consultations)")]
+        if "duree" not in colonnes:
+            with self._connexion:
+                self._connexion.execute(
+                    "ALTER TABLE consultations ADD COLUMN duree INTEGER NOT NULL DEFAULT 30")
+
+    # --- Conversion lignes <-> objets ---
+
+    @staticmethod
+    def _ligne_patient(patient):
+        d = patient_vers_dict(patient)
+        return (d["_ssn"], d["nom"], d["prenom"], d["date_naissance"], d["adresse"], d["_telephone"])
+
+    @staticmethod
+    def _ligne_consultation(consultation):
+        d = consultation_vers_dict(consultation)
+        return (d["id"], d["patient_ssn"], d["date_heure"], d["medecin"], d["motif"],
+                d["diagnostic"], d["statut"], d["duree"])
+
+    @staticmethod
+    def _vers_patient(ligne):
+        ssn, nom, prenom, date_naissance, adresse, telephone = ligne
+        return Patient(ssn, nom, prenom, date_naissance, adresse, telephone)
+
+    def _vers_consultations(self, lignes):
+        """Construit les consultations et leur rattache leurs prescriptions"""
+        consultations = []
+        par_identifiant = {}
+        for identifiant, patient_ssn, date_heure, medecin, motif, diagnostic, statut, duree in lignes:
+            consultation = Consultation(date_heure, patient_ssn, medecin, motif, diagnostic,
+                                        statut=statut, identifiant=identifiant, duree=duree)
+            consultations.append(consultation)
+            par_identifiant[identifiant] = consultation
+        if not par_identifiant:
+            return consultations
+        if len(par_identifiant) <= _LIMITE_PARAMETRES:
+            marques = ", ".join("?" * len(par_identifiant))
+            curseur = self._connexion.execute(
+                f"SELECT consultation_id, donnees FROM prescriptions "
+                f"WHERE consultation_id IN ({marques}) ORDER BY rang", tuple(par_identifiant))
+        else:
+            # Chargement massif : un parcours de la table plutôt qu'une requête géante
+            curseur = self._connexion.execute(
+                "SELECT consultation_id, donnees FROM prescriptions ORDER BY rang")
+        for identifiant, donnees in curseur:
+            consultation = par_identifiant.get(identifiant)
+            if consultation is not None:
+                consultation.prescriptions.append(donnees_vers_prescription(json.loads(donnees)))
+        return consultations
+
+    # --- Interface Stockage ---
+
+    def charger(self, flux=False):
+        """Charge toutes les tables (le curseur est déjà lu ligne par ligne)"""
+        patients = RegistrePatients(
+            self._vers_patient(ligne) for ligne in self._connexion.execute(
+                f"SELECT {_COLONNES_PATIENT} FROM patients ORDER BY rang")
+        )
+        consultations = RegistreConsultations(self._vers_consultations(self._connexion.execute(
+            f"SELECT {_COLONNES_CONSULTATION} FROM consultations ORDER BY rang")))
+        return patients, consultations, lier_consultations(patients, consultations)
+
+    def enregistrer(self, patients, consultations, operation, **donnees):
+        """Applique la mutation à une seule ligne dans sa propre transaction"""
+        with self._connexion:
+            self._appliquer(operation, donnees)
+
+    def enregistrer_lot(self, patients, consultations, operations):
+        """Applique toutes les mutations dans une seule transaction SQLite"""
+        with self._connexion:
+            for operation, donnees in operations:
+                self._appliquer(operation, donnees)
+
+    def _appliquer(self, operation, donnees):
+        """Traduit une mutation en requête (sans valider la transaction)"""
+        if operation == "ajout_patient":
+            p = donnees["patient"]
+            self._connexion.execute(
+                f"INSERT INTO patients ({_COLONNES_PATIENT}) VALUES (?, ?, ?, ?, ?, ?)",
+                (p["_ssn"], p["nom"], p["prenom"], p["date_naissance"], p["adresse"], p["_telephone"]))
+        elif operation == "ajout_consultation":
+            c = donnees["consultation"]
+            self._connexion.execute(
+                f"INSERT INTO consultations ({_COLONNES_CONSULTATION}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (c["id"], c["patient_ssn"], c["date_heure"], c["medecin"], c["motif"],
+                 c["diagnostic"], c["statut"], c["duree"]))
+        elif operation == "statut":
+            self._connexion.execute("UPDATE consultations SET statut = ? WHERE id = ?",
+                                    (donnees["statut"], donnees["id"]))
+        elif operation == "diagnostic":
+            self._connexion.execute("UPDATE consultations SET diagnostic = ? WHERE id = ?",
+                                    (donnees["diagnostic"], donnees["id"]))
+        elif operation == "prescription":
+            self._connexion.execute(
+                "INSERT INTO prescriptions (consultation_id, donnees) VALUES (?, ?)",
+                (donnees["id"], json.dumps(donnees["prescription"], ensure_ascii=False)))
+        else:
+            raise ValueError(f"Opération inconnue : {operation}")
+
+    def sauvegarder(self, patients, consultations):
+        """Remplace tout le contenu de la base en une seule transaction"""
+        with self._connexion:
+            self._connexion.execute("DELETE FROM prescriptions")
+            self._connexion.execute("DELETE FROM consultations")
+            self._connexion.execute("DELETE FROM patients")
+            self._connexion.executemany(
+                f"INSERT INTO patients ({_COLONNES_PATIENT}) VALUES (?, ?, ?, ?, ?, ?)",
+                (self._ligne_patient(p) for p in patients))
+            self._connexion.executemany(
+                f"INSERT INTO consultations ({_COLONNES_CONSULTATION}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (self._ligne_consultation(c) for c in consultations))
+            self._connexion.executemany(
+                "INSERT INTO prescriptions (consultation_id, donnees) VALUES (?, ?)",
+                ((c.identifiant, json.dumps(prescription_vers_donnees(pr), ensure_ascii=False))
+                 for c in consultations for pr in c.prescriptions))
+
+    def fermer(self):
+        """Ferme la connexion à la base"""
+        self._connexion.close()
+
+    # --- Requêtes ponctuelles (sans chargement complet) ---
+
+    def rechercher_patient(self, ssn):
+        """
+        Recherche un patient par SSN via l'index unique
+
+        Args:
+            ssn (str): Numéro de sécurité sociale
+
+        Returns:
+            Patient: Le patient avec ses consultations, ou None
+        """
+        ligne = self._connexion.execute(
+            f"SELECT {_COLONNES_PATIENT} FROM patients WHERE ssn = ?", (ssn,)).fetchone()
+        if ligne is None:
+            return None
+        patient = self._vers_patient(ligne)
+        patient.consultations = self.consultations_du_patient(ssn)
+        return patient
+
+    def consultations_du_patient(self, ssn):
+        """
+        Retourne les consultations d'un patient dans l'ordre d'enregistrement
+
+        Args:
+            ssn (str): Numéro de sécurité sociale
+
+        Returns:
+            list: Consultations du patient
+        """
+        return self._vers_consultations(self._connexion.execute(
+            f"SELECT {_COLONNES_CONSULTATION} FROM consultations WHERE patient_ssn = ? ORDER BY rang",
+            (ssn,)).fetchall())
+
+    def consultations_a_venir(self, limite=None, medecin=None):
+        """
+        Retourne les consultations planifiées par ordre chronologique
+
+        Args:
+            limite (int, optional): Nombre maximal de résultats. Par défaut tous
+            medecin (str, optional): Restreint à un médecin. Par défaut tous
+
+        Returns:
+            list: Consultations planifiées
+        """
+        requete = f"SELECT {_COLONNES_CONSULTATION} FROM consultations WHERE statut = ?"
+        parametres = ["planifiée"]
+        if medecin is not None:
+            requete += " AND medecin = ?"
+            parametres.append(medecin)
+        requete += " ORDER BY date_heure"
+        if limite is not None:
+            requete += " LIMIT ?"
+            parametres.append(limite)
+        return self._vers_consultations(self._connexion.execute(requete, parametres).fetchall())
@@ -0,0 +1,102 @@
+"""
+Verrou consultatif entre processus, posé sur un fichier <chemin>.lock
+"""
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class VerrouFichier:
+    """
+    Verrou exclusif partagé par tous les processus qui utilisent le même chemin
+
+    Le verrou est consultatif : il ne protège que des écrivains qui le
+    prennent aussi. Il est libéré par le système si le processus meurt.
+    Dans un même processus, les fils se le passent par un verrou réentrant :
+    seule la prise la plus externe pose le verrou sur le fichier.
+
+    Attributs:
+        chemin (str): Fichier servant de verrou
+        delai (float): Attente maximale en secondes avant d'abandonner
+    """
+
+    # Intervalle entre deux tentatives
+    _ATTENTE = 0.02
+
+    def __init__(self, chemin, delai=10.0):
+        """
+        Initialise le verrou (rien n'est ouvert avant acquerir)
+
+        Args:
+            chemin (str): Fichier servant de verrou (créé au besoin)
+            delai (float, optional): Attente maximale en secondes. Par défaut 10
+        """
+        self.chemin = chemin
+        self.delai = delai
+        self._fd = None
+        self._verrou_fil = threading.RLock()
+        self._profondeur = 0
+
+    def _essayer(self):
+        """Tente de prendre le verrou sans attendre"""
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(self._fd, msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+
+    def acquerir(self):
+        """
+        Prend le verrou, en attendant au plus delai secondes (réentrant dans un même fil)
+
+        Raises:
+            TimeoutError: Si un autre processus ou fil garde le verrou trop longtemps
+        """
+        limite = time.monotonic() + self.delai
+        if not self._verrou_fil.acquire(timeout=self.delai):
+            raise TimeoutError(f"Verrou {self.chemin} occupé depuis plus de {self.delai} s.")
+        if self._profondeur:
+            self._profondeur += 1
+            return
+        self._fd = os.open(self.chemin, os.O_RDWR | os.O_CREAT, 0o644)
+        while not self._essayer():
+            if time.monotonic() >= limite:
+                os.close(self._fd)
+                self._fd = None
+                self._verrou_fil.release()
+                raise TimeoutError(f"Verrou {self.chemin} occupé depuis plus de {self.delai} s.")
+            time.sleep(self._ATTENTE)
+        self._profondeur = 1
+
+    def liberer(self):
+        """Libère le verrou (celui du fichier à la sortie de la prise la plus externe)"""
+        if self._profondeur == 0:
+            return
+        self._profondeur -= 1
+        if self._profondeur:
+            self._verrou_fil.release()
+            return
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        else:
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        os.close(self._fd)
+        self._fd = None
+        self._verrou_fil.release()
+
+    def __enter__(self):
+        self.acquerir()
+        return self
+
+    def __exit__(self, *exc):
+        self.liberer()
@@ -0,0 +1,52 @@
+"""
+Configuration commune des tests : imports depuis medical_cabinet et logs isolés
+"""
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import configurer_logs  # noqa: E402
+
+# Fichier au format historique : consultations sans identifiant
+DONNEES_HISTORIQUES = {
+    "patients": [
+        {"_ssn": "123456789012345", "nom": "Dupont", "prenom": "Jean", "date_naissance": "1980-05-12",
+         "adresse": "1 rue de Paris, 75000 Paris", "_telephone": "0601020304"},
+        {"_ssn": "987654321098765", "nom": "Martin", "prenom": "Claire", "date_naissance": "1992-11-23",
+         "adresse": "10 avenue de Lyon, 69000 Lyon", "_telephone": "0611223344"},
+    ],
+    "consultations": [
+        {"date_heure": "2026-02-01 09:00", "patient_ssn": "123456789012345", "medecin": "Bernard",
+         "motif": "Fièvre", "diagnostic": None, "prescriptions": [], "statut": "planifiée"},
+        {"date_heure": "2026-02-02 10:00", "patient_ssn": "987654321098765", "medecin": "Sonia",
+         "motif": "Gastro", "diagnostic": None, "prescriptions": [], "statut": "annulée"},
+    ],
+}
+
+
+@pytest.fixture(autouse=True)
+def logs_isoles(tmp_path):
+    """Les actions journalisées pendant un test écrivent dans son dossier temporaire"""
+    configurer_logs(str(tmp_path / "logs.txt"), asynchrone=False)
+    yield
+    configurer_logs(str(tmp_path / "logs.txt"), asynchrone=False)
+
+
+@pytest.fixture
+def fichier_historique(tmp_path):
+    """Fichier de données au format historique (sans identifiants de consultation)"""
+    chemin = tmp_path / "cabinet_data.json"
+    chemin.write_text(json.dumps(DONNEES_HISTORIQUES, ensure_ascii=False, indent=2), encoding="utf-8")
+    return str(chemin)
+
+
+@pytest.fixture
+def stockage_actif():
+    """Active un stockage pour les services le temps d'un test"""
+    from services.patient_service import activer_stockage
+    yield activer_stockage
+    activer_stockage(None)
@@ -0,0 +1,14 @@
+from benchmarks import generer_cabinet
+from benchmarks.mesures import _operations
+
+
+def _chargement(taille, dossier):
+    patients, consultations = generer_cabinet(taille)
+    operation = next(o for o in _operations(patients, consultations, dossier, 0) if o.nom == "chargement")
+    return operation._preparer().charger()
+
+
+def test_chargement_mesure_sur_le_fichier_de_sa_taille(tmp_path):
+    dossier = str(tmp_path)
+    assert len(_chargement(3, dossier)[0]) == 3
+    assert len(_chargement(6, dossier)[0]) == 6
@@ -0,0 +1,59 @@
+import pytest
+
+from services.patient_service import ajouter_patient
+from storage import StockageJSON
+import storage.cache as cache
+import storage.json_backend as json_backend
+
+
+def _sans_analyse(monkeypatch):
+    """Toute relecture du JSON fait échouer le test"""
+    def interdit(*args, **kwargs):
+        raise AssertionError("le fichier JSON a été analysé")
+    monkeypatch.setattr(json_backend, "charger_donnees", interdit)
+
+
+@pytest.fixture
+def cabinet_en_cache(fichier_historique):
+    stockage = StockageJSON(fichier_historique)
+    patients, consultations, _ = stockage.charger()
+    stockage.point_de_controle(patients, consultations)
+    return fichier_historique
+
+
+def test_demarrage_depuis_le_cache(cabinet_en_cache, monkeypatch):
+    _sans_analyse(monkeypatch)
+    patients, consultations, _ = StockageJSON(cabinet_en_cache).charger()
+
+    assert len(patients) == 2 and len(consultations) == 2
+    assert patients.obtenir("123456789012345").consultations[0].medecin == "Bernard"
+
+
+def test_cache_ignore_apres_modification_du_fichier(cabinet_en_cache, stockage_actif):
+    autre = StockageJSON(cabinet_en_cache, cache=False)
+    patients, consultations, _ = autre.charger()
+    stockage_actif(autre)
+    ajouter_patient(patients, consultations, "111222333444555", "Durand", "Paul", "1975-01-30", "", "")
+
+    relus, _, _ = StockageJSON(cabinet_en_cache).charger()
+    assert "111222333444555" in relus
+
+
+def test_cache_ignore_si_le_format_change(cabinet_en_cache, monkeypatch):
+    monkeypatch.setattr(cache, "FORMAT_CACHE", cache.FORMAT_CACHE + 1)
+    assert cache.lire_cache(StockageJSON(cabinet_en_cache).chemin_cache,
+                            cache.signature_fichier(cabinet_en_cache)) is None
+
+
+def test_pas_de_cache_d_une_memoire_perimee(fichier_historique, stockage_actif):
+    stockage = StockageJSON(fichier_historique)
+    patients, consultations, _ = stockage.charger()
+    autre = StockageJSON(fichier_historique, cache=False)
+    autres_patients, autres_consultations, _ = autre.charger()
+    stockage_actif(autre)
+    ajouter_patient(autres_patients, autres_consultations, "111222333444555", "Durand", "Paul",
+                    "1975-01-30", "", "")
+
+    # La mémoire de ce poste ne reflète plus le fichier : rien n'est mis en cache
+    stockage.point_de_controle(patients, consultations)
+    assert cache.lire_cache(stockage.chemin_cache, cache.signature_fichier(fichier_historique)) is None
@@ -0,0 +1,21 @@
+import os
+import subprocess
+import sys
+
+import storage
+import services
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_demarrage_sans_modules_differes():
+    script = ("import sys, main; print(' '.join(m for m in ('sqlite3', 'csv', 'mmap', 'storage.journal', "
+              "'storage.sharded', 'services.import_service', 'services.analyse_service') if m in sys.modules))")
+    sortie = subprocess.run([sys.executable, "-c", script], cwd=RACINE, capture_output=True, text=True, check=True)
+    assert sortie.stdout.split() == []
+
+
+def test_noms_differes_toujours_exportes():
+    assert storage.StockageSQLite.__module__ == "storage.sqlite_backend"
+    assert storage.ecrire_instantane_indexe.__module__ == "storage.snapshot"
+    assert services.importer_patients.__module__ == "services.import_service"
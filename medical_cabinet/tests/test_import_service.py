@@ -0,0 +1,65 @@
+import os
+
+import pytest
+
+from models import RegistrePatients, RegistreConsultations
+from services.import_service import importer_patients, importer_consultations
+from storage import StockageJSON
+
+EN_TETE_PATIENTS = "ssn,nom,prenom,date_naissance,adresse,telephone\n"
+
+
+def _ecrire(chemin, texte):
+    chemin.write_text(texte, encoding="utf-8")
+    return str(chemin)
+
+
+def test_cellules_facultatives_vides_acceptees(tmp_path, stockage_actif):
+    stockage_actif(StockageJSON(str(tmp_path / "cabinet_data.json")))
+    csv = _ecrire(tmp_path / "patients.csv", EN_TETE_PATIENTS
+                  + "123456789012345,Dupont,Jean,1980-05-12,,\n"
+                  + "987654321098765,,Claire,1992-11-23,10 avenue de Lyon,0611223344\n")
+    patients = RegistrePatients()
+
+    rapport = importer_patients(patients, RegistreConsultations(), csv)
+
+    assert rapport.importes == 1
+    assert patients.obtenir("123456789012345").adresse == ""
+    assert len(rapport.erreurs) == 1
+    numero, message = rapport.erreurs[0]
+    assert numero == 3 and "nom" in message
+
+
+def test_consultation_colonnes_facultatives_vides(tmp_path, stockage_actif):
+    stockage_actif(StockageJSON(str(tmp_path / "cabinet_data.json")))
+    patients = RegistrePatients()
+    importer_patients(patients, RegistreConsultations(), _ecrire(
+        tmp_path / "patients.csv", EN_TETE_PATIENTS + "123456789012345,Dupont,Jean,1980-05-12,,\n"))
+    consultations = RegistreConsultations()
+    csv = _ecrire(tmp_path / "consultations.csv",
+                  "id,patient_ssn,date_heure,medecin,motif,statut,diagnostic,duree\n"
+                  ",123456789012345,2026-02-01 09:00,Bernard,Fièvre,,,\n"
+                  ",123456789012345,2026-02-01 10:00,Bernard,,,,\n")
+
+    rapport = importer_consultations(patients, consultations, csv)
+
+    assert rapport.importes == 1
+    consultation = next(iter(consultations))
+    assert consultation.statut == "planifiée" and consultation.diagnostic is None
+    assert consultation.duree == 30
+    assert "motif" in rapport.erreurs[0][1]
+
+
+def test_import_annule_si_l_ecriture_echoue(tmp_path, stockage_actif):
+    # Dossier inexistant : l'écriture finale échoue
+    stockage_actif(StockageJSON(str(tmp_path / "absent" / "cabinet_data.json")))
+    csv = _ecrire(tmp_path / "patients.csv", EN_TETE_PATIENTS
+                  + "123456789012345,Dupont,Jean,1980-05-12,1 rue de Paris,0601020304\n")
+    patients = RegistrePatients()
+
+    with pytest.raises(OSError):
+        importer_patients(patients, RegistreConsultations(), csv)
+
+    assert len(patients) == 0
+    assert patients.rechercher_nom("dupont") == []
+    assert not os.path.exists(tmp_path / "absent")
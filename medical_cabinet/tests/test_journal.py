@@ -0,0 +1,51 @@
+import json
+
+from storage import Journal
+
+
+def test_identifiants_historiques_stables_sans_reecriture(fichier_historique):
+    avant = open(fichier_historique, encoding="utf-8").read()
+    _, premieres, _ = Journal(fichier_historique).charger()
+    _, secondes, _ = Journal(fichier_historique).charger()
+
+    assert [c.identifiant for c in premieres] == [c.identifiant for c in secondes]
+    # Le chargement ne réécrit pas le fichier principal
+    assert open(fichier_historique, encoding="utf-8").read() == avant
+
+
+def test_entree_du_journal_rejouee_sur_un_fichier_historique(fichier_historique):
+    journal = Journal(fichier_historique)
+    _, consultations, _ = journal.charger()
+    consultation = next(iter(consultations))
+    journal.ajouter_entree("diagnostic", id=consultation.identifiant, diagnostic="Grippe")
+    journal.fermer()
+
+    _, consultations, _ = Journal(fichier_historique).charger()
+    assert consultations.obtenir(consultation.identifiant).diagnostic == "Grippe"
+
+
+def test_entree_sur_consultation_inconnue_ignoree(fichier_historique, caplog):
+    journal = Journal(fichier_historique)
+    _, consultations, _ = journal.charger()
+    connue = next(iter(consultations))
+    with open(journal.chemin_journal, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"seq": 1, "op": "statut", "id": "inconnue", "statut": "réalisée"}) + "\n")
+        f.write(json.dumps({"seq": 2, "op": "diagnostic", "id": connue.identifiant, "diagnostic": "RAS"}) + "\n")
+
+    _, consultations, _ = Journal(fichier_historique).charger()
+
+    assert consultations.obtenir(connue.identifiant).diagnostic == "RAS"
+    assert "inconnue" in caplog.text
+
+
+def test_doublons_historiques_departages(tmp_path):
+    consultation = {"date_heure": "2026-02-01 09:00", "patient_ssn": "123456789012345",
+                    "medecin": "Bernard", "motif": "Fièvre", "statut": "planifiée"}
+    chemin = tmp_path / "doublons.json"
+    chemin.write_text(json.dumps({"patients": [], "consultations": [consultation, dict(consultation)]}))
+
+    _, consultations, _ = Journal(str(chemin)).charger()
+
+    identifiants = [c.identifiant for c in consultations]
+    assert len(set(identifiants)) == 2
+    assert identifiants[1] == identifiants[0] + "-1"
@@ -0,0 +1,127 @@
+import json
+
+import pytest
+
+from models import ConflitModification, PrescriptionExamen
+import services.patient_service as patient_service
+from services.consultation_service import (
+    planifier_consultation, marquer_consultation_realisee, annuler_consultation,
+    ajouter_diagnostic, ajouter_prescription
+)
+from services.patient_service import ajouter_patient, charger_donnees, transaction
+from storage import StockageJSON, consultation_vers_dict
+
+
+class Poste:
+    """Terminal ouvert sur le fichier partagé, avec sa propre mémoire"""
+
+    def __init__(self, chemin):
+        self.stockage = StockageJSON(chemin, cache=False)
+        self.patients, self.consultations, _ = self.stockage.charger()
+
+    def consultation(self, date_heure):
+        return next(c for c in self.consultations if c.date_heure == date_heure)
+
+    def __call__(self, service, *args):
+        """Exécute un service avec ce poste comme stockage actif"""
+        patient_service.activer_stockage(self.stockage)
+        try:
+            return service(self.consultations, self.patients, *args)
+        finally:
+            patient_service.activer_stockage(None)
+
+
+def _relire(chemin):
+    with open(chemin, encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def postes(fichier_historique):
+    a, b = Poste(fichier_historique), Poste(fichier_historique)
+    return a, b
+
+
+def test_prescriptions_des_deux_postes_reunies(fichier_historique, postes):
+    a, b = postes
+    a(ajouter_prescription, a.consultation("2026-02-01 09:00"), PrescriptionExamen("IRM", "Lab"))
+    b(ajouter_prescription, b.consultation("2026-02-01 09:00"), PrescriptionExamen("Radio", "Lab2"))
+
+    donnees = _relire(fichier_historique)
+    consultation = next(c for c in donnees["consultations"] if c["date_heure"] == "2026-02-01 09:00")
+    assert sorted(p[1] for p in consultation["prescriptions"]) == ["IRM", "Radio"]
+    assert len(b.consultation("2026-02-01 09:00").prescriptions) == 2
+
+
+def test_diagnostics_differents_en_conflit(fichier_historique, postes):
+    a, b = postes
+    a(marquer_consultation_realisee, a.consultation("2026-02-01 09:00"))
+    a(ajouter_diagnostic, a.consultation("2026-02-01 09:00"), "Grippe")
+    avant = _relire(fichier_historique)
+
+    def realiser_avec_diagnostic(consultations, patients, consultation, diagnostic):
+        # B n'a pas encore relu le fichier : il ignore le diagnostic de A
+        with transaction(patients, consultations):
+            marquer_consultation_realisee(consultations, patients, consultation)
+            ajouter_diagnostic(consultations, patients, consultation, diagnostic)
+
+    consultation_b = b.consultation("2026-02-01 09:00")
+    with pytest.raises(ConflitModification):
+        b(realiser_avec_diagnostic, consultation_b, "Angine")
+
+    assert _relire(fichier_historique) == avant
+    assert consultation_b.statut == "planifiée" and consultation_b.diagnostic is None
+
+
+def test_diagnostic_d_un_poste_et_prescription_de_l_autre(fichier_historique, postes):
+    a, b = postes
+    a(marquer_consultation_realisee, a.consultation("2026-02-01 09:00"))
+    b.stockage.actualiser(b.patients, b.consultations)
+    a(ajouter_diagnostic, a.consultation("2026-02-01 09:00"), "Grippe")
+    b(ajouter_prescription, b.consultation("2026-02-01 09:00"), PrescriptionExamen("IRM", "Lab"))
+
+    fusionnee = b.consultation("2026-02-01 09:00")
+    assert fusionnee.diagnostic == "Grippe"
+    assert [p.type_examen for p in fusionnee.prescriptions] == ["IRM"]
+    relue = next(c for c in _relire(fichier_historique)["consultations"] if c["date_heure"] == "2026-02-01 09:00")
+    assert relue == consultation_vers_dict(fusionnee)
+
+
+def test_annulation_d_un_autre_poste_libere_le_creneau(fichier_historique, postes):
+    a, b = postes
+    a(annuler_consultation, a.consultation("2026-02-01 09:00"))
+
+    assert b.stockage.actualiser(b.patients, b.consultations)
+    assert b.consultation("2026-02-01 09:00").statut == "annulée"
+    patient = b.patients.obtenir("987654321098765")
+    nouvelle = b(planifier_consultation, patient, "2026-02-01 09:00", "Bernard", "Contrôle")
+    assert nouvelle.statut == "planifiée"
+
+
+def test_fichier_historique_sans_doublons(fichier_historique, postes):
+    a, b = postes
+    patient_a = a.patients.obtenir("123456789012345")
+    patient_b = b.patients.obtenir("987654321098765")
+    a(planifier_consultation, patient_a, "2026-03-01 09:00", "Bernard", "Contrôle")
+    b(planifier_consultation, patient_b, "2026-03-02 09:00", "Sonia", "Contrôle")
+
+    donnees = _relire(fichier_historique)
+    assert len(donnees["consultations"]) == 4
+    assert len({c["id"] for c in donnees["consultations"]}) == 4
+    assert len(b.consultations) == 4
+
+
+def test_stockage_par_defaut_fusionne(fichier_historique, monkeypatch):
+    monkeypatch.setattr(patient_service, "DATA_FILE", fichier_historique)
+    monkeypatch.setattr(patient_service, "_stockage_fichier", None)
+    patients, consultations, _ = charger_donnees()
+
+    # Un autre poste ajoute un patient entre-temps
+    autre = Poste(fichier_historique)
+    autre(lambda consultations, patients: ajouter_patient(
+        patients, consultations, "111111111155555", "Guven", "Berancan", "2002-02-19", "Rue de Paris", "0155555555"))
+
+    ajouter_patient(patients, consultations, "222222222266666", "Petit", "Léa", "1999-01-01", "Rue de Lyon", "0600000000")
+
+    ssns = {p["_ssn"] for p in _relire(fichier_historique)["patients"]}
+    assert {"111111111155555", "222222222266666"} <= ssns
@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+from benchmarks import generer_cabinet
+from storage import StockageJSON, charger_donnees, patient_vers_dict, consultation_vers_dict
+import storage.loader as loader
+
+
+def _contenu(patients, consultations, orphelines):
+    return ([patient_vers_dict(p) for p in patients],
+            [consultation_vers_dict(c) for c in consultations],
+            {p.ssn: [c.identifiant for c in p.consultations] for p in patients},
+            len(orphelines))
+
+
+@pytest.fixture
+def fichier_cabinet(tmp_path):
+    chemin = str(tmp_path / "cabinet_data.json")
+    StockageJSON(chemin, cache=False).sauvegarder(*generer_cabinet(40))
+    return chemin
+
+
+def test_lots_paralleles_identiques_a_la_lecture_sequentielle(fichier_cabinet):
+    patients, consultations, _, _ = _contenu(*charger_donnees(fichier_cabinet))
+    # Plusieurs lots par tableau avec des lots de 2000 caractères
+    objets = loader.construire_en_parallele(fichier_cabinet, 2, taille_lot=2000)
+
+    assert objets is not None
+    assert [patient_vers_dict(p) for p in objets["patients"]] == patients
+    assert [consultation_vers_dict(c) for c in objets["consultations"]] == consultations
+
+
+def test_chargement_parallele_relie_comme_le_sequentiel(fichier_cabinet, monkeypatch):
+    sequentiel = _contenu(*charger_donnees(fichier_cabinet))
+    monkeypatch.setattr(loader, "SEUIL_PARALLELE", 0)
+    assert _contenu(*charger_donnees(fichier_cabinet, processus=2)) == sequentiel
+
+
+def test_mise_en_forme_inattendue_lue_sequentiellement(fichier_cabinet, monkeypatch):
+    sequentiel = _contenu(*charger_donnees(fichier_cabinet))
+    with open(fichier_cabinet, encoding="utf-8") as f:
+        donnees = json.load(f)
+    with open(fichier_cabinet, "w", encoding="utf-8") as f:
+        json.dump(donnees, f)
+
+    assert loader.construire_en_parallele(fichier_cabinet, 2) is None
+    monkeypatch.setattr(loader, "SEUIL_PARALLELE", 0)
+    assert _contenu(*charger_donnees(fichier_cabinet, processus=2)) == sequentiel
@@ -0,0 +1,38 @@
+from utils.metrics import Metriques
+
+
+def test_profilage_imbrique_limite_a_l_appel_externe():
+    metriques = Metriques()
+    metriques.configurer_profilage(["Externe", "Interne"])
+
+    def interne():
+        return 1
+
+    def externe():
+        return metriques.appeler("Interne", interne) + 1
+
+    assert metriques.appeler("Externe", externe) == 2
+    rapport = metriques.rapport()
+    assert rapport["Externe"]["appels"] == 1
+    assert rapport["Interne"]["appels"] == 1
+    # L'appel imbriqué n'a pas lancé de second profileur
+    assert list(metriques._profils) == ["Externe"]
+    # Le profileur est libéré pour l'appel suivant
+    metriques.appeler("Interne", interne)
+    assert sorted(metriques._profils) == ["Externe", "Interne"]
+
+
+def test_profileur_libere_apres_exception():
+    metriques = Metriques()
+    metriques.configurer_profilage(["Echec"])
+
+    def echec():
+        raise ValueError("attendu")
+
+    for _ in range(2):
+        try:
+            metriques.appeler("Echec", echec)
+        except ValueError:
+            pass
+    assert metriques.rapport()["Echec"]["appels"] == 2
+    assert metriques._profil_en_cours is False
@@ -0,0 +1,59 @@
+import io
+
+from models import Patient, Consultation, RegistrePatients, RegistreConsultations
+from storage import ecrire_donnees, patient_vers_json, consultation_vers_json
+
+
+def _patient():
+    return Patient("123456789012345", "Dupont", "Jean", "1980-05-12", "1 rue de Paris", "0601020304")
+
+
+def test_affecter_un_champ_du_patient_oublie_la_forme_json():
+    for champ, valeur in [("nom", "Durand"), ("prenom", "Paul"), ("adresse", "2 rue de Lyon")]:
+        patient = _patient()
+        patient_vers_json(patient)
+        assert not patient.modifie
+        setattr(patient, champ, valeur)
+        assert patient.modifie
+        assert valeur in patient_vers_json(patient)
+
+
+def test_affecter_un_champ_de_la_consultation_oublie_la_forme_json():
+    for champ, valeur in [("motif", "Toux"), ("diagnostic", "Angine"), ("duree", 45)]:
+        consultation = Consultation("2026-02-01 09:00", "123456789012345", "Bernard", "Fièvre")
+        consultation_vers_json(consultation)
+        assert not consultation.modifiee
+        setattr(consultation, champ, valeur)
+        assert consultation.modifiee
+        assert str(valeur) in consultation_vers_json(consultation)
+
+
+def test_methodes_metier_passent_par_les_champs_persistes():
+    consultation = Consultation("2026-02-01 09:00", "123456789012345", "Bernard", "Fièvre", statut="réalisée")
+    consultation_vers_json(consultation)
+    consultation.ajouter_diagnostic("Grippe")
+    assert consultation.modifiee
+
+    patients = RegistrePatients([_patient()])
+    patient = patients.obtenir("123456789012345")
+    patient_vers_json(patient)
+    source = _patient()
+    source.nom = "Durand"
+    patients.actualiser(patient, source)
+    assert patient.modifie and "Durand" in patient_vers_json(patient)
+
+
+def test_sauvegarde_incrementale_apres_modification_directe():
+    patient = _patient()
+    patients = RegistrePatients([patient])
+    consultation = Consultation("2026-02-01 09:00", patient.ssn, "Bernard", "Fièvre", statut="réalisée")
+    consultations = RegistreConsultations([consultation])
+    ecrire_donnees(io.StringIO(), patients, consultations)
+
+    patient.adresse = "3 place Bellecour"
+    consultation.diagnostic = "Grippe"
+    sortie = io.StringIO()
+    ecrire_donnees(sortie, patients, consultations)
+
+    assert "3 place Bellecour" in sortie.getvalue()
+    assert "Grippe" in sortie.getvalue()
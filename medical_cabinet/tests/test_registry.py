@@ -0,0 +1,39 @@
+from datetime import datetime
+
+from models import Consultation, RegistreConsultations
+
+
+def _consultation(date_heure, duree=30, medecin="Bernard", statut="planifiée"):
+    return Consultation(date_heure, "123456789012345", medecin, "Contrôle", statut=statut, duree=duree)
+
+
+def test_conflit_avec_un_creneau_long_masque_par_un_chevauchement_ancien():
+    # Données anciennes : le créneau de 9h30 chevauche déjà celui de 9h (2 heures)
+    consultations = RegistreConsultations([
+        _consultation("2026-02-01 09:00", duree=120),
+        _consultation("2026-02-01 09:30"),
+    ])
+
+    conflit = consultations.conflit("Bernard", datetime(2026, 2, 1, 10, 15), 30)
+
+    assert conflit is not None and conflit.date_heure == "2026-02-01 09:00"
+    assert consultations.conflit("Bernard", datetime(2026, 2, 1, 11, 0), 30) is None
+
+
+def test_prochain_creneau_libre_apres_un_creneau_long():
+    consultations = RegistreConsultations()
+    consultations.ajouter(_consultation("2026-02-01 09:00", duree=120))
+    consultations.ajouter(_consultation("2026-02-01 09:30"))
+
+    libre = consultations.prochain_creneau_libre("Bernard", datetime(2026, 2, 1, 10, 0), 30)
+
+    assert libre == datetime(2026, 2, 1, 11, 0)
+
+
+def test_creneaux_voisins_sans_chevauchement():
+    consultations = RegistreConsultations([_consultation("2026-02-01 09:00"), _consultation("2026-02-01 10:00")])
+
+    assert consultations.conflit("Bernard", datetime(2026, 2, 1, 9, 30), 30) is None
+    assert consultations.conflit("Bernard", datetime(2026, 2, 1, 9, 45), 30).date_heure == "2026-02-01 10:00"
+    assert consultations.conflit("Bernard", datetime(2026, 2, 1, 8, 45), 30).date_heure == "2026-02-01 09:00"
+    assert consultations.conflit("Autre", datetime(2026, 2, 1, 9, 0), 30) is None
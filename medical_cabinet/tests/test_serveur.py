@@ -0,0 +1,79 @@
+import asyncio
+import json
+import threading
+
+from serveur import ServeurCabinet
+from services.patient_service import ajouter_patient
+from storage import StockageJSON, StockageSQLite
+
+NOUVEAU_PATIENT = {"ssn": "111222333444555", "nom": "Durand", "prenom": "Paul",
+                   "date_naissance": "1975-01-30", "adresse": "2 rue Neuve", "telephone": "0600000000"}
+
+
+def _requetes(serveur, *requetes):
+    """Démarre le serveur, exécute les requêtes (méthode, cible, corps) puis l'arrête"""
+    async def scenario():
+        pret = asyncio.Event()
+        tache = asyncio.create_task(serveur.servir("127.0.0.1", 0, lambda port: pret.set()))
+        await pret.wait()
+        try:
+            return [await serveur.traiter(methode, cible, json.dumps(corps).encode() if corps else b"")
+                    for methode, cible, corps in requetes]
+        finally:
+            tache.cancel()
+    return asyncio.run(scenario())
+
+
+def test_ecriture_sqlite_depuis_le_fil_de_persistance(tmp_path, stockage_actif):
+    stockage = StockageSQLite(str(tmp_path / "cabinet.db"))
+    patients, consultations, _ = stockage.charger()
+    stockage_actif(stockage)
+
+    (code, donnees), = _requetes(ServeurCabinet(stockage, patients, consultations),
+                                 ("POST", "/patients", NOUVEAU_PATIENT))
+
+    assert code == 201, donnees
+    relus, _, _ = StockageSQLite(str(tmp_path / "cabinet.db")).charger()
+    assert relus.obtenir("111222333444555").nom == "Durand"
+
+
+def test_actualisation_hors_de_la_boucle(fichier_historique, stockage_actif):
+    fils = []
+
+    class StockageTrace(StockageJSON):
+        def actualiser(self, patients, consultations):
+            fils.append(threading.current_thread().name)
+            return super().actualiser(patients, consultations)
+
+    stockage = StockageTrace(fichier_historique, cache=False)
+    patients, consultations, _ = stockage.charger()
+    stockage_actif(stockage)
+
+    (code, donnees), = _requetes(ServeurCabinet(stockage, patients, consultations),
+                                 ("POST", "/patients", NOUVEAU_PATIENT))
+
+    assert code == 201, donnees
+    assert fils and all(nom.startswith("persistance") for nom in fils)
+
+
+def test_fusion_attend_la_fin_des_lectures(fichier_historique, stockage_actif):
+    stockage = StockageJSON(fichier_historique, cache=False)
+    patients, consultations, _ = stockage.charger()
+    serveur = ServeurCabinet(stockage, patients, consultations)
+    # Un autre poste ajoute un patient : la prochaine sauvegarde doit fusionner
+    autre = StockageJSON(fichier_historique, cache=False)
+    autres_patients, autres_consultations, _ = autre.charger()
+    stockage_actif(autre)
+    ajouter_patient(autres_patients, autres_consultations, *NOUVEAU_PATIENT.values())
+
+    # Une lecture est en cours sur la boucle pendant la sauvegarde en arrière-plan
+    serveur._verrou_memoire.acquire()
+    fil = threading.Thread(target=stockage.sauvegarder, args=(patients, consultations))
+    fil.start()
+    fil.join(0.3)
+    assert fil.is_alive()
+    assert "111222333444555" not in patients
+    serveur._verrou_memoire.release()
+    fil.join(5)
+    assert not fil.is_alive()
+    assert "111222333444555" in patients
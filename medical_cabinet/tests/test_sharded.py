@@ -0,0 +1,98 @@
+import json
+from datetime import date
+
+import pytest
+
+from models import Patient, Consultation, RegistrePatients, RegistreConsultations
+from services.consultation_service import planifier_consultation
+from storage import StockagePartitionne, ecrire_donnees
+
+
+def _cabinet():
+    patient = Patient("123456789012345", "Dupont", "Jean", "1980-05-12", "1 rue de Paris", "0601020304")
+    return patient, RegistrePatients([patient]), RegistreConsultations()
+
+
+def test_date_sans_zeros_rangee_dans_le_bon_mois(tmp_path, stockage_actif):
+    patient, patients, consultations = _cabinet()
+    stockage = StockagePartitionne(str(tmp_path / "partitions"))
+    stockage.sauvegarder(patients, consultations)
+    stockage_actif(stockage)
+
+    planifier_consultation(consultations, patients, patient, "2024-3-5 9:00", "Bernard", "Contrôle")
+
+    relu = StockagePartitionne(str(tmp_path / "partitions"))
+    assert [c.date_heure for c in relu.charger_mois("2024-03")] == ["2024-3-5 9:00"]
+    assert len(relu.agenda_du_jour(date(2024, 3, 5))) == 1
+    _, consultations_relues, _ = relu.charger()
+    assert len(consultations_relues) == 1
+
+
+def test_sauvegarde_complete_et_rechargement(tmp_path):
+    patient, patients, consultations = _cabinet()
+    for date_heure in ("2024-03-05 09:00", "2024-3-6 10:00", "2024-04-01 08:30"):
+        consultations.ajouter(Consultation(date_heure, patient.ssn, "Bernard", "Contrôle"))
+    stockage = StockagePartitionne(str(tmp_path / "partitions"))
+
+    stockage.sauvegarder(patients, consultations)
+
+    relu = StockagePartitionne(str(tmp_path / "partitions"))
+    assert len(relu.charger_mois("2024-03")) == 2
+    assert len(relu.charger_mois("2024-04")) == 1
+    patients_relus, consultations_relues, orphelines = relu.charger()
+    assert len(consultations_relues) == 3 and not orphelines
+    assert len(patients_relus.obtenir(patient.ssn).consultations) == 3
+
+
+def test_lot_interrompu_laisse_l_etat_precedent(tmp_path, stockage_actif, monkeypatch):
+    patient, patients, consultations = _cabinet()
+    consultations.ajouter(Consultation("2024-03-05 09:00", patient.ssn, "Bernard", "Contrôle"))
+    patient.ajouter_consultation(next(iter(consultations)))
+    stockage = StockagePartitionne(str(tmp_path / "partitions"))
+    stockage.sauvegarder(patients, consultations)
+    stockage_actif(stockage)
+
+    # Arrêt après l'écriture de la partition du patient, avant celle du mois et le manifeste
+    def panne(*args):
+        raise OSError("disque plein")
+    monkeypatch.setattr(StockagePartitionne, "_ecrire_consultations", panne)
+    with pytest.raises(OSError):
+        planifier_consultation(consultations, patients, patient, "2024-04-02 10:00", "Bernard", "Suivi")
+    monkeypatch.undo()
+
+    relu = StockagePartitionne(str(tmp_path / "partitions"))
+    patients_relus, consultations_relues, orphelines = relu.charger()
+    assert [c.date_heure for c in consultations_relues] == ["2024-03-05 09:00"]
+    assert relu.charger_patient(patient.ssn).consultations[0].date_heure == "2024-03-05 09:00"
+
+    # Un lot reprend la génération du lot interrompu, la sauvegarde complète efface le reste
+    relu.enregistrer_lot(patients_relus, consultations_relues,
+                         [("statut", {"id": next(iter(consultations_relues)).identifiant})])
+    relu.sauvegarder(patients_relus, consultations_relues)
+    fichiers = {p.relative_to(tmp_path / "partitions").as_posix() for p in (tmp_path / "partitions").rglob("*")
+                if p.is_file()}
+    assert fichiers == {"manifeste.json", "patients/123.g3.json", "patients/123.g3.mois.json",
+                        "consultations/2024-03.g3.json"}
+
+
+def test_manifeste_version_1(tmp_path, stockage_actif):
+    patient, patients, consultations = _cabinet()
+    dossier = tmp_path / "partitions"
+    (dossier / "patients").mkdir(parents=True)
+    (dossier / "consultations").mkdir()
+    (dossier / "manifeste.json").write_text(json.dumps(
+        {"version": 1, "longueur_prefixe": 3, "patients": {"123": 1}, "consultations": {}}))
+    with open(dossier / "patients" / "123.json", "w", encoding="utf-8") as f:
+        ecrire_donnees(f, [patient], [])
+    (dossier / "patients" / "123.mois.json").write_text("{}")
+
+    stockage = StockagePartitionne(str(dossier))
+    patients, consultations, _ = stockage.charger()
+    stockage_actif(stockage)
+    planifier_consultation(consultations, patients, patients.obtenir(patient.ssn),
+                           "2024-03-05 09:00", "Bernard", "Contrôle")
+
+    assert not (dossier / "patients" / "123.json").exists()
+    relu = StockagePartitionne(str(dossier))
+    assert len(relu.charger_patient(patient.ssn).consultations) == 1
+    assert len(relu.charger()[1]) == 1
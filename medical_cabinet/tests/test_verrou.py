@@ -0,0 +1,42 @@
+import threading
+import time
+
+from storage import VerrouFichier
+
+
+def test_prises_imbriquees_dans_un_meme_fil(tmp_path):
+    verrou = VerrouFichier(str(tmp_path / "donnees.lock"), delai=0.5)
+    with verrou:
+        with verrou:
+            pass
+        # La prise externe tient toujours le fichier
+        assert verrou._fd is not None
+    assert verrou._fd is None
+
+
+def test_fils_partageant_le_meme_verrou(tmp_path):
+    verrou = VerrouFichier(str(tmp_path / "donnees.lock"), delai=2)
+    occupants, chevauchements, erreurs = [], [], []
+
+    def travailler():
+        try:
+            for _ in range(5):
+                with verrou:
+                    occupants.append(threading.current_thread())
+                    if len(occupants) > 1:
+                        chevauchements.append(list(occupants))
+                    time.sleep(0.01)
+                    occupants.remove(threading.current_thread())
+        except Exception as e:
+            erreurs.append(e)
+
+    fils = [threading.Thread(target=travailler) for _ in range(3)]
+    for fil in fils:
+        fil.start()
+    for fil in fils:
+        fil.join()
+
+    assert not erreurs and not chevauchements
+    # Le fichier est bien libéré : un autre verrou sur le même chemin le reprend aussitôt
+    with VerrouFichier(str(tmp_path / "donnees.lock"), delai=0.1):
+        pass
@@ -1,2 +1,3 @@
 from .validators import validate_ssn
-from .decorators import log_action, validate_patient
\ No newline at end of file
+from .decorators import log_action, mesurer, validate_patient, configurer_logs
+from .metrics import metriques
\ No newline at end of file
@@ -1,11 +1,46 @@
 import functools
-from datetime import datetime
+
+from .log_sink import EcrivainLogs
+from .metrics import metriques
+
+# Destination des logs, créée au premier usage (voir configurer_logs)
+_ecrivain = None
+
+
+def configurer_logs(chemin="logs.txt", asynchrone=True, taille_lot=100, delai_vidage=1.0):
+    """
+    Remplace la destination des logs de log_action
+    
+    Args:
+        chemin (str, optional): Fichier de logs. Par défaut "logs.txt"
+        asynchrone (bool, optional): Écriture par lots en tâche de fond ; False
+            pour écrire directement à chaque action. Par défaut True
+        taille_lot (int, optional): Lignes par lot. Par défaut 100
+        delai_vidage (float, optional): Délai maximal d'écriture en secondes. Par défaut 1.0
+        
+    Returns:
+        EcrivainLogs: La nouvelle destination
+    """
+    global _ecrivain
+    if _ecrivain is not None:
+        _ecrivain.fermer()
+    _ecrivain = EcrivainLogs(chemin, asynchrone, taille_lot, delai_vidage)
+    return _ecrivain
+
+
+def obtenir_ecrivain():
+    """Retourne la destination des logs, créée avec les réglages par défaut si besoin"""
+    if _ecrivain is None:
+        configurer_logs()
+    return _ecrivain
 
 
 def log_action(action_desc):
     """
     Décorateur pour enregistrer les actions dans un fichier de logs
     
+    La durée de chaque appel est aussi mesurée dans utils.metrics.metriques.
+    
     Args:
         action_desc (str): Description de l'action à logger
         
@@ -15,21 +50,37 @@ def log_action(action_desc):
     def decorator(func):
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            result = func(*args, **kwargs)
-            with open("logs.txt", "a", encoding="utf-8") as f:
-                timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                f.write(f"[{timestamp}] Action effectuée : {action_desc}\n")
+            result = metriques.appeler(action_desc, func, *args, **kwargs)
+            obtenir_ecrivain().ecrire(action_desc)
             return result
         return wrapper
     return decorator
 
 
+def mesurer(nom):
+    """
+    Décorateur mesurant la durée d'une opération sans l'enregistrer dans les logs
+    
+    Args:
+        nom (str): Nom de l'opération dans le rapport de métriques
+        
+    Returns:
+        function: Fonction décorée
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return metriques.appeler(nom, func, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
 def validate_patient(func):
     """
     Décorateur pour valider qu'un patient existe avant d'exécuter une opération
     
     Attend que la fonction décorée ait comme paramètres:
-    - patients (list): Liste des patients
+    - patients (RegistrePatients): Registre des patients
     - ssn (str): Numéro de sécurité sociale du patient
     
     Raises:
@@ -40,7 +91,7 @@ def validate_patient(func):
     """
     @functools.wraps(func)
     def wrapper(patients, ssn, *args, **kwargs):
-        if not any(p.ssn == ssn for p in patients):
+        if ssn not in patients:
             # Import local pour éviter l'import circulaire
             from models import PatientNotFoundError
             raise PatientNotFoundError(f"Patient {ssn} non trouvé")
@@ -0,0 +1,106 @@
+"""
+Écriture des logs d'actions, en tâche de fond ou synchrone
+"""
+import atexit
+import queue
+import threading
+import time
+from datetime import datetime
+
+# Marqueur de fin transmis au thread d'écriture
+_FIN = object()
+
+
+class EcrivainLogs:
+    """
+    Destination des lignes de log produites par log_action
+    
+    En mode asynchrone, les actions sont déposées dans une file et un thread
+    les écrit par lots : le fichier n'est ouvert qu'une fois par lot, quand
+    taille_lot lignes sont en attente ou que delai_vidage secondes sont écoulées.
+    Les lignes restantes sont écrites à la fermeture (appelée à la sortie du programme).
+    
+    Attributs:
+        chemin (str): Fichier de logs
+        asynchrone (bool): Écriture en tâche de fond (sinon directe)
+        taille_lot (int): Nombre de lignes déclenchant une écriture
+        delai_vidage (float): Délai maximal (s) avant écriture d'une ligne
+    """
+
+    def __init__(self, chemin="logs.txt", asynchrone=True, taille_lot=100, delai_vidage=1.0):
+        """
+        Initialise l'écrivain et démarre le thread d'écriture si besoin
+        
+        Args:
+            chemin (str, optional): Fichier de logs. Par défaut "logs.txt"
+            asynchrone (bool, optional): Écriture en tâche de fond. Par défaut True
+            taille_lot (int, optional): Lignes par lot. Par défaut 100
+            delai_vidage (float, optional): Délai maximal en secondes. Par défaut 1.0
+        """
+        self.chemin = chemin
+        self.asynchrone = asynchrone
+        self.taille_lot = taille_lot
+        self.delai_vidage = delai_vidage
+        self._file = None
+        self._thread = None
+        if asynchrone:
+            self._file = queue.Queue()
+            self._thread = threading.Thread(target=self._boucle, name="ecrivain-logs", daemon=True)
+            self._thread.start()
+            atexit.register(self.fermer)
+
+    @staticmethod
+    def _formater(horodatage, action_desc):
+        timestamp = datetime.fromtimestamp(horodatage).strftime('%Y-%m-%d %H:%M:%S')
+        return f"[{timestamp}] Action effectuée : {action_desc}\n"
+
+    def ecrire(self, action_desc):
+        """
+        Enregistre une action (horodatée maintenant)
+        
+        Args:
+            action_desc (str): Description de l'action
+        """
+        if self._thread is None:
+            with open(self.chemin, "a", encoding="utf-8") as f:
+                f.write(self._formater(time.time(), action_desc))
+        else:
+            self._file.put((time.time(), action_desc))
+
+    def _boucle(self):
+        """Thread d'écriture : regroupe les actions en lots puis les écrit"""
+        termine = False
+        while not termine:
+            lot = []
+            element = self._file.get()
+            echeance = time.monotonic() + self.delai_vidage
+            while True:
+                if element is _FIN:
+                    termine = True
+                    break
+                lot.append(element)
+                restant = echeance - time.monotonic()
+                if len(lot) >= self.taille_lot or restant <= 0:
+                    break
+                try:
+                    element = self._file.get(timeout=restant)
+                except queue.Empty:
+                    break
+            if lot:
+                with open(self.chemin, "a", encoding="utf-8") as f:
+                    f.write("".join(self._formater(h, desc) for h, desc in lot))
+            # Une marque par élément retiré de la file (actions + éventuel marqueur de fin)
+            for _ in range(len(lot) + termine):
+                self._file.task_done()
+
+    def vider(self):
+        """Attend que toutes les actions déposées soient écrites"""
+        if self._thread is not None and self._thread.is_alive():
+            self._file.join()
+
+    def fermer(self):
+        """Écrit les actions restantes et arrête le thread d'écriture"""
+        if self._thread is not None and self._thread.is_alive():
+            self._file.put(_FIN)
+            self._thread.join()
+        self._thread = None
@@ -0,0 +1,205 @@
+"""
+Mesure des temps d'exécution par action et profilage à la demande
+"""
+import json
+import os
+import threading
+import time
+import unicodedata
+from collections import deque
+
+
+def _percentile(triees, p):
+    """Percentile p (0-100) d'une liste triée, par la méthode du rang le plus proche"""
+    if not triees:
+        return 0.0
+    rang = max(1, -(-len(triees) * p // 100))
+    return triees[min(len(triees), rang) - 1]
+
+
+def _nom_fichier(nom):
+    """Nom d'action réduit à des caractères sûrs pour un nom de fichier"""
+    ascii_seul = unicodedata.normalize("NFKD", nom).encode("ascii", "ignore").decode()
+    return "".join(c if c.isalnum() else "_" for c in ascii_seul).strip("_").lower()
+
+
+class StatistiquesAction:
+    """
+    Statistiques cumulées d'une action
+
+    Attributs:
+        appels (int): Nombre d'appels
+        total (float): Durée cumulée en secondes
+        maximum (float): Durée maximale en secondes
+        durees (deque): Dernières durées, pour les percentiles
+        pic_memoire (int): Pic mémoire maximal en octets (tracemalloc), 0 si non mesuré
+    """
+
+    def __init__(self, taille_echantillon):
+        self.appels = 0
+        self.total = 0.0
+        self.maximum = 0.0
+        self.durees = deque(maxlen=taille_echantillon)
+        self.pic_memoire = 0
+
+    def ajouter(self, duree):
+        """Enregistre la durée d'un appel"""
+        self.appels += 1
+        self.total += duree
+        self.maximum = max(self.maximum, duree)
+        self.durees.append(duree)
+
+    def resume(self):
+        """Résumé sérialisable (durées en millisecondes)"""
+        triees = sorted(self.durees)
+        resume = {
+            "appels": self.appels,
+            "total_ms": round(self.total * 1000, 3),
+            "moyenne_ms": round(self.total / self.appels * 1000, 3) if self.appels else 0.0,
+            "p50_ms": round(_percentile(triees, 50) * 1000, 3),
+            "p95_ms": round(_percentile(triees, 95) * 1000, 3),
+            "p99_ms": round(_percentile(triees, 99) * 1000, 3),
+            "max_ms": round(self.maximum * 1000, 3),
+        }
+        if self.pic_memoire:
+            resume["pic_memoire_ko"] = round(self.pic_memoire / 1024, 1)
+        return resume
+
+
+class Metriques:
+    """
+    Registre des statistiques de toutes les actions mesurées
+
+    Attributs:
+        taille_echantillon (int): Nombre de durées conservées par action
+        actions_profilees (dict): Actions profilées -> mode ("cprofile" ou "tracemalloc")
+    """
+
+    MODES_PROFILAGE = ["cprofile", "tracemalloc"]
+
+    def __init__(self, taille_echantillon=10000):
+        self.taille_echantillon = taille_echantillon
+        self.actions_profilees = {}
+        self._statistiques = {}
+        self._profils = {}
+        # Un seul cProfile actif à la fois (Python 3.12+ refuse d'en lancer un second)
+        self._profil_en_cours = False
+        self._verrou = threading.Lock()
+
+    def configurer_profilage(self, actions, mode="cprofile"):
+        """
+        Active le profilage de certaines actions
+
+        Args:
+            actions (iterable): Noms des actions à profiler
+            mode (str, optional): "cprofile" (temps par fonction) ou
+                "tracemalloc" (pic mémoire). Par défaut "cprofile"
+
+        Raises:
+            ValueError: Si le mode est inconnu
+        """
+        if mode not in self.MODES_PROFILAGE:
+            raise ValueError(f"Mode de profilage inconnu : {mode}")
+        for action in actions:
+            self.actions_profilees[action] = mode
+
+    def _statistiques_de(self, nom):
+        statistiques = self._statistiques.get(nom)
+        if statistiques is None:
+            statistiques = self._statistiques[nom] = StatistiquesAction(self.taille_echantillon)
+        return statistiques
+
+    def appeler(self, nom, func, *args, **kwargs):
+        """
+        Exécute une fonction en mesurant sa durée (et en la profilant si demandé)
+
+        Seul l'appel le plus externe est profilé par cProfile : une action
+        profilée appelée pendant un profilage (imbriquée ou dans un autre
+        thread) est seulement chronométrée, son temps figurant déjà dans
+        le profil en cours.
+
+        Args:
+            nom (str): Nom de l'action
+            func (callable): Fonction à exécuter
+
+        Returns:
+            Le résultat de la fonction
+        """
+        mode = self.actions_profilees.get(nom)
+        pic = 0
+        debut = time.perf_counter()
+        try:
+            # Modules de profilage importés seulement pour les actions profilées
+            if mode == "cprofile":
+                import cProfile
+                with self._verrou:
+                    externe = not self._profil_en_cours
+                    if externe:
+                        self._profil_en_cours = True
+                        profil = self._profils.setdefault(nom, cProfile.Profile())
+                if externe:
+                    try:
+                        return profil.runcall(func, *args, **kwargs)
+                    finally:
+                        with self._verrou:
+                            self._profil_en_cours = False
+            if mode == "tracemalloc":
+                import tracemalloc
+                deja_actif = tracemalloc.is_tracing()
+                if not deja_actif:
+                    tracemalloc.start()
+                tracemalloc.reset_peak()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    pic = tracemalloc.get_traced_memory()[1]
+                    if not deja_actif:
+                        tracemalloc.stop()
+            return func(*args, **kwargs)
+        finally:
+            duree = time.perf_counter() - debut
+            with self._verrou:
+                statistiques = self._statistiques_de(nom)
+                statistiques.ajouter(duree)
+                statistiques.pic_memoire = max(statistiques.pic_memoire, pic)
+
+    def rapport(self):
+        """
+        Résumé de toutes les actions mesurées
+
+        Returns:
+            dict: Nom de l'action -> statistiques (durées en millisecondes)
+        """
+        with self._verrou:
+            return {nom: s.resume() for nom, s in sorted(self._statistiques.items())}
+
+    def exporter(self, chemin):
+        """
+        Écrit le rapport en JSON, et les profils cProfile en fichiers .prof à côté
+
+        Args:
+            chemin (str): Fichier JSON de destination
+
+        Returns:
+            list: Fichiers .prof écrits
+        """
+        with open(chemin, "w", encoding="utf-8") as f:
+            json.dump(self.rapport(), f, ensure_ascii=False, indent=2)
+        fichiers = []
+        base = os.path.splitext(chemin)[0]
+        with self._verrou:
+            for nom, profil in sorted(self._profils.items()):
+                fichier = f"{base}_{_nom_fichier(nom)}.prof"
+                profil.dump_stats(fichier)
+                fichiers.append(fichier)
+        return fichiers
+
+    def reinitialiser(self):
+        """Efface toutes les statistiques et profils"""
+        with self._verrou:
+            self._statistiques.clear()
+            self._profils.clear()
+
+
+# Registre global alimenté par log_action et mesurer
+metriques = Metriques()
@@ -0,0 +1,83 @@
+"""
+Affichage par blocs de lignes produites à la demande
+"""
+import itertools
+import sys
+
+
+class SortieTamponnee:
+    """
+    Destination d'affichage qui regroupe les lignes avant de les écrire
+
+    Les lignes sont accumulées puis écrites par blocs de taille_bloc en un
+    seul appel à write, au lieu d'un print (et d'un appel système) par ligne.
+
+    Attributs:
+        flux: Flux texte de destination (sys.stdout par défaut)
+        taille_bloc (int): Nombre de lignes par écriture
+    """
+
+    def __init__(self, flux=None, taille_bloc=256):
+        """
+        Initialise la sortie
+
+        Args:
+            flux (optional): Flux texte. Par défaut sys.stdout au moment de l'écriture
+            taille_bloc (int, optional): Lignes par écriture. Par défaut 256
+        """
+        self.flux = flux
+        self.taille_bloc = taille_bloc
+        self._bloc = []
+
+    def ecrire(self, ligne):
+        """Ajoute une ligne, écrite avec le bloc courant"""
+        self._bloc.append(ligne)
+        if len(self._bloc) >= self.taille_bloc:
+            self._ecrire_bloc()
+
+    def ecrire_lignes(self, lignes):
+        """
+        Écrit toutes les lignes d'un itérable
+
+        Returns:
+            int: Nombre de lignes écrites
+        """
+        nombre = 0
+        for ligne in lignes:
+            self.ecrire(ligne)
+            nombre += 1
+        return nombre
+
+    def _ecrire_bloc(self):
+        flux = self.flux if self.flux is not None else sys.stdout
+        flux.write("\n".join(self._bloc) + "\n")
+        self._bloc = []
+
+    def vider(self):
+        """Écrit les lignes en attente et vide le flux"""
+        if self._bloc:
+            self._ecrire_bloc()
+        flux = self.flux if self.flux is not None else sys.stdout
+        flux.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.vider()
+
+
+def page(lignes, decalage=0, limite=None):
+    """
+    Tranche paresseuse d'un itérable de lignes
+
+    Args:
+        lignes (iterable): Lignes produites à la demande
+        decalage (int, optional): Nombre de lignes sautées. Par défaut 0
+        limite (int, optional): Nombre maximal de lignes. Par défaut toutes
+
+    Returns:
+        iterator: Lignes de la page
+    """
+    fin = None if limite is None else decalage + limite
+    return itertools.islice(lignes, decalage, fin)